@@ -0,0 +1,27 @@
+import argparse
+from storage import portfolio
+from storage.archive import ARCHIVE_STATUSES, archive_closed
+
+# ==================== ARCHIVE CLOSED CASES ====================
+#
+# Moves closed / written-off cases from the working CSV into the compressed
+# archive tier (storage/archive.py), then rebuilds the scored snapshot of the
+# remaining hot book. Run nightly from the project root:
+#
+#   python -m jobs.archive [--dry-run] [--no-warm]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move closed cases out of the working set into the archive")
+    parser.add_argument("--dry-run", action="store_true", help="count the cases without moving them")
+    parser.add_argument("--no-warm", action="store_true", help="skip rebuilding the scored snapshot afterwards")
+    args = parser.parse_args()
+
+    moved = archive_closed(dry_run=args.dry_run)
+    print(f"{moved:,} {'/'.join(ARCHIVE_STATUSES)} case(s) {'to archive' if args.dry_run else 'archived'}")
+    if moved and not args.dry_run and not args.no_warm:
+        portfolio.load_scored_data()
+
+
+if __name__ == "__main__":
+    main()
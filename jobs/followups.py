@@ -0,0 +1,189 @@
+import bisect
+import itertools
+import threading
+from datetime import date
+import numpy as np
+import pandas as pd
+from jobs.rollforward import AS_OF_COLUMN, counts_as_of
+
+# ==================== FOLLOW-UP CALENDAR ====================
+#
+# Turns optimal_followup_days into due dates (last DCA contact + follow-up days)
+# and files every open case in a calendar index keyed by (day, agent). Each
+# bucket is kept sorted by priority_score, so an agent's worklist for a day is a
+# slice of one bucket: O(k). Overdue follow-ups are rolled into "today" once per
+# day (advance), not on every query.
+#
+# Entries move individually: record_contact() re-files one case once a logged
+# contact is written, and sync(df) re-files only the cases whose due day, agent
+# or priority changed in a new version of the book. There is one calendar per
+# data source (full book or agency partition, see get_calendar), each synced
+# only from it.
+
+WORKLIST_SIZE = 25
+BULK_MOVE = 64  # cases per bucket from which a move re-sorts instead of bisecting
+
+
+def followup_due_dates(df, today=None):
+    """Follow-up due day (datetime64[D]) per case: last contact + optimal_followup_days"""
+    today = np.datetime64(today or date.today(), "D")
+    counted_on = counts_as_of(df, today)
+    since_contact = pd.to_numeric(df["last_dca_update_days"], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+    followup = pd.to_numeric(df["optimal_followup_days"], errors="coerce")
+    due = counted_on - since_contact.astype("timedelta64[D]") + followup.fillna(0).to_numpy(dtype=np.int64).astype("timedelta64[D]")
+    due[followup.isna().to_numpy()] = np.datetime64("NaT")
+    return due
+
+
+def contact_fields(case, today=None):
+    """
+    Case fields to write when a DCA contact is logged today: last update resets to
+    0 and the ageing count is brought forward to the same day (see jobs.rollforward)
+    """
+    today = np.datetime64(today or date.today(), "D")
+    frame = pd.DataFrame([dict(case)])
+    elapsed = max(int((today - counts_as_of(frame, today)[0]).astype(np.int64)), 0)
+    return {
+        "last_dca_update_days": 0,
+        "ageing_days": int(case["ageing_days"]) + elapsed,
+        AS_OF_COLUMN: str(today),
+    }
+
+
+class FollowUpCalendar:
+    def __init__(self):
+        self.today = np.datetime64(date.today(), "D")
+        self.data_version = None
+        self._buckets = {}  # (day, agent) -> sorted [(-priority, case_id)]
+        self._entries = {}  # case_id -> (day, agent, key)
+        self._synced = pd.DataFrame(columns=["day", "agent", "priority"])
+        self._lock = threading.RLock()
+
+    def _remove(self, case_ids):
+        """Take cases out of their buckets: bisect per case, or one filtering pass for many"""
+        by_bucket = {}
+        for case_id in case_ids:
+            entry = self._entries.pop(case_id, None)
+            if entry is not None:
+                by_bucket.setdefault(entry[:2], []).append(entry[2])
+        for bucket_key, keys in by_bucket.items():
+            bucket = self._buckets[bucket_key]
+            if len(keys) < BULK_MOVE:
+                for key in keys:
+                    index = bisect.bisect_left(bucket, key)
+                    if index < len(bucket) and bucket[index] == key:
+                        del bucket[index]
+            else:
+                gone = set(keys)
+                bucket[:] = [key for key in bucket if key not in gone]
+            if not bucket:
+                del self._buckets[bucket_key]
+
+    def _place(self, placements):
+        """
+        File cases given as (case_id, day, agent, priority); overdue days land on
+        today. Callers remove the cases first. Few per bucket are bisect-inserted,
+        many are merged with one sort
+        """
+        by_bucket = {}
+        for case_id, day, agent, priority in placements:
+            day = max(np.datetime64(day, "D"), self.today)
+            key = (-priority, case_id)
+            by_bucket.setdefault((day, agent), []).append(key)
+            self._entries[case_id] = (day, agent, key)
+        for bucket_key, keys in by_bucket.items():
+            bucket = self._buckets.setdefault(bucket_key, [])
+            if len(keys) < BULK_MOVE:
+                for key in keys:
+                    bisect.insort(bucket, key)
+            else:
+                bucket.extend(keys)
+                bucket.sort()
+
+    def advance(self, today=None):
+        """Roll every bucket before `today` into today's bucket of the same agent"""
+        today = np.datetime64(today or date.today(), "D")
+        with self._lock:
+            if today <= self.today:
+                return
+            self.today = today
+            for day, agent in [key for key in self._buckets if key[0] < today]:
+                overdue = self._buckets.pop((day, agent))
+                for key in overdue:
+                    self._entries[key[1]] = (today, agent, key)
+                bucket = self._buckets.setdefault((today, agent), [])
+                bucket.extend(overdue)
+                bucket.sort()
+
+    def sync(self, df, data_version=None):
+        """Re-file the cases that are new, closed or whose due day / agent / priority changed"""
+        with self._lock:
+            if data_version is not None and data_version == self.data_version:
+                return 0
+            self.advance()
+            open_case = (df["status"] != "CLOSED").to_numpy() if "status" in df.columns else np.ones(len(df), bool)
+            due = followup_due_dates(df, self.today)
+            keep = open_case & ~np.isnat(due)
+            current = pd.DataFrame({
+                "day": np.maximum(due[keep], self.today),
+                "agent": df["assigned_dca"].fillna("UNASSIGNED").to_numpy(dtype=object)[keep],
+                "priority": pd.to_numeric(df["priority_score"], errors="coerce").fillna(0).to_numpy(dtype=float)[keep],
+            }, index=pd.Index(df["case_id"].to_numpy()[keep], name="case_id"))
+            current = current[~current.index.duplicated(keep="last")]
+
+            previous = self._synced.reindex(current.index)
+            changed = current[(previous["day"].to_numpy() != current["day"].to_numpy()) |
+                              (previous["agent"].to_numpy() != current["agent"].to_numpy()) |
+                              (previous["priority"].to_numpy() != current["priority"].to_numpy())]
+            self._remove(itertools.chain(self._synced.index.difference(current.index), changed.index))
+            self._place(zip(changed.index, changed["day"].to_numpy(dtype="datetime64[D]"),
+                            changed["agent"], changed["priority"]))
+            self._synced = current
+            self.data_version = data_version
+            return len(changed)
+
+    def record_contact(self, case_id, followup_days, when=None):
+        """Move one case after a logged contact: next due is `when` + followup_days"""
+        when = np.datetime64(when or date.today(), "D")
+        with self._lock:
+            entry = self._entries.get(case_id)
+            if entry is None:
+                return
+            _, agent, key = entry
+            self._remove([case_id])
+            self._place([(case_id, when + np.timedelta64(int(followup_days), "D"), agent, -key[0])])
+
+    def worklist(self, agent, day=None, k=WORKLIST_SIZE):
+        """Top `k` follow-ups of `agent` due on `day` (default today), by priority: [(case_id, priority)]"""
+        day = self.today if day is None else np.datetime64(day, "D")
+        with self._lock:
+            bucket = self._buckets.get((day, agent), [])
+            return [(case_id, -negative) for negative, case_id in bucket[:k]]
+
+    def calendar(self, agent=None, days=14):
+        """Number of follow-ups per day (and agent) for the next `days` days"""
+        end = self.today + np.timedelta64(days, "D")
+        with self._lock:
+            counts = [(str(day), bucket_agent, len(bucket)) for (day, bucket_agent), bucket in self._buckets.items()
+                      if day < end and (agent is None or bucket_agent == agent)]
+        return pd.DataFrame(counts, columns=["day", "agent", "cases"]).sort_values(["day", "agent"], ignore_index=True)
+
+
+_calendars = {}  # scope -> calendar
+_calendars_lock = threading.Lock()
+
+
+def get_calendar(df=None, data_version=None, scope=None):
+    """
+    Process-wide calendar of one data source, synced to `df` when a new data
+    version is passed. `scope` names the source (an agency partition; None = the
+    full book): each source keeps its own calendar, so sessions on different
+    scopes never re-file each other's cases
+    """
+    with _calendars_lock:
+        calendar = _calendars.get(scope)
+        if calendar is None:
+            calendar = _calendars[scope] = FollowUpCalendar()
+    if df is not None:
+        calendar.sync(df, data_version)
+    return calendar
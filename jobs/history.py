@@ -0,0 +1,29 @@
+import argparse
+from datetime import date
+from storage import history, portfolio
+
+# ==================== RECORD DAILY HISTORY ====================
+#
+# Records today's scored book in the daily history (storage/history.py) used by
+# the trend charts. The nightly roll-forward already does this; run it on its
+# own where the roll-forward is not scheduled:
+#
+#   python -m jobs.history [--day 2026-01-31] [--stats]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record the scored portfolio in the daily history")
+    parser.add_argument("--day", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--stats", action="store_true", help="only print the size of the history")
+    args = parser.parse_args()
+
+    if not args.stats:
+        df, _ = portfolio.load_scored_data()
+        entry = history.record_day(df, args.day)
+        print(f"{entry['rows']:,} cases recorded for {entry['day']} ({entry['kind']})")
+    stats = history.history_stats()
+    print(f"{stats['days']:,} day(s), {stats['keyframes']:,} keyframe(s), {stats['bytes'] / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
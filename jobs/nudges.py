@@ -0,0 +1,156 @@
+import argparse
+import os
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from storage import events, portfolio
+
+# ==================== DCA NUDGE ENGINE ====================
+#
+# Sends automated NUDGE_DCA reminders for open cases whose DCA has gone quiet
+# (last_dca_update_days > UNRESPONSIVE_DAYS, the "Auto-Escalate: DCA
+# Unresponsive" rule) or whose SLA is BREACHED. One vectorized scan finds the
+# candidates; a case nudged within the cooldown is skipped, looked up in an
+# index of recent NUDGE_DCA events; at most MAX_NUDGES_PER_DCA go to one DCA per
+# run (highest priority first). All nudges of a run are one event-log append;
+# the cooldown is checked again under the portfolio lock right before it, so
+# overlapping runs never nudge a case twice.
+#
+# The index reads the audit trail once (the legacy audit CSV and the case event
+# log) and afterwards only the events appended since, so repeated runs in one
+# process do not re-parse the whole log. Run from
+# the project root, e.g. hourly:
+#
+#   python -m jobs.nudges [--cooldown-hours 72] [--max-per-dca 50] [--dry-run]
+
+NUDGE_ACTION = "NUDGE_DCA"
+NUDGE_USER = "Nudge Engine"
+UNRESPONSIVE_DAYS = 14
+NUDGE_COOLDOWN = timedelta(hours=72)
+MAX_NUDGES_PER_DCA = 50
+NUDGE_COLUMNS = ["case_id", "assigned_dca", "reason", "last_dca_update_days", "sla_status", "priority_score"]
+
+
+def nudge_candidates(df):
+    """Open cases that need a nudge, with the reason, ordered by DCA then priority"""
+    status = df["status"].to_numpy(dtype=object) if "status" in df.columns else np.full(len(df), None)
+    sla_status = df["sla_status"].to_numpy(dtype=object)
+    quiet_days = pd.to_numeric(df["last_dca_update_days"], errors="coerce").fillna(0).to_numpy()
+    unresponsive = quiet_days > UNRESPONSIVE_DAYS
+    breached = sla_status == "BREACHED"
+    due = (status != "CLOSED") & (unresponsive | breached)
+
+    candidates = pd.DataFrame({
+        "case_id": df["case_id"].to_numpy()[due],
+        "assigned_dca": df["assigned_dca"].fillna("UNASSIGNED").to_numpy(dtype=object)[due],
+        "reason": np.select([unresponsive & breached, unresponsive], [
+            "SLA breached, DCA unresponsive", "DCA unresponsive"], default="SLA breached")[due],
+        "last_dca_update_days": quiet_days[due],
+        "sla_status": sla_status[due],
+        "priority_score": pd.to_numeric(df["priority_score"], errors="coerce").fillna(0).to_numpy()[due],
+    }, columns=NUDGE_COLUMNS)
+    return candidates.sort_values(["assigned_dca", "priority_score"], ascending=[True, False],
+                                  kind="stable", ignore_index=True)
+
+
+class RecentNudges:
+    """case_id -> time of its last NUDGE_DCA event, kept current by tailing the case event log"""
+
+    def __init__(self, path=None, legacy_path=None):
+        self.path = path or events.EVENT_LOG
+        self.legacy_path = legacy_path or portfolio.AUDIT_PATH
+        self.last_nudged = pd.Series(dtype="datetime64[ns]")
+        self._offset = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Index the events appended since the last refresh (everything on first use)"""
+        with self._lock:
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            if self._offset is None or size < self._offset:
+                # First read, or the log was replaced: start from the legacy audit CSV
+                self._offset = 0
+                self.last_nudged = pd.Series(dtype="datetime64[ns]")
+                try:
+                    legacy = pd.read_csv(self.legacy_path, usecols=["timestamp", "case_id", "action"])
+                except (OSError, ValueError, pd.errors.EmptyDataError):
+                    legacy = pd.DataFrame(columns=["timestamp", "case_id", "action"])
+                self._add(legacy)
+            logged, self._offset = events.tail_events(self._offset, self.path)
+            if logged:
+                self._add(pd.DataFrame([(entry["timestamp"], entry["case_id"], entry.get("action"))
+                                        for entry in logged], columns=["timestamp", "case_id", "action"]))
+            return self
+
+    def _add(self, audit_rows):
+        nudges = audit_rows[audit_rows["action"] == NUDGE_ACTION]
+        if len(nudges):
+            when = pd.to_datetime(nudges["timestamp"], errors="coerce", format="ISO8601")
+            latest = pd.Series(when.to_numpy(), index=nudges["case_id"].to_numpy()).groupby(level=0).max()
+            self.last_nudged = pd.concat([self.last_nudged, latest]).groupby(level=0).max()
+
+    def nudged_since(self, case_ids, since):
+        """Boolean mask: was each case nudged at or after `since`"""
+        with self._lock:
+            last = self.last_nudged.reindex(case_ids).to_numpy()
+        return ~np.isnat(last) & (last >= np.datetime64(since, "ns"))
+
+    def record(self, case_ids, when):
+        with self._lock:
+            update = pd.Series(np.datetime64(when, "ns"), index=pd.Index(case_ids))
+            self.last_nudged = pd.concat([self.last_nudged, update]).groupby(level=0).max()
+
+
+def plan_nudges(df, index, now=None, cooldown=NUDGE_COOLDOWN, max_per_dca=MAX_NUDGES_PER_DCA):
+    """Candidates not nudged within `cooldown`, at most `max_per_dca` per DCA"""
+    now = now or datetime.now()
+    candidates = nudge_candidates(df)
+    fresh = candidates[~index.refresh().nudged_since(candidates["case_id"], now - cooldown)]
+    if max_per_dca is not None:
+        fresh = fresh[fresh.groupby("assigned_dca").cumcount().to_numpy() < max_per_dca]
+    return fresh.reset_index(drop=True)
+
+
+def send_nudges(planned, index=None, now=None, cooldown=NUDGE_COOLDOWN):
+    """
+    Log the planned nudges, stamped `now`, as one event-log append; returns {dca:
+    number of nudges}. Cases another run nudged within `cooldown` since they were
+    planned are skipped: the check and the append hold the portfolio lock
+    """
+    if planned.empty:
+        return {}
+    now = now or datetime.now()
+    index = index or RecentNudges()
+    with portfolio.file_lock(portfolio.DATA_PATH):
+        planned = planned[~index.refresh().nudged_since(planned["case_id"], now - cooldown)]
+        if planned.empty:
+            return {}
+        details = "Auto reminder sent: " + planned["reason"].to_numpy(dtype=object)
+        events.append_events([events.event(case_id, events.AUDIT_KIND, action=NUDGE_ACTION, user=NUDGE_USER,
+                                           details=detail, timestamp=now)
+                              for case_id, detail in zip(planned["case_id"], details)])
+    index.record(planned["case_id"].to_numpy(), now)
+    return planned.groupby("assigned_dca").size().to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send NUDGE_DCA reminders for unresponsive / breached cases")
+    parser.add_argument("--cooldown-hours", type=float, default=NUDGE_COOLDOWN / timedelta(hours=1))
+    parser.add_argument("--max-per-dca", type=int, default=MAX_NUDGES_PER_DCA)
+    parser.add_argument("--dry-run", action="store_true", help="list the nudges without writing them")
+    args = parser.parse_args()
+
+    df, _ = portfolio.load_scored_data()
+    index = RecentNudges()
+    cooldown = timedelta(hours=args.cooldown_hours)
+    planned = plan_nudges(df, index, cooldown=cooldown, max_per_dca=args.max_per_dca)
+    per_dca = planned.groupby("assigned_dca").size().to_dict() if args.dry_run else \
+        send_nudges(planned, index, cooldown=cooldown)
+    for dca, count in per_dca.items():
+        print(f"{dca}: {count:,} nudge(s)")
+    print(f"{sum(per_dca.values()):,} nudge(s) {'planned' if args.dry_run else 'sent'}")
+
+
+if __name__ == "__main__":
+    main()
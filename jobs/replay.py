@@ -0,0 +1,44 @@
+import argparse
+from datetime import datetime
+from storage import events, portfolio
+
+# ==================== CASE EVENT REPLAY ====================
+#
+# Rebuilds the book from the case event log (storage/events.py): the latest
+# checkpoint plus the events after it. Run from the project root:
+#
+#   python -m jobs.replay --verify                 # report drift between the CSV and the log
+#   python -m jobs.replay --as-of 2026-03-31T18:00 --output book_0331.csv
+#   python -m jobs.replay --checkpoint             # compact: checkpoint the current book now
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the portfolio from the case event log")
+    parser.add_argument("--as-of", type=datetime.fromisoformat, help="rebuild the book as it was at this time")
+    parser.add_argument("--output", help="write the rebuilt book to this CSV")
+    parser.add_argument("--verify", action="store_true", help="compare the rebuilt book with the portfolio CSV")
+    parser.add_argument("--checkpoint", action="store_true", help="checkpoint the current book")
+    args = parser.parse_args()
+
+    if args.checkpoint:
+        with portfolio.file_lock(portfolio.DATA_PATH):
+            if portfolio.catch_up_csv():
+                print(f"{portfolio.DATA_PATH} was behind the event log: caught up")
+            print(f"Checkpoint at event {events.checkpoint(portfolio.with_case_versions(portfolio.load_data())):,}")
+        return
+
+    rebuilt = events.replay(args.as_of)
+    if rebuilt is None:
+        parser.exit(1, "No checkpoint at or before that time: the history starts later\n")
+    print(f"{len(rebuilt):,} cases rebuilt{f' as of {args.as_of}' if args.as_of else ''}")
+    if args.output:
+        rebuilt.to_csv(args.output, index=False)
+    if args.verify:
+        drifted = events.drift(portfolio.load_data(), rebuilt)
+        print(f"{len(drifted):,} case(s) differ from {portfolio.DATA_PATH}" + (f": {', '.join(drifted[:20])}" if drifted else ""))
+        if drifted:
+            parser.exit(1)
+
+
+if __name__ == "__main__":
+    main()
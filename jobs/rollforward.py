@@ -0,0 +1,218 @@
+import argparse
+import os
+from datetime import date
+import numpy as np
+import pandas as pd
+from models.derived import resolve_columns
+from models.scoring import SCORED_COLUMNS
+from perf import instrument
+from storage import events, history, portfolio, snapshot
+
+# ==================== DAILY AGEING ROLL-FORWARD ====================
+#
+# ageing_days and last_dca_update_days are day counts as of some date. This job
+# advances both to `as_of` for the whole book, then re-scores the rows that moved
+# (sla_status and every score depend on them) and reports only the cases whose
+# SLA status or risk band changed. Run nightly from the project root:
+#
+#   python -m jobs.rollforward [--as-of 2026-01-31] [--dry-run] [--no-warm]
+#
+# The re-scored book is then recorded as the as-of day in the daily history
+# (storage/history.py) that the trend charts read; --no-warm skips that too.
+#
+# Each row records the date its counts refer to in `days_as_of`. For rows
+# without one it is inferred as created_date + ageing_days (or taken as today
+# when that lies in the future), so re-running on the same day is a no-op. An
+# as-of date before a row's days_as_of is rejected: the counts only move forward.
+# The CSV is streamed in ROLLFORWARD_CHUNK_ROWS chunks, one vectorized pass per
+# chunk, under the portfolio file lock; logged case changes the CSV missed are
+# applied to each chunk on the way through. Case versions are not bumped: the
+# day counts are not user edits and must not fail concurrent compare-and-set
+# updates. For the same reason the rolled book is recorded as a case-event
+# checkpoint (storage/events.py), not as one event per case; the checkpoint is
+# streamed back from the rewritten CSV, so memory stays bounded by one chunk.
+
+ROLLFORWARD_CHUNK_ROWS = 500_000
+AS_OF_COLUMN = "days_as_of"
+TRANSITIONS_DIR = "data/transitions"
+TRANSITION_COLUMNS = ["case_id", "assigned_dca", "ageing_days", "sla_status_before", "sla_status",
+                      "risk_level_before", "risk_level"]
+
+
+def counts_as_of(chunk, as_of):
+    """Date each row's day counts refer to (datetime64[D])"""
+    counted = np.full(len(chunk), np.datetime64("NaT"), dtype="datetime64[D]")
+    if AS_OF_COLUMN in chunk.columns:
+        stored = pd.to_datetime(chunk[AS_OF_COLUMN], errors="coerce", format="ISO8601")
+        counted = stored.to_numpy(dtype="datetime64[D]")
+    missing = np.isnat(counted)
+    if missing.any() and "created_date" in chunk.columns:
+        created = pd.to_datetime(chunk["created_date"].iloc[np.flatnonzero(missing)],
+                                 errors="coerce", format="ISO8601").to_numpy(dtype="datetime64[D]")
+        ageing = pd.to_numeric(chunk["ageing_days"].iloc[np.flatnonzero(missing)], errors="coerce")
+        inferred = created + ageing.fillna(0).to_numpy(dtype=np.int64).astype("timedelta64[D]")
+        inferred[inferred > as_of] = np.datetime64("NaT")
+        counted[missing] = inferred
+    counted[np.isnat(counted)] = as_of
+    return counted
+
+
+def _column(frame, column):
+    """Writable object array of a column (all None if the book does not have it)"""
+    if column not in frame.columns:
+        return np.full(len(frame), None, dtype=object)
+    return frame[column].to_numpy(dtype=object, copy=True)
+
+
+def roll_forward_chunk(chunk, as_of):
+    """
+    Advance the day counts of `chunk` (a frame of the stored book) to `as_of` and
+    re-score the rows that moved. Returns (rolled chunk, transitions frame).
+    Raises ValueError if a row is already counted past `as_of`
+    """
+    as_of = np.datetime64(as_of, "D")
+    elapsed = (as_of - counts_as_of(chunk, as_of)).astype(np.int64)
+    if (elapsed < 0).any():
+        latest = counts_as_of(chunk, as_of).max()
+        raise ValueError(f"cases are already counted as of {latest}; cannot roll back to {as_of}")
+    rolled = chunk.copy()
+    rolled[AS_OF_COLUMN] = str(as_of)
+    moved = np.flatnonzero(elapsed > 0)
+    if not len(moved):
+        return rolled, pd.DataFrame(columns=TRANSITION_COLUMNS)
+
+    for column in ("ageing_days", "last_dca_update_days"):
+        values = pd.to_numeric(rolled[column], errors="coerce").to_numpy(dtype=float, copy=True)
+        values[moved] += elapsed[moved]
+        rolled[column] = values if np.isnan(values).any() else values.astype(np.int64)
+
+    before = {column: _column(rolled, column) for column in ("sla_status", "risk_level")}
+    scored = resolve_columns(rolled.iloc[moved], SCORED_COLUMNS)
+    for column in SCORED_COLUMNS:
+        values = _column(rolled, column)
+        values[moved] = scored[column]
+        rolled[column] = pd.Series(values, index=rolled.index).infer_objects()
+
+    changed = moved[(before["sla_status"][moved] != scored["sla_status"]) |
+                    (before["risk_level"][moved] != scored["risk_level"])]
+    transitions = pd.DataFrame({
+        "case_id": rolled["case_id"].to_numpy()[changed],
+        "assigned_dca": rolled["assigned_dca"].to_numpy()[changed] if "assigned_dca" in rolled.columns else None,
+        "ageing_days": rolled["ageing_days"].to_numpy()[changed],
+        "sla_status_before": before["sla_status"][changed],
+        "sla_status": rolled["sla_status"].to_numpy()[changed],
+        "risk_level_before": before["risk_level"][changed],
+        "risk_level": rolled["risk_level"].to_numpy()[changed],
+    }, columns=TRANSITION_COLUMNS)
+    return rolled, transitions
+
+
+def roll_forward(df, as_of=None, chunk_rows=ROLLFORWARD_CHUNK_ROWS):
+    """In-memory roll-forward of a whole frame. Returns (rolled df, transitions)"""
+    as_of = as_of or date.today()
+    parts, transitions = [], []
+    for start in range(0, len(df), chunk_rows):
+        rolled, changed = roll_forward_chunk(df.iloc[start:start + chunk_rows], as_of)
+        parts.append(rolled)
+        transitions.append(changed)
+    if not parts:
+        return df.copy(), pd.DataFrame(columns=TRANSITION_COLUMNS)
+    return pd.concat(parts), pd.concat(transitions, ignore_index=True)
+
+
+def _catch_up_chunk(chunk, missing, created, seen):
+    """`chunk` with the missed updates and archives applied; notes which missed creates it already holds"""
+    seen.update(created.intersection(chunk["case_id"]))
+    return events.apply_events(portfolio.with_case_versions(chunk),
+                               [entry for entry in missing if entry["type"] != "create"])
+
+
+@instrument("job.rollforward")
+def roll_forward_file(path=None, as_of=None, chunk_rows=ROLLFORWARD_CHUNK_ROWS, dry_run=False):
+    """
+    Stream the portfolio CSV through the roll-forward (rewritten atomically unless
+    dry_run). Returns (rows, transitions frame)
+    """
+    path = path or portfolio.DATA_PATH
+    as_of = as_of or date.today()
+    tmp_path = f"{path}.rollforward.tmp"
+    rows, transitions, kinds, columns = 0, [], {}, None
+
+    def write(rolled):
+        nonlocal rows, columns
+        first = columns is None
+        columns = list(rolled.columns) if first else columns
+        rolled = rolled.reindex(columns=columns)
+        rows += len(rolled)
+        if not dry_run:
+            rolled.to_csv(tmp_path, mode="w" if first else "a", header=first, index=False)
+            snapshot.column_kinds(rolled, kinds)
+
+    with portfolio.file_lock(path):
+        # Logged changes the CSV missed are applied on the way through (catch_up_csv would rescore the book)
+        missing = events.unapplied()
+        created, seen = {entry["case_id"] for entry in missing if entry["type"] == "create"}, set()
+        try:
+            empty = None
+            for chunk in pd.read_csv(path, chunksize=chunk_rows):
+                empty = chunk.iloc[:0] if empty is None else empty
+                if missing:
+                    chunk = _catch_up_chunk(chunk, missing, created, seen)
+                rolled, changed = roll_forward_chunk(chunk, as_of)
+                write(rolled)
+                transitions.append(changed)
+            if created - seen:
+                # Cases whose create the CSV missed, with their later updates
+                empty = pd.read_csv(path, nrows=0) if empty is None else empty
+                late = [entry for entry in missing if entry["type"] != "create" or entry["case_id"] not in seen]
+                rolled, changed = roll_forward_chunk(
+                    events.apply_events(portfolio.with_case_versions(empty), late).reset_index(drop=True), as_of)
+                write(rolled)
+                transitions.append(changed)
+            if not dry_run:
+                if columns is None:
+                    pd.read_csv(path, nrows=0).to_csv(tmp_path, index=False)
+                os.replace(tmp_path, path)
+                # Day counts change on every row: a checkpoint instead of one event per case, streamed
+                # back from the rewritten file so only one chunk is in memory
+                if rows:
+                    seq = events.checkpoint_chunks(pd.read_csv(path, chunksize=chunk_rows), kinds, rows)
+                else:
+                    seq = events.checkpoint(pd.read_csv(path))
+                events.mark_applied(seq)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    if not transitions:
+        return rows, pd.DataFrame(columns=TRANSITION_COLUMNS)
+    return rows, pd.concat(transitions, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Advance case ageing to a date and report SLA / risk transitions")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--chunk-rows", type=int, default=ROLLFORWARD_CHUNK_ROWS)
+    parser.add_argument("--dry-run", action="store_true", help="report transitions without rewriting the book")
+    parser.add_argument("--no-warm", action="store_true", help="skip rebuilding the scored snapshot afterwards")
+    args = parser.parse_args()
+
+    try:
+        rows, transitions = roll_forward_file(as_of=args.as_of, chunk_rows=args.chunk_rows, dry_run=args.dry_run)
+    except ValueError as exc:
+        parser.error(str(exc))
+    os.makedirs(TRANSITIONS_DIR, exist_ok=True)
+    out_path = os.path.join(TRANSITIONS_DIR, f"transitions_{args.as_of:%Y%m%d}.csv")
+    transitions.to_csv(out_path, index=False)
+    print(f"{rows:,} cases rolled forward to {args.as_of}; {len(transitions):,} SLA/risk transitions -> {out_path}")
+    if not args.dry_run and not args.no_warm:
+        # Score cache and snapshot for the new book, so the first page load is fast
+        scored, _ = portfolio.load_scored_data()
+        try:
+            entry = history.record_day(scored, args.as_of)
+            print(f"History: {entry['day']} recorded ({entry['kind']})")
+        except ValueError as exc:
+            print(f"History not recorded: {exc}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from models.scoring import compute_dca_sla_deadline
+from storage.portfolio import load_audit, load_scored_data
+from storage.write_behind import flush, submit_audit
+
+# ==================== SLA DEADLINE SCHEDULER ====================
+#
+# Every open case gets an SLA deadline from compute_dca_sla_deadline(created_date,
+# case type), and its next SLA event ("AT_RISK" once AT_RISK_FRACTION of the
+# window has elapsed, then "BREACHED" at the deadline) sits in a min-heap. A
+# scheduler thread sleeps until the earliest event is due and emits it to the
+# subscribers the moment it occurs: O(log n) per case and event, nothing is
+# rescanned to find breaches.
+#
+# Only the next event of each case is queued; rescheduling (status change,
+# closure, new case) leaves the old heap entry behind as stale and it is skipped
+# when popped. sync(df) reconciles the heap with a new version of the book,
+# vectorized, touching only cases whose next event changed. The stored
+# sla_status lags behind emitted events, so events already in the audit trail
+# (from earlier runs) are not emitted again. Run from the project root (events
+# go to the audit log as SLA_AT_RISK / SLA_BREACHED):
+#
+#   python -m jobs.sla_scheduler            # run until interrupted
+#   python -m jobs.sla_scheduler --once     # emit what is due now and exit
+
+AT_RISK_FRACTION = 2 / 3  # day 20 of a standard 30-day SLA, as in the sla_status rule
+HIGH_VALUE_AMOUNT = 10_000_000
+SLA_CASE_TYPES = ("standard", "high_value", "escalated", "legal")
+SYNC_INTERVAL_S = 60
+SCHEDULER_USER = "SLA Scheduler"
+SLA_ACTIONS = {"SLA_AT_RISK": "AT_RISK", "SLA_BREACHED": "BREACHED"}
+DEADLINE_PREFIX = "SLA deadline "
+_EPOCH = np.datetime64("1970-01-01T00:00:00", "ns")
+
+
+def _now():
+    """Local wall-clock time in seconds (deadlines are naive local datetimes)"""
+    return (np.datetime64(datetime.now(), "ns") - _EPOCH) / np.timedelta64(1, "s")
+
+
+def case_sla_types(df):
+    """SLA case type per case: escalated, high_value (invoice >= HIGH_VALUE_AMOUNT) or standard"""
+    status = df["status"].to_numpy(dtype=object) if "status" in df.columns else np.full(len(df), None)
+    amount = pd.to_numeric(df["invoice_amount"], errors="coerce").fillna(0).to_numpy()
+    return np.select([status == "ESCALATED", status == "LEGAL", amount >= HIGH_VALUE_AMOUNT],
+                     ["escalated", "legal", "high_value"], default="standard")
+
+
+def sla_deadlines(df):
+    """(case types, created, deadline) per case as datetime64[ns]; NaT where created_date is unknown"""
+    created = pd.to_datetime(df["created_date"], errors="coerce", format="ISO8601")
+    types = case_sla_types(df)
+    deadlines = np.full(len(df), np.datetime64("NaT"), dtype="datetime64[ns]")
+    for case_type in SLA_CASE_TYPES:
+        mask = types == case_type
+        if mask.any():
+            deadlines[mask] = compute_dca_sla_deadline(created[mask], case_type).to_numpy(dtype="datetime64[ns]")
+    return types, created.to_numpy(dtype="datetime64[ns]"), deadlines
+
+
+def _deadline_key(deadline):
+    """Deadlines compare by the minute, the precision the audit trail records them at"""
+    return int(deadline // 60)
+
+
+def logged_sla_events(audit=None):
+    """{case_id: (event, deadline key)} of the last SLA event in the audit trail for each case"""
+    audit = load_audit() if audit is None else audit
+    logged = audit[audit["action"].isin(list(SLA_ACTIONS))]
+    deadline = pd.to_datetime(logged["details"].astype(str).str.removeprefix(DEADLINE_PREFIX),
+                              errors="coerce", format="%Y-%m-%d %H:%M").to_numpy(dtype="datetime64[ns]")
+    known = ~np.isnat(deadline)
+    keys = ((deadline[known] - _EPOCH) / np.timedelta64(60, "s")).astype(np.int64)
+    return {case_id: (SLA_ACTIONS[action], int(key)) for case_id, action, key
+            in zip(logged["case_id"].to_numpy()[known], logged["action"].to_numpy()[known], keys)}
+
+
+def next_sla_events(df, now=None):
+    """
+    Next SLA event of every open case: frame of case_id, event, due (epoch seconds)
+    and deadline. Cases already BREACHED, CLOSED or without a created_date have none
+    """
+    now = _now() if now is None else now
+    _, created, deadlines = sla_deadlines(df)
+    at_risk = created + ((deadlines - created) * AT_RISK_FRACTION).astype("timedelta64[ns]")
+    to_seconds = lambda values: (values - _EPOCH) / np.timedelta64(1, "s")
+    deadline_s, at_risk_s = to_seconds(deadlines), to_seconds(at_risk)
+
+    sla_status = df["sla_status"].to_numpy(dtype=object) if "sla_status" in df.columns else np.full(len(df), None)
+    status = df["status"].to_numpy(dtype=object) if "status" in df.columns else np.full(len(df), None)
+    open_case = (status != "CLOSED") & (sla_status != "BREACHED") & ~np.isnat(deadlines)
+    # Straight to BREACHED if the case is already at risk or both moments have passed
+    breach_next = (sla_status == "AT_RISK") | (deadline_s <= now)
+    return pd.DataFrame({
+        "case_id": df["case_id"].to_numpy()[open_case],
+        "event": np.where(breach_next, "BREACHED", "AT_RISK")[open_case],
+        "due": np.where(breach_next, deadline_s, at_risk_s)[open_case],
+        "deadline": deadline_s[open_case],
+    })
+
+
+class SlaScheduler:
+    def __init__(self, clock=_now):
+        self.clock = clock
+        self._heap = []  # (due, seq, case_id, event, deadline)
+        self._current = {}  # case_id -> seq of its live heap entry
+        self._synced = pd.DataFrame(columns=["event", "due"])  # next events as of the last sync
+        self._emitted = {}  # case_id -> (event, deadline key) last emitted
+        self._seq = itertools.count()
+        self._listeners = []
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def subscribe(self, listener):
+        """listener(event dict: case_id, event, due, deadline, emitted) for every emitted event"""
+        self._listeners.append(listener)
+
+    def mark_emitted(self, emitted):
+        """Treat events emitted before (logged_sla_events) as emitted by this scheduler"""
+        with self._cond:
+            self._emitted.update(emitted)
+
+    def schedule(self, case_id, event, due, deadline):
+        """Make (event at due) the case's next SLA event, replacing any other. O(log n)"""
+        with self._cond:
+            seq = next(self._seq)
+            self._current[case_id] = seq
+            heapq.heappush(self._heap, (due, seq, case_id, event, deadline))
+            if self._heap[0][1] == seq:
+                self._cond.notify()  # new earliest event: wake the runner
+
+    def cancel(self, case_id):
+        with self._cond:
+            self._current.pop(case_id, None)
+
+    def sync(self, df):
+        """Reconcile with a version of the book; returns the number of cases (re)scheduled"""
+        events = next_sla_events(df, self.clock()).drop_duplicates("case_id", keep="last").set_index("case_id")
+        previous = self._synced.reindex(events.index)
+        changed = events[(previous["event"].to_numpy() != events["event"].to_numpy()) |
+                         (previous["due"].to_numpy() != events["due"].to_numpy())]
+        for case_id in self._synced.index.difference(events.index):
+            self.cancel(case_id)
+        scheduled = 0
+        for case_id, event, due, deadline in zip(changed.index, changed["event"], changed["due"], changed["deadline"]):
+            # The book lags behind emitted events (sla_status is only rewritten by scoring)
+            emitted = self._emitted.get(case_id)
+            if emitted == ("BREACHED", _deadline_key(deadline)):
+                continue
+            if event == "AT_RISK" and emitted == ("AT_RISK", _deadline_key(deadline)):
+                event, due = "BREACHED", deadline
+            self.schedule(case_id, event, due, deadline)
+            scheduled += 1
+        self._synced = events[["event", "due"]]
+        return scheduled
+
+    def pending(self):
+        return len(self._current)
+
+    def _pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, seq, case_id, event, deadline = heapq.heappop(self._heap)
+            if self._current.get(case_id) != seq:
+                continue  # stale: rescheduled or cancelled
+            del self._current[case_id]
+            self._emitted[case_id] = (event, _deadline_key(deadline))
+            due.append({"case_id": case_id, "event": event, "due": when, "deadline": deadline, "emitted": now})
+            if event == "AT_RISK":
+                seq = next(self._seq)
+                self._current[case_id] = seq
+                heapq.heappush(self._heap, (deadline, seq, case_id, "BREACHED", deadline))
+        return due
+
+    def run_due(self):
+        """Emit every event due now; returns them"""
+        with self._cond:
+            due = self._pop_due(self.clock())
+        for event in due:
+            for listener in self._listeners:
+                listener(event)
+        return due
+
+    def run(self, max_wait=SYNC_INTERVAL_S):
+        """Emit events as they fall due until stop(); wakes early for new earlier events"""
+        while True:
+            self.run_due()
+            with self._cond:
+                if self._stopped:
+                    return
+                wait = max_wait
+                if self._heap:
+                    wait = min(max_wait, max(0.0, self._heap[0][0] - self.clock()))
+                self._cond.wait(wait)
+                if self._stopped:
+                    return
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+
+def audit_sink(event):
+    """Record an emitted SLA event in the audit log (via the write-behind queue)"""
+    deadline = datetime(1970, 1, 1) + timedelta(seconds=event["deadline"])
+    submit_audit(event["case_id"], f"SLA_{event['event']}", SCHEDULER_USER,
+                 f"{DEADLINE_PREFIX}{deadline:%Y-%m-%d %H:%M}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emit SLA AT_RISK / BREACHED events as they occur")
+    parser.add_argument("--once", action="store_true", help="emit the events due now and exit")
+    args = parser.parse_args()
+
+    scheduler = SlaScheduler()
+    scheduler.subscribe(audit_sink)
+    scheduler.subscribe(lambda e: print(f"{datetime.now():%Y-%m-%d %H:%M:%S} {e['case_id']} {e['event']}"))
+    scheduler.mark_emitted(logged_sla_events())
+    df, data_version = load_scored_data()
+    scheduler.sync(df)
+    print(f"{scheduler.pending():,} open cases scheduled")
+    if args.once:
+        scheduler.run_due()
+        flush()
+        return
+
+    runner = threading.Thread(target=scheduler.run, name="sla-scheduler", daemon=True)
+    runner.start()
+    try:
+        while True:
+            time.sleep(SYNC_INTERVAL_S)
+            df, version = load_scored_data()
+            if version is None or version != data_version:
+                data_version = version
+                print(f"Book changed: {scheduler.sync(df):,} cases rescheduled")
+    except KeyboardInterrupt:
+        scheduler.stop()
+        flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import os
+import threading
+import weakref
+import tracemalloc
+import numpy as np
+
+# ==================== MEMORY ACCOUNTING / ALLOCATION PROFILING ====================
+#
+# Opt-in (DCA_MEMPROF=1 or set_enabled(True)). While enabled, each page render is
+# bracketed by start_page_profile(page) / .stop(), which uses tracemalloc to record
+#   - peak:     highest traced allocation above the render's starting point
+#   - retained: what is still allocated when the render ends (steady growth
+#               across renders of one page is the leak signal)
+#   - sites:    top source lines by bytes allocated during the render. With
+#               DCA_MEMPROF_FRAMES > 1 each allocation is charged to its innermost
+#               frame in this project, so a DataFrame.copy() shows up at the line in
+#               views/ (or models/, storage/) that made it (deeper stacks make
+#               tracing much slower)
+# Renders whose peak exceeds the budget (DCA_MEM_BUDGET_MB, default 64) are
+# counted and flagged per page.
+#
+# tracemalloc is process-wide: renders of other sessions that run at the same
+# time add their allocations to this render's peak, retained bytes and sites
+# (and each render's reset_peak() resets the others'). Such renders are counted
+# as "overlapped"; profile with a single session for per-page numbers.
+#
+# frame_memory() reports the resident size of a frame per column and whether the
+# column is file-backed (mmap), shared with the process-wide portfolio, or a
+# private per-session copy.
+
+TOP_SITES = 10
+TRACE_FRAMES = int(os.environ.get("DCA_MEMPROF_FRAMES", "1"))
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+MB = 1024 * 1024
+
+_state = {
+    "enabled": os.environ.get("DCA_MEMPROF", "0") == "1",
+    "budget_mb": float(os.environ.get("DCA_MEM_BUDGET_MB", "64")),
+    "owns_tracing": False,
+    "started": 0,  # renders started so far
+}
+_active = weakref.WeakSet()  # renders being profiled (one aborted by st.rerun() drops out when collected)
+_pages = {}
+_lock = threading.Lock()
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>",
+                  "<frozen importlib._bootstrap_external>", "<unknown>")
+
+
+def is_enabled():
+    return _state["enabled"]
+
+
+def set_enabled(enabled):
+    """Turn profiling on/off; stops tracemalloc again if this module started it"""
+    _state["enabled"] = bool(enabled)
+    if not enabled and _state["owns_tracing"] and tracemalloc.is_tracing():
+        tracemalloc.stop()
+        _state["owns_tracing"] = False
+
+
+def budget_mb():
+    return _state["budget_mb"]
+
+
+def set_budget_mb(value):
+    _state["budget_mb"] = float(value)
+
+
+def _new_page():
+    return {
+        "renders": 0,
+        "over_budget": 0,
+        "overlapped": 0,
+        "last_peak": 0,
+        "max_peak": 0,
+        "last_retained": 0,
+        "total_retained": 0,
+        "sites": [],
+    }
+
+
+def _site(traceback):
+    """Innermost project frame of an allocation (else its innermost frame)"""
+    for frame in reversed(traceback):
+        if frame.filename.startswith(PROJECT_ROOT) and frame.filename != __file__:
+            return f"{os.path.relpath(frame.filename, PROJECT_ROOT)}:{frame.lineno}"
+    frame = traceback[-1]
+    if frame.filename in _IGNORED_FILES:
+        return None
+    filename = frame.filename.rpartition("site-packages" + os.sep)[2]
+    if os.path.isabs(filename):
+        filename = os.path.basename(filename)
+    return f"{filename}:{frame.lineno}"
+
+
+def _top_sites(after, before):
+    """Top allocation sites of the render (positive growth only)"""
+    stats = after.compare_to(before, "traceback" if TRACE_FRAMES > 1 else "lineno")
+    sites = {}
+    for stat in stats:
+        if stat.size_diff <= 0:
+            continue
+        site = _site(stat.traceback)
+        if site is None:
+            continue
+        totals = sites.setdefault(site, {"bytes": 0, "blocks": 0})
+        totals["bytes"] += stat.size_diff
+        totals["blocks"] += stat.count_diff
+    ranked = sorted(sites.items(), key=lambda item: item[1]["bytes"], reverse=True)[:TOP_SITES]
+    return [{"site": site, "kb": round(totals["bytes"] / 1024, 1), "blocks": totals["blocks"]}
+            for site, totals in ranked]
+
+
+class _PageProfile:
+    """One page render under tracemalloc; stop() records it"""
+    __slots__ = ("page", "before", "baseline", "started", "overlapped", "__weakref__")
+
+    def __init__(self, page):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            _state["owns_tracing"] = True
+        self.page = page
+        with _lock:
+            self.overlapped = len(_active) > 0
+            _active.add(self)
+            _state["started"] += 1
+            self.started = _state["started"]
+        self.before = tracemalloc.take_snapshot()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def stop(self):
+        with _lock:
+            _active.discard(self)
+        if self.page is None or not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        sites = _top_sites(tracemalloc.take_snapshot(), self.before)
+        peak_bytes = max(peak - self.baseline, 0)
+        retained = current - self.baseline
+
+        with _lock:
+            # Another render ran during this one if one was active at the start or started since
+            overlapped = self.overlapped or _state["started"] != self.started
+            stats = _pages.get(self.page)
+            if stats is None:
+                stats = _pages[self.page] = _new_page()
+            stats["renders"] += 1
+            stats["overlapped"] += overlapped
+            stats["last_peak"] = peak_bytes
+            stats["max_peak"] = max(stats["max_peak"], peak_bytes)
+            stats["last_retained"] = retained
+            stats["total_retained"] += retained
+            stats["sites"] = sites
+            if peak_bytes > _state["budget_mb"] * MB:
+                stats["over_budget"] += 1
+        self.page = None
+        self.before = None
+
+
+class _NullProfile:
+    __slots__ = ()
+
+    def stop(self):
+        pass
+
+
+_NULL_PROFILE = _NullProfile()
+
+
+def start_page_profile(page):
+    """Begin profiling one render of `page` (a shared no-op while disabled)"""
+    if not _state["enabled"]:
+        return _NULL_PROFILE
+    return _PageProfile(page)
+
+
+# ==================== REPORTING ====================
+
+def page_summary():
+    """
+    One row per profiled page (MB); over_budget counts renders whose peak exceeded
+    the budget, overlapped those that ran concurrently with another render
+    """
+    with _lock:
+        snapshot = {page: dict(stats) for page, stats in _pages.items()}
+
+    rows = []
+    for page, stats in sorted(snapshot.items()):
+        rows.append({
+            "page": page,
+            "renders": stats["renders"],
+            "last_peak_mb": round(stats["last_peak"] / MB, 2),
+            "max_peak_mb": round(stats["max_peak"] / MB, 2),
+            "last_retained_mb": round(stats["last_retained"] / MB, 3),
+            "total_retained_mb": round(stats["total_retained"] / MB, 3),
+            "over_budget": stats["over_budget"],
+            "overlapped": stats["overlapped"],
+        })
+    return rows
+
+
+def pages_over_budget():
+    """Pages with at least one render over the allocation budget"""
+    with _lock:
+        return sorted(page for page, stats in _pages.items() if stats["over_budget"])
+
+
+def page_sites(page):
+    """Top allocation sites from the last profiled render of `page`"""
+    with _lock:
+        stats = _pages.get(page)
+        return list(stats["sites"]) if stats else []
+
+
+def reset():
+    with _lock:
+        _pages.clear()
+
+
+def _is_file_backed(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def frame_memory(df, shared=None):
+    """
+    Resident bytes per column of `df` (deep, so object strings are counted).
+    backing: "mmap" (page cache, shared by every process), "shared" (one copy per
+    process, shared by sessions) or "session" (private to this frame)
+    """
+    rows = []
+    for column in df.columns:
+        values = df[column]
+        array = values.to_numpy()
+        if _is_file_backed(array):
+            backing = "mmap"
+        elif shared is not None and column in shared.columns and np.shares_memory(
+                array, shared[column].to_numpy()):
+            backing = "shared"
+        else:
+            backing = "session"
+        rows.append({
+            "column": column,
+            "dtype": str(values.dtype),
+            "mb": round(values.memory_usage(deep=True, index=False) / MB, 3),
+            "backing": backing,
+        })
+    return rows
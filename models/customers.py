@@ -0,0 +1,158 @@
+import threading
+import numpy as np
+import pandas as pd
+
+# ==================== CUSTOMER EXPOSURE INDEX ====================
+#
+# One customer_name can carry many invoice cases. CustomerIndex maps every
+# customer to its cases and keeps per-customer totals next to it: invoice_amount,
+# expected_recovery, case and open-case counts, open disputes and case counts per
+# risk level (the worst risk level is the highest one with a case). Customer
+# questions ("exposure to X", "other open disputes for this customer") are then
+# dictionary lookups instead of a scan and groupby over the book.
+#
+# sync(df) keeps the index current incrementally: cases are diffed against the
+# previous sync (vectorized) and only new, changed or removed ones have their old
+# contribution subtracted and the new one added.
+
+RISK_ORDER = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+TOTALS = ("invoice_amount", "expected_recovery", "cases", "open_cases", "open_disputes")
+_TRACKED = ["customer", "invoice_amount", "expected_recovery", "open", "open_dispute", "risk"]
+
+
+def _contributions(df):
+    """Per-case values the index adds up (index: case_id)"""
+    status = df["status"].to_numpy(dtype=object) if "status" in df.columns else np.full(len(df), None)
+    open_case = status != "CLOSED"
+    risk = pd.Categorical(df["risk_level"], categories=RISK_ORDER).codes if "risk_level" in df.columns \
+        else np.full(len(df), -1)
+    contributions = pd.DataFrame({
+        "customer": df["customer_name"].fillna("UNKNOWN").astype(str).to_numpy(dtype=object),
+        "invoice_amount": pd.to_numeric(df["invoice_amount"], errors="coerce").fillna(0).to_numpy(dtype=float),
+        "expected_recovery": pd.to_numeric(df["expected_recovery"], errors="coerce").fillna(0).to_numpy(dtype=float)
+        if "expected_recovery" in df.columns else np.zeros(len(df)),
+        "open": open_case,
+        "open_dispute": open_case & (df["dispute_status"].to_numpy(dtype=object) == "Open"),
+        "risk": np.asarray(risk, dtype=np.int64),
+    }, index=pd.Index(df["case_id"].to_numpy(), name="case_id"))
+    return contributions[~contributions.index.duplicated(keep="last")]
+
+
+class CustomerIndex:
+    def __init__(self, df=None):
+        self.data_version = None
+        self._codes = {}  # customer -> row in the total arrays
+        self._names = []
+        self._cases = []  # per code: set of case_ids
+        self._totals = np.zeros((0, len(TOTALS)))  # columns: TOTALS
+        self._risk_counts = np.zeros((0, len(RISK_ORDER)), dtype=np.int64)
+        self._synced = pd.DataFrame(columns=_TRACKED)
+        self._lock = threading.RLock()
+        if df is not None:
+            self.sync(df)
+
+    def _code_array(self, customers):
+        """Codes of `customers`, adding new ones (and growing the arrays)"""
+        for customer in pd.unique(customers):
+            if customer not in self._codes:
+                self._codes[customer] = len(self._names)
+                self._names.append(customer)
+                self._cases.append(set())
+        grow = len(self._names) - len(self._totals)
+        if grow > 0:
+            self._totals = np.vstack([self._totals, np.zeros((grow, self._totals.shape[1]))])
+            self._risk_counts = np.vstack([self._risk_counts, np.zeros((grow, len(RISK_ORDER)), dtype=np.int64)])
+        return np.fromiter((self._codes[customer] for customer in customers), dtype=np.int64, count=len(customers))
+
+    def _add(self, rows, sign):
+        if rows.empty:
+            return
+        codes = self._code_array(rows["customer"].to_numpy())
+        values = np.column_stack([
+            rows["invoice_amount"].to_numpy(dtype=float),
+            rows["expected_recovery"].to_numpy(dtype=float),
+            np.ones(len(rows)),
+            rows["open"].to_numpy(dtype=float),
+            rows["open_dispute"].to_numpy(dtype=float),
+        ])
+        np.add.at(self._totals, codes, sign * values)
+        risk = rows["risk"].to_numpy(dtype=np.int64)
+        rated = risk >= 0
+        np.add.at(self._risk_counts, (codes[rated], risk[rated]), sign)
+        members = self._cases
+        if sign > 0:
+            for code, case_id in zip(codes, rows.index):
+                members[code].add(case_id)
+        else:
+            for code, case_id in zip(codes, rows.index):
+                members[code].discard(case_id)
+
+    def sync(self, df, data_version=None):
+        """Bring the index up to date with `df`; returns the number of cases re-counted"""
+        with self._lock:
+            if data_version is not None and data_version == self.data_version:
+                return 0
+            current = _contributions(df)
+            previous = self._synced.reindex(current.index)
+            changed = np.zeros(len(current), dtype=bool)
+            for column in _TRACKED:
+                changed |= previous[column].to_numpy() != current[column].to_numpy()
+            removed = self._synced.index.difference(current.index)
+            stale = self._synced.index.isin(removed) | self._synced.index.isin(current.index[changed])
+            self._add(self._synced[stale], -1)
+            self._add(current[changed], +1)
+            self._synced = current
+            self.data_version = data_version
+            return int(changed.sum() + len(removed))
+
+    def exposure(self, customer):
+        """Totals for one customer (None if unknown). O(1)"""
+        with self._lock:
+            code = self._codes.get(customer)
+            if code is None or not self._cases[code]:
+                return None
+            invoice, expected, cases, open_cases, open_disputes = self._totals[code]  # TOTALS order
+            rated = np.flatnonzero(self._risk_counts[code])
+            return {
+                "customer_name": customer,
+                "cases": int(cases),
+                "open_cases": int(open_cases),
+                "open_disputes": int(open_disputes),
+                "invoice_amount": float(invoice),
+                "expected_recovery": float(expected),
+                "worst_risk_level": RISK_ORDER[rated[-1]] if len(rated) else None,
+            }
+
+    def cases(self, customer):
+        """case_ids of one customer"""
+        with self._lock:
+            code = self._codes.get(customer)
+            return sorted(self._cases[code]) if code is not None else []
+
+    def per_case(self, df, total):
+        """Customer total `total` ("open_disputes", "invoice_amount", ...) for each row of `df`"""
+        column = TOTALS.index(total)
+        with self._lock:
+            codes = df["customer_name"].fillna("UNKNOWN").astype(str).map(self._codes)
+            values = self._totals[codes.fillna(0).to_numpy(dtype=np.int64), column]
+        values[codes.isna().to_numpy()] = 0
+        return values
+
+    def top(self, k=20, by="invoice_amount"):
+        """Largest `k` customers by a total, as a frame"""
+        column = TOTALS.index(by)
+        with self._lock:
+            order = np.argsort(-self._totals[:, column], kind="stable")[:k]
+            return pd.DataFrame([self.exposure(self._names[code]) for code in order
+                                 if self._totals[code, TOTALS.index("cases")] > 0])
+
+
+_index = CustomerIndex()
+
+
+def get_customer_index(df=None, data_version=None):
+    """Process-wide customer index, synced to `df` when a new data version is passed"""
+    if df is not None:
+        _index.sync(df, data_version)
+    return _index
+
@@ -0,0 +1,134 @@
+from collections import OrderedDict
+import pandas as pd
+from models.rules import get_compiled_ruleset, model_version
+
+# ==================== DERIVED-COLUMN REGISTRY ====================
+#
+# Every derived column is declared once with the columns it reads. A page asks
+# for the columns it needs; the resolver walks the dependency graph, computes
+# only what is missing, in dependency order, and memoizes each column once per
+# data version (shared by every session in the process).
+#
+# Scoring outputs are registered straight from the compiled ruleset, so the graph
+# always matches models/scoring_rules.json.
+
+_REGISTRY = {}
+_registered_ruleset = {"version": None}
+_memo = OrderedDict()
+MAX_MEMO_VERSIONS = 4
+
+
+def register_column(name, inputs, compute):
+    """Declare a derived column: compute(columns) -> array, where columns[name] reads an input"""
+    _REGISTRY[name] = {"inputs": list(inputs), "compute": compute}
+
+
+def derived_column(name, inputs):
+    """Decorator form of register_column"""
+    def decorator(compute):
+        register_column(name, inputs, compute)
+        return compute
+    return decorator
+
+
+def _register_ruleset(compiled):
+    """(Re-)register ruleset outputs; a no-op if this ruleset is already registered"""
+    version = model_version(compiled)
+    if _registered_ruleset["version"] == version:
+        return
+    for name, evaluate in compiled.outputs:
+        def compute(columns, evaluate=evaluate):
+            return evaluate(columns.frame, columns)
+        register_column(name, compiled.dependencies[name], compute)
+    _registered_ruleset["version"] = version
+
+
+def resolution_order(names):
+    """Derived columns needed for `names`, dependencies first"""
+    _register_ruleset(get_compiled_ruleset())
+    order, visiting = [], set()
+
+    def visit(name):
+        if name in order or name not in _REGISTRY:
+            return
+        if name in visiting:
+            raise ValueError(f"Derived column cycle at {name}")
+        visiting.add(name)
+        for dependency in _REGISTRY[name]["inputs"]:
+            visit(dependency)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order
+
+
+class _Columns(dict):
+    """Resolved derived columns, falling back to the frame for raw inputs"""
+
+    def __init__(self, frame, resolved):
+        super().__init__(resolved)
+        self.frame = frame
+
+    def __missing__(self, name):
+        return self.frame[name].to_numpy()
+
+
+def resolve_columns(df, names, data_version=None, trust_existing=False):
+    """
+    Compute the derived columns in `names` (plus their dependencies) at most once
+    per data version. Returns {name: ndarray} for the requested names.
+    trust_existing=True reuses derived columns already on the frame (e.g. a scored
+    snapshot) instead of recomputing them
+    """
+    _register_ruleset(get_compiled_ruleset())
+    if data_version is not None:
+        key = (data_version, model_version(get_compiled_ruleset()), len(df))
+        memo = _memo.setdefault(key, {})
+        _memo.move_to_end(key)
+        while len(_memo) > MAX_MEMO_VERSIONS:
+            _memo.popitem(last=False)
+    else:
+        memo = {}
+
+    columns = _Columns(df, memo)
+    for name in resolution_order(names):
+        if name in memo:
+            continue
+        if trust_existing and name in df.columns:
+            memo[name] = df[name].to_numpy()
+        else:
+            memo[name] = _REGISTRY[name]["compute"](columns)
+        columns[name] = memo[name]
+
+    return {name: columns[name] for name in names}
+
+
+def with_columns(df, names, data_version=None, trust_existing=False):
+    """Shallow copy of `df` with the requested derived columns attached"""
+    resolved = resolve_columns(df, names, data_version, trust_existing)
+    view = df.copy(deep=False)
+    for name, values in resolved.items():
+        view[name] = values
+    return view
+
+
+# ==================== PRESENTATION BUCKETS ====================
+
+@derived_column("recovery_bucket", ["recovery_probability"])
+def _recovery_bucket(columns):
+    return pd.cut(columns["recovery_probability"], bins=[0, 25, 50, 75, 100],
+                  labels=["Low (0-25%)", "Medium (25-50%)", "High (50-75%)", "Very High (75-100%)"])
+
+
+@derived_column("probability_band", ["recovery_probability"])
+def _probability_band(columns):
+    return pd.cut(columns["recovery_probability"], bins=[0, 20, 40, 60, 80, 100],
+                  labels=["0-20%", "20-40%", "40-60%", "60-80%", "80-100%"])
+
+
+@derived_column("followup_bucket", ["optimal_followup_days"])
+def _followup_bucket(columns):
+    return pd.cut(columns["optimal_followup_days"], bins=[0, 3, 7, 14, 100],
+                  labels=["Urgent ≤3d", "Weekly 4-7d", "Bi-weekly 8-14d", "Monthly >14d"])
@@ -0,0 +1,298 @@
+import os
+import json
+import hashlib
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+# ==================== DECLARATIVE SCORING RULESET ====================
+#
+# The scoring model lives in models/scoring_rules.json: every weight, band and
+# condition is data. A ruleset is compiled once into a list of vectorized NumPy
+# evaluators (one per output column) and cached by the hash of its content, so
+# tuning the file never needs a code change and scoring never interprets rules
+# row by row.
+#
+# The evaluators keep the semantics of the row-wise model they replaced: an input
+# `absent` from the frame takes that value (like row.get(column, default)) while
+# a missing value stays NaN, clip behaves like max(lo, min(x, hi)) (NaN clips to
+# lo).
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scoring_rules.json")
+
+# Bump when the compiler's semantics change, so results cached under an
+# unchanged ruleset file are still invalidated
+ENGINE_VERSION = "2"
+
+CompiledRuleset = namedtuple("CompiledRuleset", ["version", "hash", "outputs", "inputs", "dependencies",
+                                                 "numeric_inputs", "required_inputs"])
+
+_COMPILED_CACHE = {}
+_FILE_CACHE = {}  # path -> (mtime_ns, compiled)
+
+_OPERATORS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+def ruleset_hash(ruleset):
+    """Stable content hash of a ruleset (key order and whitespace independent)"""
+    canonical = json.dumps(ruleset, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def load_ruleset(path=DEFAULT_RULES_PATH):
+    """Read a ruleset file"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ==================== COMPILATION ====================
+
+def _column_reader(spec, numeric):
+    """
+    Build a reader for a term/condition input column.
+    `fill` replaces both an absent column and missing values; `absent` only an
+    absent column
+    """
+    column = spec["column"]
+    fill = spec.get("fill")
+    absent = spec.get("absent", fill)
+
+    def read(frame):
+        if column in frame:
+            values = frame[column]
+            if fill is not None:
+                values = values.fillna(fill)
+        else:
+            values = pd.Series(np.nan if absent is None else absent, index=frame.index)
+        if numeric:
+            return pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+        return values.to_numpy(dtype=object)
+
+    return read
+
+
+def _compile_term(spec, identity):
+    """Compile one term into a frame -> ndarray function"""
+    kind = spec["type"]
+    weight = spec.get("weight", 1)
+
+    if kind == "column":
+        read = _column_reader(spec, numeric=True)
+        return lambda frame, columns: _resolve(spec, read, frame, columns) * weight
+
+    if kind == "exp_decay":
+        read = _column_reader(spec, numeric=True)
+        rate = spec["rate"]
+        return lambda frame, columns: np.exp(-rate * _resolve(spec, read, frame, columns)) * weight
+
+    if kind == "linear":
+        read = _column_reader(spec, numeric=True)
+        intercept = spec.get("intercept", 0)
+        slope = spec.get("slope", 1)
+        divisor = spec.get("divisor", 1)
+        lo, hi = spec.get("clip", [None, None])
+
+        def linear(frame, columns):
+            value = intercept + slope * (_resolve(spec, read, frame, columns) / divisor)
+            return _clip(value, lo, hi) * weight
+        return linear
+
+    if kind == "lookup":
+        read = _column_reader(spec, numeric=False)
+        table = spec["values"]
+        default = spec.get("default", 0)
+        offset = spec.get("offset", 0)
+
+        def lookup(frame, columns):
+            keys = pd.Series(_resolve(spec, read, frame, columns))
+            mapped = keys.map(table).fillna(default).to_numpy(dtype=np.float64)
+            return (mapped + offset) * weight
+        return lookup
+
+    if kind == "bands":
+        read = _column_reader(spec, numeric=True)
+        # Bands are checked in order; the first threshold exceeded wins
+        thresholds = [band["above"] for band in spec["bands"]]
+        values = [band["value"] for band in spec["bands"]]
+        default = spec.get("default", identity)
+
+        def bands(frame, columns):
+            x = _resolve(spec, read, frame, columns)
+            return np.select([x > t for t in thresholds], values, default) * weight
+        return bands
+
+    raise ValueError(f"Unknown term type: {kind}")
+
+
+def _clip(values, lo, hi):
+    """max(lo, min(x, hi)) elementwise: like np.clip, but NaN becomes lo (when given)"""
+    if lo is None and hi is None:
+        return values
+    clipped = np.clip(values, lo, hi)
+    return clipped if lo is None else np.where(np.isnan(values), lo, clipped)
+
+
+def _resolve(spec, read, frame, columns):
+    """Prefer an output computed earlier in this evaluation over the raw frame column"""
+    column = spec["column"]
+    if column in columns:
+        return columns[column]
+    return read(frame)
+
+
+def _compile_conditions(conditions):
+    """Compile an all-of condition list into a frame -> bool ndarray function"""
+    compiled = []
+    for cond in conditions:
+        op = _OPERATORS[cond["op"]]
+        numeric = not isinstance(cond["value"], str)
+        compiled.append((cond, _column_reader(cond, numeric=numeric), op, cond["value"]))
+
+    def evaluate(frame, columns):
+        mask = np.ones(len(frame), dtype=bool)
+        for cond, read, op, value in compiled:
+            x = _resolve(cond, read, frame, columns)
+            mask &= np.asarray(op(x, value), dtype=bool)
+        return mask
+
+    return evaluate
+
+
+def _compile_output(name, spec):
+    """Compile one output column specification"""
+    combine = spec["combine"]
+
+    if combine == "rules":
+        rules = [(_compile_conditions(rule["when"]), rule["value"]) for rule in spec["rules"]]
+        default = spec.get("default")
+
+        def evaluate_rules(frame, columns):
+            conditions = [when(frame, columns) for when, _ in rules]
+            return np.select(conditions, [value for _, value in rules], default).astype(object)
+        return evaluate_rules
+
+    if combine not in ("sum", "product"):
+        raise ValueError(f"Unknown combine mode for {name}: {combine}")
+
+    identity = 0 if combine == "sum" else 1
+    base = spec.get("base", identity)
+    terms = [_compile_term(term, identity) for term in spec.get("terms", [])]
+    lo, hi = spec.get("clip", [None, None])
+    digits = spec.get("round")
+    overrides = [(_compile_conditions(o["when"]), o["value"]) for o in spec.get("overrides", [])]
+    as_int = spec.get("dtype") == "int"
+
+    def evaluate(frame, columns):
+        total = np.full(len(frame), base, dtype=np.float64)
+        for term in terms:
+            # Accumulate in declaration order so results match the row-wise model
+            total = total + term(frame, columns) if combine == "sum" else total * term(frame, columns)
+        total = _clip(total, lo, hi)
+        if digits is not None:
+            total = np.round(total, digits)
+        for when, value in overrides:
+            total = np.where(when(frame, columns), value, total)
+        return total.astype(np.int64) if as_int else total
+
+    return evaluate
+
+
+def _referenced_columns(spec):
+    """Every column an output specification reads"""
+    referenced = set()
+    for term in spec.get("terms", []):
+        referenced.add(term["column"])
+    for rule in spec.get("rules", []) + spec.get("overrides", []):
+        referenced.update(cond["column"] for cond in rule["when"])
+    return sorted(referenced)
+
+
+def _numeric_columns(spec):
+    """Columns an output specification reads as numbers"""
+    numeric = {term["column"] for term in spec.get("terms", []) if term["type"] != "lookup"}
+    for rule in spec.get("rules", []) + spec.get("overrides", []):
+        numeric.update(cond["column"] for cond in rule["when"] if not isinstance(cond["value"], str))
+    return numeric
+
+
+def _required_columns(spec):
+    """Numeric columns an output specification reads somewhere without a `fill` or `absent` default"""
+    reads = [term for term in spec.get("terms", []) if term["type"] != "lookup"]
+    for rule in spec.get("rules", []) + spec.get("overrides", []):
+        reads.extend(cond for cond in rule["when"] if not isinstance(cond["value"], str))
+    return {read["column"] for read in reads if read.get("fill") is None and read.get("absent") is None}
+
+
+def _input_columns(dependencies):
+    """Raw frame columns the ruleset reads (outputs it computes itself excluded)"""
+    referenced = set()
+    for columns in dependencies.values():
+        referenced.update(columns)
+    return sorted(referenced - set(dependencies))
+
+
+def compile_ruleset(ruleset):
+    """
+    Compile a ruleset into vectorized evaluators.
+    Compilation is cached by ruleset hash, so repeated calls are free
+    """
+    key = ruleset_hash(ruleset)
+    if key not in _COMPILED_CACHE:
+        outputs = [(name, _compile_output(name, spec)) for name, spec in ruleset["outputs"].items()]
+        dependencies = {name: _referenced_columns(spec) for name, spec in ruleset["outputs"].items()}
+        inputs = _input_columns(dependencies)
+        numeric = set().union(*(_numeric_columns(spec) for spec in ruleset["outputs"].values()))
+        required = set().union(*(_required_columns(spec) for spec in ruleset["outputs"].values()))
+        _COMPILED_CACHE[key] = CompiledRuleset(
+            ruleset.get("version", "0"), key, outputs, inputs, dependencies, sorted(numeric & set(inputs)),
+            sorted(required & set(inputs))
+        )
+    return _COMPILED_CACHE[key]
+
+
+def get_compiled_ruleset(path=DEFAULT_RULES_PATH):
+    """Load and compile the ruleset at `path`; the file is only reread when its mtime changes"""
+    mtime_ns = os.stat(path).st_mtime_ns
+    cached = _FILE_CACHE.get(path)
+    if cached is None or cached[0] != mtime_ns:
+        cached = _FILE_CACHE[path] = (mtime_ns, compile_ruleset(load_ruleset(path)))
+    return cached[1]
+
+
+def model_version(compiled):
+    """Identifier that changes whenever scores for the same inputs could change"""
+    return f"{ENGINE_VERSION}:{compiled.version}:{compiled.hash}"
+
+
+def _needed_outputs(compiled, outputs):
+    """`outputs` plus the outputs they read, transitively"""
+    needed, pending = set(), list(outputs)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(column for column in compiled.dependencies[name] if column in compiled.dependencies)
+    return needed
+
+
+def evaluate_ruleset(compiled, frame, outputs=None):
+    """
+    Evaluate compiled outputs over a frame in one vectorized pass.
+    Returns {column: ndarray} in ruleset order; `outputs` limits what is
+    evaluated (those and the outputs they read) and returned
+    """
+    needed = None if outputs is None else _needed_outputs(compiled, outputs)
+    columns = {}
+    for name, evaluate in compiled.outputs:
+        if needed is None or name in needed:
+            columns[name] = evaluate(frame, columns)
+    if outputs is not None:
+        return {name: columns[name] for name in outputs}
+    return columns
@@ -0,0 +1,90 @@
+import os
+import numpy as np
+import pandas as pd
+from models.rules import get_compiled_ruleset, model_version
+from models.derived import resolve_columns
+from models.scoring import SCORED_COLUMNS
+
+# ==================== PERSISTENT SCORE CACHE ====================
+#
+# Derived score columns are stored on disk keyed by a 64-bit hash of each case's
+# scoring inputs. The file header records the scoring model version; a version
+# mismatch discards every entry, so a ruleset change can never serve stale scores.
+
+SCORE_CACHE_PATH = "data/score_cache.pkl"
+
+
+def compute_input_keys(df, input_columns):
+    """Per-row uint64 hash of the scoring inputs present in the frame"""
+    present = [c for c in input_columns if c in df.columns]
+    if not present:
+        return np.zeros(len(df), dtype=np.uint64)
+    return pd.util.hash_pandas_object(df[present], index=False).to_numpy(dtype=np.uint64)
+
+
+def load_score_cache(path, version):
+    """
+    Load cached scores for `version`.
+    Returns an empty frame if the file is missing, unreadable or from another model
+    """
+    empty = pd.DataFrame(columns=SCORED_COLUMNS, index=pd.Index([], dtype=np.uint64))
+    if not os.path.exists(path):
+        return empty
+    try:
+        payload = pd.read_pickle(path)
+    except Exception:
+        return empty
+    if payload.get("model_version") != version:
+        return empty
+    return payload["scores"]
+
+
+def save_score_cache(path, version, scores):
+    """Atomically replace the cache file"""
+    tmp_path = f"{path}.tmp"
+    pd.to_pickle({"model_version": version, "scores": scores}, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def apply_scoring_cached(df, cache_path=SCORE_CACHE_PATH):
+    """
+    Same result as apply_scoring(df), but only rows whose scoring inputs (or the
+    model version) changed since the last run are actually scored
+    """
+    compiled = get_compiled_ruleset()
+    version = model_version(compiled)
+    keys = compute_input_keys(df, compiled.inputs)
+
+    cache = load_score_cache(cache_path, version)
+    positions = cache.index.get_indexer(keys) if len(cache) else np.full(len(df), -1)
+    hit = positions >= 0
+    miss_rows = np.flatnonzero(~hit)
+
+    scored = {}
+    if hit.any():
+        for column in SCORED_COLUMNS:
+            values = cache[column].to_numpy()
+            scored[column] = np.empty(len(df), dtype=values.dtype)
+            scored[column][hit] = values[positions[hit]]
+
+    if len(miss_rows):
+        fresh = resolve_columns(df.iloc[miss_rows], SCORED_COLUMNS)
+        for column in SCORED_COLUMNS:
+            if column not in scored:
+                scored[column] = np.empty(len(df), dtype=fresh[column].dtype)
+            scored[column][miss_rows] = fresh[column]
+
+    for column in SCORED_COLUMNS:
+        df[column] = scored[column]
+
+    if len(miss_rows) or not cache.index.isin(keys).all():
+        # Keep only entries for the current book so the cache cannot grow unbounded
+        entries = pd.DataFrame({c: df[c].to_numpy() for c in SCORED_COLUMNS},
+                               index=pd.Index(keys, dtype=np.uint64))
+        entries = entries[~entries.index.duplicated()]
+        try:
+            save_score_cache(cache_path, version, entries)
+        except OSError:
+            pass
+
+    return df
@@ -1,81 +1,41 @@
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
+from models.rules import get_compiled_ruleset, evaluate_ruleset
+from models.derived import resolve_columns
+
+SCORED_COLUMNS = [
+    "sla_status",
+    "recovery_score",
+    "recovery_probability",
+    "priority_score",
+    "expected_recovery",
+    "churn_risk",
+    "optimal_followup_days",
+    "ai_next_action",
+    "risk_level",
+]
 
 # ==================== ADVANCED ML SCORING ====================
 
+def _score_row(row, output):
+    """Evaluate one ruleset output (and the outputs it reads) for a single case (dict or Series)"""
+    frame = pd.DataFrame([dict(row)])
+    value = evaluate_ruleset(get_compiled_ruleset(), frame, outputs=[output])[output][0]
+    return value.item() if hasattr(value, "item") else value
+
+
 def compute_recovery_score(row):
     """
     Multi-factor recovery prediction model using weighted ML approach
     Factors: Ageing, Business Type, Dispute, DCA Performance, Payment History
+    Weights live in models/scoring_rules.json ("recovery_score")
     """
-    score = 0.5  # Base score
-    
-    # 1. AGEING DECAY (exponential decay - older cases lose value faster)
-    ageing_days = row["ageing_days"]
-    ageing_factor = np.exp(-0.015 * ageing_days) * 0.35
-    score += ageing_factor
-    
-    # 2. BUSINESS SEGMENT MULTIPLIER (enterprise vs SMB)
-    business_multiplier = {
-        "Enterprise": 1.25,
-        "Large": 1.10,
-        "Medium": 0.95,
-        "Small": 0.70
-    }
-    segment_boost = business_multiplier.get(row.get("business_type", "Medium"), 0.95) - 1
-    score += segment_boost * 0.15
-    
-    # 3. DISPUTE IMPACT (critical blocker)
-    if row.get("dispute_status") == "Open":
-        score -= 0.40
-    elif row.get("dispute_status") == "Resolved":
-        score += 0.10
-    elif row.get("dispute_status") == "Pending_Resolution":
-        score -= 0.20
-    
-    # 4. DCA RESPONSIVENESS (accountability metric)
-    last_update = row.get("last_dca_update_days", 30)
-    responsiveness = max(0, 1 - (last_update / 30)) * 0.20
-    score += responsiveness
-    
-    if last_update > 14:
-        score -= 0.15
-    
-    # 5. PAYMENT HISTORY (if available)
-    if "payment_history" in row and row["payment_history"] == "Good":
-        score += 0.15
-    elif "payment_history" in row and row["payment_history"] == "Bad":
-        score -= 0.20
-    
-    # 6. SLA BREACH PENALTY
-    if row.get("sla_status") == "BREACHED":
-        score -= 0.25
-    elif row.get("sla_status") == "AT_RISK":
-        score -= 0.10
-    
-    # 7. INVOICE AMOUNT NORMALIZATION (larger amounts = higher urgency)
-    invoice_normalized = min(row.get("invoice_amount", 100000) / 500000, 1.0)
-    score += invoice_normalized * 0.10
-    
-    # Normalize to 0-1 range with sigmoid-like scaling
-    final_score = max(0, min(score, 1.0))
-    return round(final_score, 3)
+    return _score_row(row, "recovery_score")
 
 
 def compute_recovery_probability(row):
     """Estimates actual recovery probability (0-100%)"""
-    base_probability = compute_recovery_score(row) * 100
-    
-    # Adjust based on ageing
-    if row["ageing_days"] > 180:
-        base_probability *= 0.6
-    elif row["ageing_days"] > 120:
-        base_probability *= 0.75
-    elif row["ageing_days"] > 60:
-        base_probability *= 0.9
-    
-    return round(base_probability, 1)
+    return _score_row(row, "recovery_probability")
 
 
 def compute_priority_score(row):
@@ -83,14 +43,7 @@ def compute_priority_score(row):
     Priority = Recovery Probability × Invoice Amount × Urgency Factor
     Higher score = Higher priority for DCA allocation
     """
-    recovery_prob = compute_recovery_score(row)
-    invoice_amount = row.get("invoice_amount", 100000)
-    
-    # Urgency increases with ageing
-    urgency = 1 + (row["ageing_days"] / 180)  # 1.0 to 2.0+ factor
-    
-    priority = recovery_prob * invoice_amount * urgency
-    return round(priority, 0)
+    return _score_row(row, "priority_score")
 
 
 def compute_dca_sla_deadline(case_date, case_type="standard"):
@@ -110,46 +63,14 @@ def compute_dca_sla_deadline(case_date, case_type="standard"):
 def next_best_action(row):
     """
     AI-driven action recommendation engine
+    Blocker checks first, then recovery-probability cut-offs ("ai_next_action" rules)
     """
-    # BLOCKER CHECKS
-    if row.get("dispute_status") == "Open":
-        return "🛑 Resolve Dispute First"
-    
-    if row.get("last_dca_update_days", 0) > 14:
-        return "⚠️ Auto-Escalate: DCA Unresponsive"
-    
-    if row.get("sla_status") == "BREACHED":
-        return "🚨 CRITICAL: SLA Breach - Manager Review"
-    
-    # RECOVERY PROBABILITY BASED ACTIONS
-    recovery_prob = compute_recovery_probability(row)
-    invoice_amount = row.get("invoice_amount", 0)
-    ageing_days = row.get("ageing_days", 0)
-    
-    # High-value escalations
-    if invoice_amount > 500000 and ageing_days > 90:
-        return "👨‍⚖️ Escalate to Legal Team"
-    
-    if invoice_amount > 250000 and recovery_prob < 30:
-        return "📋 Review for Settlement / Write-off"
-    
-    # Recovery probability driven actions
-    if recovery_prob > 80:
-        return "💪 Aggressive Follow-up - High Success Rate"
-    elif recovery_prob > 60:
-        return "📞 Priority Follow-up Campaign"
-    elif recovery_prob > 40:
-        return "✉️ Standard Collection Process"
-    elif recovery_prob > 20:
-        return "⏳ Nurture Phase - Periodic Contact"
-    else:
-        return "📊 Low Probability - Review Strategy"
+    return _score_row(row, "ai_next_action")
 
 
 def calculate_expected_recovery(row):
     """Expected recovery amount = Invoice × Recovery Probability"""
-    recovery_prob = compute_recovery_probability(row) / 100
-    return round(row.get("invoice_amount", 0) * recovery_prob, 2)
+    return _score_row(row, "expected_recovery")
 
 
 def compute_churn_risk(row):
@@ -159,44 +80,7 @@ def compute_churn_risk(row):
     Factors: Aging, dispute status, DCA inactivity, business type
     Returns: 0-100 (0=low risk, 100=high risk)
     """
-    churn_score = 0
-    
-    # AGING FACTOR (critical) - older cases have higher churn
-    ageing = row.get("ageing_days", 0)
-    if ageing > 180:
-        churn_score += 40
-    elif ageing > 120:
-        churn_score += 30
-    elif ageing > 60:
-        churn_score += 15
-    
-    # DISPUTE STATUS (major predictor)
-    if row.get("dispute_status") == "Open":
-        churn_score += 35
-    elif row.get("dispute_status") == "Pending_Resolution":
-        churn_score += 15
-    
-    # DCA INACTIVITY (indicates customer disengagement)
-    last_update = row.get("last_dca_update_days", 0)
-    if last_update > 21:
-        churn_score += 25
-    elif last_update > 14:
-        churn_score += 15
-    
-    # BUSINESS TYPE (SMB higher churn than Enterprise)
-    business_type = row.get("business_type", "Medium")
-    if business_type == "Small":
-        churn_score += 20
-    elif business_type == "Medium":
-        churn_score += 10
-    
-    # SLA STATUS
-    if row.get("sla_status") == "BREACHED":
-        churn_score += 20
-    
-    # NORMALIZE TO 0-100
-    churn_risk = min(max(churn_score, 0), 100)
-    return round(churn_risk, 1)
+    return _score_row(row, "churn_risk")
 
 
 def compute_optimal_followup_timing(row):
@@ -205,31 +89,7 @@ def compute_optimal_followup_timing(row):
     Based on aging pattern, recovery probability, and DCA activity
     Returns: Days until optimal follow-up
     """
-    recovery_prob = compute_recovery_probability(row)
-    ageing = row.get("ageing_days", 0)
-    last_update = row.get("last_dca_update_days", 0)
-    
-    # High probability cases: follow up faster
-    if recovery_prob > 75:
-        optimal_days = 3  # Aggressive 3-day cycle
-    elif recovery_prob > 60:
-        optimal_days = 5  # Medium-aggressive
-    elif recovery_prob > 40:
-        optimal_days = 7  # Weekly follow-ups
-    elif recovery_prob > 20:
-        optimal_days = 14  # Bi-weekly for low probability
-    else:
-        optimal_days = 30  # Monthly for very low probability
-    
-    # ADJUST for aging
-    if ageing > 150:
-        optimal_days = max(1, optimal_days - 2)  # Increase frequency
-    
-    # If DCA hasn't updated in a while, force immediate action
-    if last_update > 14:
-        optimal_days = 1
-    
-    return optimal_days
+    return _score_row(row, "optimal_followup_days")
 
 
 def get_predictive_insights(row):
@@ -290,33 +150,44 @@ def compute_dca_efficiency_score(dca_cases_df):
     return round(efficiency, 1)
 
 
+def dca_scorecard(df):
+    """Per-DCA portfolio, expected recovery, ageing, recovery probability and SLA compliance"""
+    dca_perf = df.groupby("assigned_dca").agg({
+        "case_id": "count",
+        "invoice_amount": "sum",
+        "expected_recovery": "sum",
+        "ageing_days": "mean",
+        "recovery_probability": "mean",
+        "sla_status": lambda x: (x == "OK").sum()
+    }).rename(columns={
+        "case_id": "Cases Assigned",
+        "invoice_amount": "Total Portfolio",
+        "expected_recovery": "Expected Recovery",
+        "ageing_days": "Avg Ageing",
+        "recovery_probability": "Avg Recovery Prob",
+        "sla_status": "SLA Compliant"
+    })
+    dca_perf["Recovery Efficiency %"] = (dca_perf["Expected Recovery"] / dca_perf["Total Portfolio"] * 100).round(1)
+    return dca_perf.round(2)
+
+
 def risk_assessment(row):
     """
     Risk categorization for portfolio management
-    HIGH: >120 days ageing + open disputes
+    CRITICAL: >120 days ageing + open disputes
+    HIGH: >120 days ageing
     MEDIUM: 60-120 days
     LOW: <60 days
     """
-    ageing = row.get("ageing_days", 0)
-    
-    if ageing > 120 and row.get("dispute_status") == "Open":
-        return "CRITICAL"
-    elif ageing > 120:
-        return "HIGH"
-    elif ageing > 60:
-        return "MEDIUM"
-    else:
-        return "LOW"
+    return _score_row(row, "risk_level")
 
 
 def apply_scoring(df):
-    """Apply all ML scoring models to dataframe"""
-    df["recovery_score"] = df.apply(compute_recovery_score, axis=1)
-    df["recovery_probability"] = df.apply(compute_recovery_probability, axis=1)
-    df["priority_score"] = df.apply(compute_priority_score, axis=1)
-    df["expected_recovery"] = df.apply(calculate_expected_recovery, axis=1)
-    df["churn_risk"] = df.apply(compute_churn_risk, axis=1)
-    df["optimal_followup_days"] = df.apply(compute_optimal_followup_timing, axis=1)
-    df["ai_next_action"] = df.apply(next_best_action, axis=1)
-    df["risk_level"] = df.apply(risk_assessment, axis=1)
+    """
+    Apply all ML scoring models to dataframe
+    Columns are resolved through the derived-column graph, vectorized over the whole frame
+    """
+    scored = resolve_columns(df, SCORED_COLUMNS)
+    for column in SCORED_COLUMNS:
+        df[column] = scored[column]
     return df
@@ -0,0 +1,159 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+# ==================== MONTE CARLO RECOVERY SIMULATION ====================
+#
+# Scenario ranges are fanned out over a process pool (n_jobs, default: every
+# core). 10k scenarios over 1M cases take about 75 s on one core, so the
+# under-a-minute target for that size needs at least two cores; smaller books
+# scale linearly in cases x scenarios.
+
+DEFAULT_PERCENTILES = (5, 50, 95)
+DEFAULT_GROUPS = ("assigned_dca", "risk_level")
+
+# Block sizes bound the size of the scenario x case draw matrix that exists at any
+# one time (256 x 32768 float32 uniforms ~ 32 MB, plus the float64 hits ~ 64 MB);
+# the full matrix is never built.
+SCENARIO_BLOCK = 256
+CASE_CHUNK = 32768
+
+
+def _prepare_cells(df, group_by):
+    """
+    Sort cases by the joint group key so each chunk splits into contiguous cell segments.
+    Returns sorted probabilities, amounts, cell codes and the cell -> group labels
+    """
+    probability = (df["recovery_probability"].to_numpy(dtype=np.float64) / 100).clip(0, 1)
+    amount = df["invoice_amount"].to_numpy(dtype=np.float64)
+
+    if group_by:
+        grouper = df.groupby(list(group_by), sort=True, dropna=False)
+        cell_codes = grouper.ngroup().to_numpy()
+        cells = grouper.size().index.to_frame(index=False)
+    else:
+        cell_codes = np.zeros(len(df), dtype=np.int64)
+        cells = pd.DataFrame(index=[0])
+
+    order = np.argsort(cell_codes, kind="stable")
+    return (probability[order].astype(np.float32), amount[order],
+            cell_codes[order].astype(np.int64), cells)
+
+
+def _simulate_block(args):
+    """
+    Worker: simulate `n_scenarios` portfolio draws and return per-cell totals.
+    Cases are walked in chunks and scenarios in blocks so memory stays bounded
+    """
+    probability, amount, cell_codes, n_cells, n_scenarios, seed, outcome, concentration = args
+    rng = np.random.default_rng(seed)
+    totals = np.zeros((n_scenarios, n_cells), dtype=np.float64)
+
+    if outcome == "beta":
+        # Partial recovery: recovered fraction ~ Beta with mean = recovery probability
+        p = np.clip(probability.astype(np.float64), 1e-6, 1 - 1e-6)
+        alpha = p * concentration
+        beta = (1 - p) * concentration
+
+    for start in range(0, len(probability), CASE_CHUNK):
+        stop = min(start + CASE_CHUNK, len(probability))
+        codes = cell_codes[start:stop]
+        # Boundaries of each cell inside this (sorted) chunk
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        chunk_cells = codes[starts]
+        ends = np.r_[starts[1:], len(codes)]
+        chunk_amount = amount[start:stop]
+
+        for s0 in range(0, n_scenarios, SCENARIO_BLOCK):
+            s1 = min(s0 + SCENARIO_BLOCK, n_scenarios)
+            shape = (s1 - s0, stop - start)
+            if outcome == "beta":
+                recovered = rng.beta(alpha[start:stop], beta[start:stop], size=shape) * chunk_amount
+                totals[s0:s1, chunk_cells] += np.add.reduceat(recovered, starts, axis=1)
+                continue
+
+            # Sums of large amounts lose cents in float32: the hits are summed in float64
+            hits = (rng.random(shape, dtype=np.float32) < probability[start:stop]).astype(np.float64)
+            # One BLAS matrix-vector product per cell segment instead of a
+            # materialized amount matrix
+            for cell, a, b in zip(chunk_cells, starts, ends):
+                totals[s0:s1, cell] += hits[:, a:b] @ chunk_amount[a:b]
+
+    return totals
+
+
+def simulate_recovery_scenarios(df, n_scenarios=10000, group_by=DEFAULT_GROUPS,
+                                outcome="bernoulli", concentration=20.0,
+                                n_jobs=None, seed=42):
+    """
+    Draw portfolio recovery scenarios from per-case recovery probabilities.
+    outcome="bernoulli": each case is fully recovered or not at all
+    outcome="beta": each case recovers a Beta-distributed fraction of its invoice
+    Returns (cell_totals, cells): a scenarios x cells matrix of recovered amounts
+    and a frame describing the group values of each cell
+    """
+    if outcome not in ("bernoulli", "beta"):
+        raise ValueError(f"Unknown outcome model: {outcome}")
+
+    group_by = tuple(group_by or ())
+    probability, amount, cell_codes, cells = _prepare_cells(df, group_by)
+    n_cells = len(cells)
+
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, -(-n_scenarios // SCENARIO_BLOCK)))
+
+    # Independent, reproducible streams per worker
+    seeds = np.random.SeedSequence(seed).spawn(n_jobs)
+    splits = np.array_split(np.arange(n_scenarios), n_jobs)
+    tasks = [
+        (probability, amount, cell_codes, n_cells, len(split), child, outcome, concentration)
+        for split, child in zip(splits, seeds)
+    ]
+
+    if n_jobs == 1 or len(probability) == 0:
+        parts = [_simulate_block(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(_simulate_block, tasks))
+
+    return np.vstack(parts), cells
+
+
+def summarize_scenarios(cell_totals, cells, group_by=DEFAULT_GROUPS,
+                        percentiles=DEFAULT_PERCENTILES):
+    """
+    Collapse per-cell scenario totals into percentile bands for the whole
+    portfolio and for each grouping column (e.g. per DCA, per risk_level)
+    """
+    rows = []
+
+    def add_rows(level, group, scenario_totals):
+        bands = np.percentile(scenario_totals, percentiles)
+        row = {"level": level, "group": group, "mean": round(float(scenario_totals.mean()), 2)}
+        for q, value in zip(percentiles, bands):
+            row[f"p{q}"] = round(float(value), 2)
+        rows.append(row)
+
+    add_rows("portfolio", "ALL", cell_totals.sum(axis=1))
+
+    for column in group_by:
+        for value, cell_index in cells.groupby(column, dropna=False).groups.items():
+            add_rows(column, value, cell_totals[:, list(cell_index)].sum(axis=1))
+
+    return pd.DataFrame(rows)
+
+
+def simulate_portfolio_recovery(df, n_scenarios=10000, group_by=DEFAULT_GROUPS,
+                                percentiles=DEFAULT_PERCENTILES, outcome="bernoulli",
+                                concentration=20.0, n_jobs=None, seed=42):
+    """
+    Monte Carlo recovery distribution for a scored portfolio
+    Returns one row per portfolio / group with mean and P5/P50/P95 recovery
+    """
+    cell_totals, cells = simulate_recovery_scenarios(
+        df, n_scenarios=n_scenarios, group_by=group_by, outcome=outcome,
+        concentration=concentration, n_jobs=n_jobs, seed=seed
+    )
+    return summarize_scenarios(cell_totals, cells, group_by=group_by, percentiles=percentiles)
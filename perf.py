@@ -0,0 +1,189 @@
+import os
+import json
+import bisect
+import threading
+import functools
+from collections import deque
+from datetime import datetime
+from time import perf_counter
+
+# ==================== HOT-PATH TIMING INSTRUMENTATION ====================
+#
+# timed("stage") is a context manager, instrument("stage") a decorator and
+# start_timer("stage") / .stop() covers code that cannot be wrapped in a block.
+# Samples are aggregated in-process into fixed log-spaced latency histograms plus
+# a window of recent samples per stage, and optionally appended to a JSON-lines
+# file for offline analysis.
+#
+# Disabled (the default), every entry point is a flag check that returns a shared
+# no-op object. Enable with DCA_PERF=1 or set_enabled(True); DCA_PERF_LOG=<path>
+# (or set_log_path) turns on the JSON-lines sink.
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKET_BOUNDS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+RECENT_SAMPLES = 512
+
+_state = {
+    "enabled": os.environ.get("DCA_PERF", "0") == "1",
+    "log_path": os.environ.get("DCA_PERF_LOG") or None,
+    "log_file": None,
+}
+_stages = {}
+_lock = threading.Lock()
+
+
+def is_enabled():
+    return _state["enabled"]
+
+
+def set_enabled(enabled):
+    _state["enabled"] = bool(enabled)
+
+
+def set_log_path(path):
+    """Start (path) or stop (None) writing samples to a JSON-lines file"""
+    with _lock:
+        if _state["log_file"] is not None:
+            _state["log_file"].close()
+        _state["log_file"] = None
+        _state["log_path"] = path or None
+
+
+def _new_stage():
+    return {
+        "count": 0,
+        "total_ms": 0.0,
+        "min_ms": float("inf"),
+        "max_ms": 0.0,
+        "buckets": [0] * (len(BUCKET_BOUNDS_MS) + 1),
+        "recent": deque(maxlen=RECENT_SAMPLES),
+    }
+
+
+def record(stage, elapsed_ms):
+    """Add one latency sample for `stage`"""
+    with _lock:
+        stats = _stages.get(stage)
+        if stats is None:
+            stats = _stages[stage] = _new_stage()
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["min_ms"] = min(stats["min_ms"], elapsed_ms)
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["buckets"][bisect.bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+        stats["recent"].append(elapsed_ms)
+
+        if _state["log_path"]:
+            if _state["log_file"] is None:
+                _state["log_file"] = open(_state["log_path"], "a", encoding="utf-8", buffering=1)
+            _state["log_file"].write(json.dumps({
+                "ts": datetime.now().isoformat(),
+                "stage": stage,
+                "ms": round(elapsed_ms, 3),
+                "pid": os.getpid(),
+            }) + "\n")
+
+
+class _Timer:
+    """One running measurement; usable as a context manager or via stop()"""
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.started = perf_counter()
+
+    def stop(self):
+        if self.started is not None:
+            record(self.stage, (perf_counter() - self.started) * 1000)
+            self.started = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+class _NullTimer:
+    """Shared stand-in while instrumentation is disabled"""
+    __slots__ = ()
+
+    def stop(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timed(stage):
+    """with timed("chart.risk_pie"): ..."""
+    if not _state["enabled"]:
+        return _NULL_TIMER
+    return _Timer(stage)
+
+
+start_timer = timed
+
+
+def instrument(stage):
+    """Decorator; the enabled check happens per call so toggling works at runtime"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state["enabled"]:
+                return fn(*args, **kwargs)
+            with _Timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ==================== REPORTING ====================
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def stage_summary():
+    """One row per stage: count, mean/min/max and p50/p95/p99 over recent samples (ms)"""
+    with _lock:
+        snapshot = {stage: dict(stats, recent=list(stats["recent"])) for stage, stats in _stages.items()}
+
+    rows = []
+    for stage, stats in sorted(snapshot.items()):
+        rows.append({
+            "stage": stage,
+            "count": stats["count"],
+            "mean_ms": round(stats["total_ms"] / stats["count"], 3),
+            "min_ms": round(stats["min_ms"], 3),
+            "p50_ms": round(_percentile(stats["recent"], 50), 3),
+            "p95_ms": round(_percentile(stats["recent"], 95), 3),
+            "p99_ms": round(_percentile(stats["recent"], 99), 3),
+            "max_ms": round(stats["max_ms"], 3),
+            "total_ms": round(stats["total_ms"], 1),
+        })
+    return rows
+
+
+def stage_histogram(stage):
+    """[(bucket label, count)] for one stage's latency histogram"""
+    with _lock:
+        stats = _stages.get(stage)
+        counts = list(stats["buckets"]) if stats else [0] * (len(BUCKET_BOUNDS_MS) + 1)
+    labels = [f"≤{bound:g} ms" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]:g} ms"]
+    return list(zip(labels, counts))
+
+
+def reset():
+    with _lock:
+        _stages.clear()
@@ -0,0 +1,117 @@
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+# ==================== SERVICE THROUGHPUT BENCHMARK ====================
+#
+# Drives a running service (python -m service.server) with a request mix over
+# keep-alive connections and checks requests/sec against a target:
+#
+#   python -m service.bench [--url http://127.0.0.1:8765] [--clients 16]
+#                           [--seconds 10] [--target-rps 300]
+#
+# Exit status 1 if throughput is below the target or any request failed.
+# TARGET_RPS is for one server process with the default mix and 16 clients
+# sharing a single core with it; scale it with --processes and cores.
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+TARGET_RPS = 300
+SCORE_BATCH = 10
+
+# (weight, request factory) -> method, path, body
+_MIX = (
+    (4, lambda ids: ("GET", "/queue?k=30&risk_level=CRITICAL,HIGH", None)),
+    (4, lambda ids: ("GET", f"/cases/{quote(random.choice(ids))}", None)),
+    (1, lambda ids: ("GET", "/dca/scorecard", None)),
+    (1, lambda ids: ("POST", "/score", json.dumps({"cases": [
+        {"case_id": f"BENCH_{i}", "ageing_days": random.randint(1, 200),
+         "invoice_amount": random.randint(1_000, 5_000_000), "business_type": "Enterprise",
+         "dispute_status": "None", "last_dca_update_days": random.randint(0, 30)}
+        for i in range(SCORE_BATCH)
+    ]}))),
+)
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+def run(url=DEFAULT_URL, clients=16, seconds=10.0):
+    """Returns {"requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"}"""
+    parts = urlsplit(url)
+    probe = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    probe.request("GET", "/queue?k=1000")
+    ids = [case["case_id"] for case in json.loads(probe.getresponse().read())["cases"]]
+    probe.close()
+
+    weights = [weight for weight, _ in _MIX]
+    factories = [factory for _, factory in _MIX]
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        local, failed = [], 0
+        while time.perf_counter() < deadline:
+            method, path, body = random.choices(factories, weights)[0](ids)
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body, {"Content-Type": "application/json"} if body else {})
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+            local.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput benchmark for the DCA service")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--target-rps", type=float, default=TARGET_RPS)
+    args = parser.parse_args()
+
+    result = run(args.url, args.clients, args.seconds)
+    print(json.dumps(result))
+    ok = result["rps"] >= args.target_rps and result["errors"] == 0
+    print(f"{'OK' if ok else 'BELOW TARGET'}: {result['rps']} req/s (target {args.target_rps})")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import json
+import math
+import threading
+import time
+import numpy as np
+import pandas as pd
+from models.customers import CustomerIndex
+from models.derived import resolve_columns
+from models.rules import get_compiled_ruleset, model_version
+from models.scoring import SCORED_COLUMNS, dca_scorecard
+from storage.archive import query_cases
+from storage.portfolio import load_scored_data
+
+# ==================== SERVICE QUERIES ====================
+#
+# What the HTTP service answers, kept free of HTTP so it can be called and
+# benchmarked directly. A WarmPortfolio holds the scored book in memory (the
+# shared read-only snapshot, see storage/shared_store.py) together with indexes
+# built once per data version: the priority ranking, case_id -> row and the DCA
+# scorecard, plus a customer exposure index that is synced incrementally. The book is re-checked for a new version at most every
+# REFRESH_INTERVAL_S, so requests never reload or rescore it.
+
+REFRESH_INTERVAL_S = 1.0
+MAX_SCORE_BATCH = 10_000
+MAX_QUEUE_K = 1000
+QUEUE_FILTERS = ("risk_level", "sla_status", "status", "assigned_dca")
+
+
+class QueryError(ValueError):
+    """A request the service cannot answer (reported to the client as 4xx)"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class _Indexed:
+    """Scored book at one data version plus its lookup structures"""
+
+    def __init__(self, df, data_version):
+        self.df = df
+        self.data_version = data_version
+        self.ranking = np.argsort(-df["priority_score"].to_numpy(dtype=float), kind="stable")
+        # Last row wins for duplicate ids, as in storage.portfolio.case_version
+        self.positions = dict(zip(df["case_id"].to_numpy(), range(len(df))))
+        self.scorecard = dca_scorecard(df)
+
+
+class WarmPortfolio:
+    def __init__(self, refresh_interval=REFRESH_INTERVAL_S):
+        self.refresh_interval = refresh_interval
+        self._indexed = None
+        self._customers = CustomerIndex()
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self):
+        """Indexed book, reloaded only when the snapshot version changed"""
+        now = time.monotonic()
+        indexed = self._indexed
+        if indexed is not None and now - self._checked_at < self.refresh_interval:
+            return indexed
+        with self._lock:
+            if self._indexed is None or now - self._checked_at >= self.refresh_interval:
+                df, data_version = load_scored_data()
+                if self._indexed is None or data_version is None or data_version != self._indexed.data_version:
+                    self._indexed = _Indexed(df, data_version)
+                    self._customers.sync(df, data_version)
+                self._checked_at = time.monotonic()
+            return self._indexed
+
+    def health(self):
+        indexed = self.current()
+        return {
+            "status": "ok",
+            "cases": len(indexed.df),
+            "data_version": indexed.data_version,
+            "model_version": model_version(get_compiled_ruleset()),
+        }
+
+    def queue(self, k=30, min_recovery=None, **filters):
+        """Top `k` cases by priority score matching the filters (lists of allowed values)"""
+        if not 1 <= k <= MAX_QUEUE_K:
+            raise QueryError(f"k must be between 1 and {MAX_QUEUE_K}")
+        unknown = set(filters) - set(QUEUE_FILTERS)
+        if unknown:
+            raise QueryError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+        indexed = self.current()
+        df = indexed.df
+        matches = np.ones(len(df), dtype=bool)
+        for column, values in filters.items():
+            if values:
+                matches &= df[column].isin(values).to_numpy()
+        if min_recovery is not None:
+            matches &= df["recovery_probability"].to_numpy(dtype=float) >= min_recovery
+        rows = indexed.ranking[matches[indexed.ranking]]
+        return indexed.data_version, int(len(rows)), df.iloc[rows[:k]]
+
+    def case(self, case_id):
+        indexed = self.current()
+        position = indexed.positions.get(case_id)
+        if position is None:
+            # Closed cases live in the archive tier
+            archived = query_cases([case_id], hot=indexed.df.iloc[:0])
+            if archived.empty:
+                raise QueryError(f"Case not found: {case_id}", status=404)
+            return indexed.data_version, archived
+        return indexed.data_version, indexed.df.iloc[[position]]
+
+    def customer(self, customer_name):
+        """Exposure of one customer across its cases, with the case ids"""
+        data_version = self.current().data_version
+        exposure = self._customers.exposure(customer_name)
+        if exposure is None:
+            raise QueryError(f"Customer not found: {customer_name}", status=404)
+        return data_version, dict(exposure, case_ids=self._customers.cases(customer_name))
+
+    def scorecard(self, dca=None):
+        indexed = self.current()
+        scorecard = indexed.scorecard
+        if dca is not None:
+            if dca not in scorecard.index:
+                raise QueryError(f"DCA not found: {dca}", status=404)
+            scorecard = scorecard.loc[[dca]]
+        return indexed.data_version, scorecard.reset_index()
+
+
+def _check_cases(cases, compiled):
+    """Reject a case that is not an object or lacks a usable numeric scoring input, naming the field"""
+    for i, case in enumerate(cases):
+        if not isinstance(case, dict):
+            raise QueryError(f"cases[{i}]: expected an object, got {json.dumps(case, default=str)}")
+        for column in compiled.required_inputs:
+            if column not in case:
+                raise QueryError(f"cases[{i}].{column} is required")
+        for column in compiled.numeric_inputs:
+            if column not in case:
+                continue
+            value = case[column]
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                raise QueryError(f"cases[{i}].{column}: {json.dumps(value, default=str)} is not a number")
+
+
+def score_cases(cases):
+    """Score a batch of case records (dicts of scoring inputs) without storing them"""
+    if not isinstance(cases, list) or not cases:
+        raise QueryError("Expected a non-empty list of cases")
+    if len(cases) > MAX_SCORE_BATCH:
+        raise QueryError(f"At most {MAX_SCORE_BATCH} cases per request")
+    compiled = get_compiled_ruleset()
+    _check_cases(cases, compiled)
+    frame = pd.DataFrame(cases)
+    # An input a case leaves out takes its ruleset default, so cases are scored
+    # in groups that leave out the same inputs
+    present = pd.DataFrame({column: [column in case for case in cases] for column in compiled.inputs
+                            if column in frame.columns})
+    groups = present.groupby(list(present.columns)).indices if len(present.columns) else {(): np.arange(len(frame))}
+    parts = []
+    for key, rows in groups.items():
+        omitted = [column for column, given in zip(present.columns, np.atleast_1d(key)) if not given]
+        try:
+            scored = resolve_columns(frame.iloc[rows].drop(columns=omitted), SCORED_COLUMNS)
+        except (TypeError, ValueError, KeyError) as e:
+            raise QueryError(f"Could not score cases: {e}")
+        parts.append(pd.DataFrame({column: scored[column] for column in SCORED_COLUMNS}, index=frame.index[rows]))
+    result = pd.concat(parts).sort_index() if len(parts) > 1 else parts[0]
+    if "case_id" in frame.columns:
+        result.insert(0, "case_id", frame.loc[result.index, "case_id"].to_numpy())
+    return model_version(compiled), result.reset_index(drop=True)
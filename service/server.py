@@ -0,0 +1,208 @@
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from perf import timed
+from service.queries import QUEUE_FILTERS, QueryError, WarmPortfolio, score_cases
+
+# ==================== HEADLESS SCORING & QUERY SERVICE ====================
+#
+# Local JSON-over-HTTP access to the scoring model and the case store, without
+# Streamlit. Run from the project root:
+#
+#   python -m service.server [--host 127.0.0.1] [--port 8765] [--workers 32] [--processes 1]
+#
+#   GET  /health                      book size, data and model version
+#   POST /score        {"cases": [...]}  score case records (nothing is stored)
+#   GET  /queue?k=30&risk_level=CRITICAL,HIGH&sla_status=BREACHED&min_recovery=40
+#   GET  /cases/<case_id>
+#   GET  /customers/<customer_name>     exposure across the customer's cases
+#   GET  /dca/scorecard[?dca=DCA Agent 1]
+#
+# Requests are handled on a fixed thread pool over HTTP/1.1 keep-alive
+# connections, against one WarmPortfolio shared by all of them. An open
+# connection holds its worker, so one left idle for IDLE_TIMEOUT_S is closed.
+# Scoring is CPU bound, so to use more cores run --processes N: N servers share
+# the port (SO_REUSEPORT, Linux) and the memory-mapped snapshot. There is no
+# authentication: bind to localhost only. Throughput: python -m service.bench
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("DCA_SERVICE_PORT", "8765"))
+DEFAULT_WORKERS = int(os.environ.get("DCA_SERVICE_WORKERS", "32"))
+MAX_BODY_BYTES = 16 * 1024 * 1024
+IDLE_TIMEOUT_S = float(os.environ.get("DCA_SERVICE_IDLE_TIMEOUT", "5"))
+
+
+def _records(frame):
+    return frame.to_json(orient="records", date_format="iso", force_ascii=False)
+
+
+def _envelope(fields, records_key=None, frame=None):
+    """JSON object of `fields`, with `frame` serialized straight into `records_key`"""
+    body = json.dumps(fields, ensure_ascii=False, default=str)
+    if records_key is not None:
+        body = f'{body[:-1]}, "{records_key}": {_records(frame)}}}'
+    return body.encode("utf-8")
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    server_version = "DCAService/1"
+    timeout = IDLE_TIMEOUT_S  # socket timeout: an idle keep-alive client gives its worker back
+    portfolio = None  # WarmPortfolio, set by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({"error": message}).encode("utf-8"))
+
+    def _dispatch(self, route, handler):
+        try:
+            with timed(f"service.{route}"):
+                body = handler()
+            self._send(200, body)
+        except QueryError as e:
+            self._error(e.status, str(e))
+        except Exception as e:
+            self._error(500, f"{type(e).__name__}: {e}")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        path = url.path.rstrip("/")
+        if path == "/health":
+            self._dispatch("health", lambda: _envelope(self.portfolio.health()))
+        elif path == "/queue":
+            self._dispatch("queue", lambda: self._queue(params))
+        elif path.startswith("/cases/"):
+            self._dispatch("case", lambda: self._case(unquote(path[len("/cases/"):])))
+        elif path.startswith("/customers/"):
+            self._dispatch("customer", lambda: self._customer(unquote(path[len("/customers/"):])))
+        elif path == "/dca/scorecard":
+            self._dispatch("scorecard", lambda: self._scorecard(params))
+        else:
+            self._error(404, f"Unknown endpoint: {url.path}")
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip("/") != "/score":
+            self._error(404, f"Unknown endpoint: {self.path}")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._error(413, "Request body too large")
+            self.close_connection = True
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self._error(400, f"Invalid JSON: {e}")
+            return
+        self._dispatch("score", lambda: self._score(payload))
+
+    def _queue(self, params):
+        try:
+            k = int(params.get("k", ["30"])[0])
+            min_recovery = float(params["min_recovery"][0]) if "min_recovery" in params else None
+        except ValueError:
+            raise QueryError("k and min_recovery must be numbers")
+        filters = {column: params[column][0].split(",") for column in QUEUE_FILTERS if column in params}
+        data_version, matched, cases = self.portfolio.queue(k, min_recovery, **filters)
+        return _envelope({"data_version": data_version, "matched": matched, "returned": len(cases)},
+                         "cases", cases)
+
+    def _case(self, case_id):
+        data_version, case = self.portfolio.case(case_id)
+        body = _records(case)[1:-1]
+        return f'{{"data_version": {json.dumps(data_version)}, "case": {body}}}'.encode("utf-8")
+
+    def _customer(self, customer_name):
+        data_version, exposure = self.portfolio.customer(customer_name)
+        return _envelope({"data_version": data_version, "customer": exposure})
+
+    def _scorecard(self, params):
+        data_version, scorecard = self.portfolio.scorecard(params.get("dca", [None])[0])
+        return _envelope({"data_version": data_version}, "scorecard", scorecard)
+
+    def _score(self, payload):
+        cases = payload.get("cases") if isinstance(payload, dict) else None
+        version, scored = score_cases(cases)
+        return _envelope({"model_version": version}, "scores", scored)
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that handles each connection on a fixed-size thread pool"""
+
+    daemon_threads = True
+
+    def __init__(self, address, handler, workers=DEFAULT_WORKERS, reuse_port=False):
+        self.allow_reuse_port = reuse_port
+        # Before binding: server_close() shuts it down, also when the bind fails
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service")
+        super().__init__(address, handler)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, portfolio=None, reuse_port=False):
+    """Server bound to (host, port); the portfolio is loaded and indexed up front"""
+    portfolio = portfolio or WarmPortfolio()
+    portfolio.current()
+    handler = type("BoundServiceHandler", (ServiceHandler,), {"portfolio": portfolio})
+    return PooledHTTPServer((host, port), handler, workers, reuse_port)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, reuse_port=False):
+    server = make_server(host, port, workers, reuse_port=reuse_port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless DCA scoring & query service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+    if args.processes > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        parser.error("--processes needs SO_REUSEPORT (Linux)")
+
+    reuse_port = args.processes > 1
+    for _ in range(args.processes - 1):
+        multiprocessing.Process(target=serve, args=(args.host, args.port, args.workers, True), daemon=True).start()
+    print(f"DCA service on http://{args.host}:{args.port} ({args.processes} process(es) x {args.workers} workers)")
+    serve(args.host, args.port, args.workers, reuse_port)
+
+
+if __name__ == "__main__":
+    main()
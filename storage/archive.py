@@ -0,0 +1,115 @@
+import glob
+import os
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from storage import events, portfolio
+from perf import instrument
+
+# ==================== COLD TIER: ARCHIVED CASES ====================
+#
+# Closed (and written-off) cases leave the working set: archive_closed() moves
+# them out of nexus_accounts.csv into an append-only gzip CSV segment under
+# data/archive/, so loading, scoring, snapshots and every default page cover only
+# the hot (open) book. Archived rows are stored as they were when archived, with
+# an `archived_at` timestamp; they are not re-scored.
+#
+# History and compliance reads go through query_cases() / find_case(), which
+# cover both tiers and tag each row with its `tier` ("hot" or "archive"). The
+# archive is read once per process and re-read only when a segment is added.
+
+ARCHIVE_DIR = "data/archive"
+ARCHIVE_STATUSES = ("CLOSED", "WRITTEN_OFF")
+ARCHIVED_AT_COLUMN = "archived_at"
+TIER_COLUMN = "tier"
+
+_cache = {"segments": None, "frame": None}
+_cache_lock = threading.Lock()
+
+
+def _segments(archive_dir=ARCHIVE_DIR):
+    return sorted(glob.glob(os.path.join(archive_dir, "cases_*.csv.gz")))
+
+
+@instrument("archive.move")
+def archive_closed(path=None, statuses=ARCHIVE_STATUSES, archive_dir=ARCHIVE_DIR, dry_run=False):
+    """
+    Move cases in `statuses` from the portfolio CSV into a new archive segment,
+    under the portfolio file lock. Returns the number of cases archived
+    """
+    path = path or portfolio.DATA_PATH
+    with portfolio.file_lock(path):
+        df, _ = events.catch_up(pd.read_csv(path))
+        cold = df["status"].isin(statuses).to_numpy() if "status" in df.columns else np.zeros(len(df), bool)
+        if dry_run or not cold.any():
+            return int(cold.sum())
+
+        os.makedirs(archive_dir, exist_ok=True)
+        now = datetime.now()
+        segment = os.path.join(archive_dir, f"cases_{now:%Y%m%d%H%M%S%f}.csv.gz")
+        archived = df[cold].assign(**{ARCHIVED_AT_COLUMN: now.isoformat(timespec="seconds")})
+        # Archive (and log) first: a crash in between leaves a case in both tiers, never in neither
+        archived.to_csv(f"{segment}.tmp", index=False, compression="gzip")
+        os.replace(f"{segment}.tmp", segment)
+        events.ensure_checkpoint(df)
+        seq = events.append_events([events.event(case_id, "archive", action="Case Archived", details=segment)
+                                    for case_id in archived["case_id"]])
+        hot_tmp = f"{path}.archive.tmp"
+        df[~cold].to_csv(hot_tmp, index=False)
+        os.replace(hot_tmp, path)
+        events.mark_applied(seq)
+    return int(cold.sum())
+
+
+def load_archive(archive_dir=ARCHIVE_DIR):
+    """Every archived case (empty frame if nothing is archived); cached until a segment is added"""
+    segments = _segments(archive_dir)
+    with _cache_lock:
+        if _cache["segments"] != segments:
+            frames = [pd.read_csv(segment) for segment in segments]
+            archive = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["case_id"])
+            # A case archived twice (closed, reopened, closed again): keep the latest
+            _cache["frame"] = archive.drop_duplicates("case_id", keep="last", ignore_index=True)
+            _cache["segments"] = segments
+        return _cache["frame"]
+
+
+def archived_count(archive_dir=ARCHIVE_DIR):
+    """Number of archived cases"""
+    return len(load_archive(archive_dir))
+
+
+def _filter(frame, case_ids=None, **filters):
+    mask = np.ones(len(frame), dtype=bool)
+    if case_ids is not None:
+        mask &= frame["case_id"].isin(case_ids).to_numpy()
+    for column, values in filters.items():
+        if column not in frame.columns:
+            mask[:] = False
+            break
+        values = values if isinstance(values, (list, tuple, set)) else [values]
+        mask &= frame[column].isin(values).to_numpy()
+    return frame[mask]
+
+
+def query_cases(case_ids=None, include_archived=True, hot=None, **filters):
+    """
+    Cases from both tiers matching `case_ids` and column == value (or isin list)
+    filters, tagged with their tier. `hot` defaults to the scored working set
+    """
+    if hot is None:
+        hot, _ = portfolio.load_scored_data()
+    parts = [_filter(hot, case_ids, **filters).assign(**{TIER_COLUMN: "hot"})]
+    if include_archived:
+        parts.append(_filter(load_archive(), case_ids, **filters).assign(**{TIER_COLUMN: "archive"}))
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return hot.iloc[:0].assign(**{TIER_COLUMN: pd.Series(dtype=object)})
+    return pd.concat(parts, ignore_index=True)
+
+
+def find_case(case_id, hot=None):
+    """One case from whichever tier holds it, as a Series with its tier (None if unknown)"""
+    found = query_cases([case_id], hot=hot)
+    return None if found.empty else found.iloc[0]
@@ -0,0 +1,393 @@
+import glob
+import io
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from storage.snapshot import load_snapshot, write_snapshot, write_snapshot_chunks
+from perf import instrument
+
+# ==================== CASE EVENT LOG & CHECKPOINTS ====================
+#
+# The append-only event log (JSON lines) is the source of truth for case
+# mutations and the audit trail. Every write is one append of events: created
+# cases with all their fields, field updates with the case version they produced,
+# archived cases leaving the working set, and "audit" events that change no
+# state (nudges, SLA events, notes). Any event may carry the audit action / user
+# / details behind it; those events are the audit trail (audit_trail()).
+#
+# Everything else is a projection of the log. The portfolio CSV is the
+# materialized current state: the sequence number it reflects is kept in
+# applied.json, and catch_up() replays whatever it is missing (e.g. after a crash
+# between the append and the CSV save) before the next write. Replaying the log
+# up to a moment gives the book (or one case) as of then. audit_log.csv holds the
+# trail from before the event log and is no longer written.
+#
+# Replay never starts from the beginning: a checkpoint (the compacted book at a
+# sequence number, in the mmap-able snapshot format) is taken every
+# CHECKPOINT_EVERY events and after bulk rewrites (roll-forward), so a rebuild is
+# one checkpoint map plus at most CHECKPOINT_EVERY events. The first checkpoint is
+# the book as it stood when event logging started; nothing before it is known.
+#
+# Layout:
+#   data/events/case_events.jsonl
+#   data/events/applied.json                        -> seq the portfolio CSV reflects
+#   data/events/audit_start.json                    -> seq from which the log is the audit trail
+#   data/events/checkpoints/c<seq>/checkpoint.json  -> seq, log offset, timestamp
+#   data/events/checkpoints/c<seq>/CURRENT, v.../   -> the book (storage/snapshot.py)
+#
+# Writers must hold the portfolio file lock (portfolio.file_lock(DATA_PATH)).
+
+EVENTS_DIR = "data/events"
+EVENT_LOG = os.path.join(EVENTS_DIR, "case_events.jsonl")
+CHECKPOINT_DIR = os.path.join(EVENTS_DIR, "checkpoints")
+APPLIED_PATH = os.path.join(EVENTS_DIR, "applied.json")
+CHECKPOINT_EVERY = 10_000
+MAX_CHECKPOINTS = 30
+AUDIT_KIND = "audit"
+AUDIT_COLUMNS = ["timestamp", "case_id", "action", "user", "details"]
+STATE_KINDS = ("create", "update", "archive")
+
+_audit = {"key": None, "offset": 0, "frame": None}
+_audit_lock = threading.Lock()
+
+
+def event(case_id, kind, fields=None, version=None, action=None, user=None, details=None, timestamp=None):
+    """One case event: kind is "create", "update", "archive" or "audit" (no state change); timestamped now by default"""
+    return {
+        "timestamp": (timestamp or datetime.now()).isoformat(),
+        "case_id": case_id,
+        "type": kind,
+        "fields": fields or {},
+        "version": version,
+        "action": action,
+        "user": user,
+        "details": details,
+    }
+
+
+def audit_event(entry):
+    """An audit entry (portfolio.audit_entry) as an event of its own, timestamped when logged"""
+    return event(entry["case_id"], AUDIT_KIND, action=entry["action"], user=entry["user"],
+                 details=entry.get("details"))
+
+
+def _last_seq(path=EVENT_LOG):
+    """Sequence number of the last event in the log (0 if empty)"""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            f.seek(max(0, end - 65536))
+            lines = f.read().rstrip(b"\n").rsplit(b"\n", 1)
+    except OSError:
+        return 0
+    return json.loads(lines[-1])["seq"] if lines[-1].strip() else 0
+
+
+def _json_value(value):
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.isoformat(sep=" ")  # as pandas writes it to CSV
+    return value
+
+
+def append_events(events, path=EVENT_LOG):
+    """Append events in one write, numbering them; returns the last sequence number"""
+    if not events:
+        return _last_seq(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    seq = _last_seq(path)
+    if _audit_start(path) is None:
+        # The log takes over the audit trail from here; earlier events were mirrored in audit_log.csv
+        with open(_audit_start_path(path), "w", encoding="utf-8") as f:
+            json.dump({"seq": seq}, f)
+    lines = []
+    for entry in events:
+        seq += 1
+        entry = dict(entry, seq=seq, fields={k: _json_value(v) for k, v in entry["fields"].items()})
+        lines.append(json.dumps(entry, ensure_ascii=False, default=str))
+    with open(path, "ab") as f:
+        f.write(("\n".join(lines) + "\n").encode("utf-8"))
+    return seq
+
+
+# ---------- the portfolio CSV as a projection ----------
+
+def applied_seq(applied_path=APPLIED_PATH):
+    """Sequence number of the last event reflected in the portfolio CSV (None if untracked)"""
+    try:
+        with open(applied_path, encoding="utf-8") as f:
+            return json.load(f)["seq"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def mark_applied(seq, applied_path=APPLIED_PATH):
+    """Record that the portfolio CSV now reflects every event up to `seq`"""
+    os.makedirs(os.path.dirname(applied_path), exist_ok=True)
+    tmp_path = f"{applied_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"seq": seq, "timestamp": datetime.now().isoformat()}, f)
+    os.replace(tmp_path, applied_path)
+
+
+def ensure_tracked(path=EVENT_LOG, applied_path=APPLIED_PATH):
+    """Start tracking an untracked portfolio CSV, which is taken to reflect every event logged so far"""
+    if applied_seq(applied_path) is None:
+        mark_applied(_last_seq(path), applied_path)
+
+
+def unapplied(path=EVENT_LOG, checkpoint_dir=CHECKPOINT_DIR, applied_path=APPLIED_PATH):
+    """Logged state changes the portfolio CSV does not reflect yet (untracked CSVs are taken as current)"""
+    applied = applied_seq(applied_path)
+    if applied is None or applied >= _last_seq(path):
+        return []
+    before = [meta for meta in _checkpoints(checkpoint_dir) if meta["seq"] <= applied]
+    offset = before[-1]["offset"] if before else 0
+    return [entry for entry in read_events(offset, path) if entry["seq"] > applied and entry["type"] in STATE_KINDS]
+
+
+def catch_up(df, path=EVENT_LOG, checkpoint_dir=CHECKPOINT_DIR, applied_path=APPLIED_PATH):
+    """`df` (the portfolio CSV) with unapplied() changes applied; returns (df, whether any were)"""
+    missing = unapplied(path, checkpoint_dir, applied_path)
+    return (apply_events(df, missing), True) if missing else (df, False)
+
+
+# ---------- checkpoints ----------
+
+def _checkpoints(checkpoint_dir=CHECKPOINT_DIR):
+    """Checkpoint metadata, oldest first"""
+    found = []
+    for meta_path in glob.glob(os.path.join(checkpoint_dir, "c*", "checkpoint.json")):
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                found.append(dict(json.load(f), dir=os.path.dirname(meta_path)))
+        except (OSError, ValueError):
+            continue  # being written
+    return sorted(found, key=lambda meta: meta["seq"])
+
+
+def checkpoint(df, path=EVENT_LOG, checkpoint_dir=CHECKPOINT_DIR):
+    """Compacted copy of the book as of the last logged event; returns its sequence number"""
+    return _checkpoint(lambda target: write_snapshot(df, snapshot_dir=target), path, checkpoint_dir)
+
+
+def checkpoint_chunks(chunks, kinds, rows, path=EVENT_LOG, checkpoint_dir=CHECKPOINT_DIR):
+    """checkpoint() of a book streamed in chunks (see snapshot.write_snapshot_chunks)"""
+    return _checkpoint(lambda target: write_snapshot_chunks(chunks, kinds, rows, snapshot_dir=target),
+                       path, checkpoint_dir)
+
+
+@instrument("events.checkpoint")
+def _checkpoint(write, path, checkpoint_dir):
+    seq = _last_seq(path)
+    offset = os.path.getsize(path) if os.path.exists(path) else 0
+    target = os.path.join(checkpoint_dir, f"c{seq:012d}")
+    shutil.rmtree(target, ignore_errors=True)
+    write(target)
+    meta = {"seq": seq, "offset": offset, "timestamp": datetime.now().isoformat()}
+    with open(os.path.join(target, "checkpoint.json.tmp"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(os.path.join(target, "checkpoint.json.tmp"), os.path.join(target, "checkpoint.json"))
+
+    for old in _checkpoints(checkpoint_dir)[:-MAX_CHECKPOINTS]:
+        shutil.rmtree(old["dir"], ignore_errors=True)
+    return seq
+
+
+def checkpoint_if_due(df, seq, path=EVENT_LOG, checkpoint_dir=CHECKPOINT_DIR):
+    """Checkpoint `df` (the book as of event `seq`) when CHECKPOINT_EVERY events have passed since the last one"""
+    checkpoints = _checkpoints(checkpoint_dir)
+    if not checkpoints or seq - checkpoints[-1]["seq"] >= CHECKPOINT_EVERY:
+        checkpoint(df, path, checkpoint_dir)
+
+
+def ensure_checkpoint(df, path=EVENT_LOG, checkpoint_dir=CHECKPOINT_DIR):
+    """Start the history: checkpoint the book as it is if there is no checkpoint yet"""
+    if not _checkpoints(checkpoint_dir):
+        checkpoint(df, path, checkpoint_dir)
+
+
+# ---------- replay ----------
+
+def tail_events(offset=0, path=EVENT_LOG):
+    """Complete events from byte `offset` on and the offset after them"""
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return [], offset
+    data = data[:data.rfind(b"\n") + 1]  # a line still being written waits for the next read
+    return [json.loads(line) for line in data.splitlines() if line.strip()], offset + len(data)
+
+
+def _when(timestamp):
+    return datetime.fromisoformat(timestamp)
+
+
+def read_events(offset=0, path=EVENT_LOG, until=None, case_id=None):
+    """Events from byte `offset` on, optionally up to time `until` / for one case"""
+    until = pd.Timestamp(until).to_pydatetime() if until is not None else None
+    events = []
+    for entry in tail_events(offset, path)[0]:
+        # Events are stamped when built, not when appended: an older one can follow a newer one
+        if until is not None and _when(entry["timestamp"]) > until:
+            continue
+        if case_id is None or entry["case_id"] == case_id:
+            events.append(entry)
+    return events
+
+
+def apply_events(df, events):
+    """Book after `events`: creates appended, updates merged per case and field, archived cases dropped (audit events change nothing)"""
+    if not events:
+        return df
+    # A create already in `df` (catching up a CSV saved after the append) is not added twice
+    existing = set(df["case_id"])
+    created = [dict(entry["fields"], case_id=entry["case_id"]) for entry in events
+               if entry["type"] == "create" and entry["case_id"] not in existing]
+    if created:
+        df = pd.concat([df, pd.DataFrame(created)], ignore_index=True)
+    changes = pd.DataFrame(
+        [(entry["case_id"], field, value) for entry in events if entry["type"] == "update"
+         for field, value in entry["fields"].items()],
+        columns=["case_id", "field", "value"],
+    ).drop_duplicates(["case_id", "field"], keep="last")
+    if len(changes):
+        df = df.copy()
+        case_ids = df["case_id"]
+        for field, values in changes.groupby("field", sort=False):
+            mapping = dict(zip(values["case_id"], values["value"]))
+            mask = case_ids.isin(list(mapping)).to_numpy()
+            column = df[field].to_numpy(dtype=object, copy=True) if field in df.columns \
+                else np.full(len(df), None, dtype=object)
+            column[mask] = case_ids[mask].map(mapping).to_numpy(dtype=object)
+            df[field] = pd.Series(column, index=df.index).infer_objects()
+    archived = {entry["case_id"] for entry in events if entry["type"] == "archive"}
+    if archived:
+        df = df[~df["case_id"].isin(archived)].reset_index(drop=True)
+    return df
+
+
+@instrument("events.replay")
+def replay(as_of=None, path=EVENT_LOG, checkpoint_dir=CHECKPOINT_DIR):
+    """
+    The book rebuilt from the latest checkpoint (taken at or before `as_of`) plus
+    the events after it (up to `as_of`). None if `as_of` predates the history
+    """
+    checkpoints = _checkpoints(checkpoint_dir)
+    if as_of is not None:
+        cutoff = pd.Timestamp(as_of).to_pydatetime()
+        checkpoints = [meta for meta in checkpoints if _when(meta["timestamp"]) <= cutoff]
+    if not checkpoints:
+        return None
+    base = checkpoints[-1]
+    df = load_snapshot(snapshot_dir=base["dir"])
+    if df is None:
+        return None
+    return apply_events(df, read_events(base["offset"], path, until=as_of))
+
+
+def case_as_of(case_id, as_of, path=EVENT_LOG, checkpoint_dir=CHECKPOINT_DIR):
+    """One case (Series) as it was at `as_of`; None if it did not exist (or predates the history)"""
+    df = replay(as_of, path, checkpoint_dir)
+    if df is None:
+        return None
+    rows = df[df["case_id"] == case_id]
+    return None if rows.empty else rows.iloc[-1]
+
+
+def case_history(case_id, path=EVENT_LOG):
+    """Every logged event of one case, oldest first, as a frame"""
+    events = read_events(0, path, case_id=case_id)
+    return pd.DataFrame([{
+        "seq": entry["seq"],
+        "timestamp": entry["timestamp"],
+        "type": entry["type"],
+        "action": entry["action"],
+        "user": entry["user"],
+        "version": entry["version"],
+        "changes": ", ".join(f"{field}={value}" for field, value in entry["fields"].items()),
+    } for entry in events], columns=["seq", "timestamp", "type", "action", "user", "version", "changes"])
+
+
+def drift(current, rebuilt):
+    """case_ids whose state differs between two books (compared as the CSV would read them back)"""
+    def normalized(frame):
+        columns = sorted(set(current.columns) & set(rebuilt.columns))
+        text = frame[columns].drop_duplicates("case_id", keep="last").set_index("case_id")
+        return pd.read_csv(io.StringIO(text.to_csv()), dtype=str).fillna("").set_index("case_id")
+    a, b = normalized(current), normalized(rebuilt)
+    missing = a.index.symmetric_difference(b.index)
+    common = a.index.intersection(b.index)
+    differs = (a.loc[common] != b.loc[common, a.columns]).any(axis=1)
+    return sorted(missing.tolist() + differs[differs].index.tolist())
+
+
+# ---------- the audit trail ----------
+
+def _audit_start_path(path):
+    return os.path.join(os.path.dirname(path), "audit_start.json")
+
+
+def _audit_start(path):
+    """Events after this seq are the audit trail; earlier ones are mirrored in the legacy CSV (None: all are)"""
+    try:
+        with open(_audit_start_path(path), encoding="utf-8") as f:
+            return json.load(f)["seq"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _file_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def audit_trail(legacy_path=None, path=EVENT_LOG):
+    """
+    The audit trail as a frame (AUDIT_COLUMNS, oldest first): the legacy audit CSV,
+    then every logged event with an audit action. Cached per process; only events
+    appended since the last call are parsed
+    """
+    with _audit_lock:
+        start = _audit_start(path)
+        # The log file itself (not just its path) is part of the key: a replaced log is read from the start
+        log_file = _file_key(path)
+        key = (os.path.abspath(path), log_file[0] if log_file else None, legacy_path,
+               _file_key(legacy_path) if legacy_path else None, start)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if _audit["key"] != key or size < _audit["offset"]:
+            # First read, another log, or the legacy trail changed
+            try:
+                legacy = pd.read_csv(legacy_path) if legacy_path else pd.DataFrame(columns=AUDIT_COLUMNS)
+            except (OSError, pd.errors.EmptyDataError):
+                legacy = pd.DataFrame(columns=AUDIT_COLUMNS)
+            _audit.update(key=key, offset=0, frame=legacy)
+        logged, _audit["offset"] = tail_events(_audit["offset"], path)
+        if start is None:
+            return _audit["frame"].copy(deep=False)
+        rows = [(entry["timestamp"].replace("T", " ", 1), entry["case_id"], entry["action"], entry.get("user"),
+                 entry.get("details")) for entry in logged if entry["seq"] > start and entry.get("action")]
+        if rows:
+            new = pd.DataFrame(rows, columns=AUDIT_COLUMNS)
+            frame = _audit["frame"]
+            _audit["frame"] = new if frame.empty else pd.concat([frame, new], ignore_index=True)
+        return _audit["frame"].copy(deep=False)  # callers may add columns
+
+
+def audit_version(legacy_path=None, path=EVENT_LOG):
+    """Changes whenever the audit trail may have changed"""
+    keys = (_file_key(path), _file_key(legacy_path) if legacy_path else None)
+    return None if keys == (None, None) else repr(keys)
@@ -0,0 +1,305 @@
+import os
+import uuid
+import zlib
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# ==================== PORTFOLIO EXPORT ====================
+#
+# Streams any (filtered) view of the scored portfolio as CSV, gzip CSV or
+# Parquet, chunk by chunk: only one chunk of rows, formatted text or row group
+# is alive at a time, never the whole output string.
+#
+#   iter_export()       -> generator of encoded byte chunks
+#   write_export()      -> stream to a file (atomic rename when complete)
+#   start_export_job()  -> the same, on a background thread, for large books
+#
+# A view is the frame plus optional positional `rows` (e.g. a filter/sort order),
+# so exporting a filtered book never materializes the filtered copy up front.
+# Parquet needs pyarrow (optional); Parquet output keeps typed values.
+
+EXPORT_DIR = "data/exports"
+EXPORT_CHUNK_ROWS = 50_000
+BACKGROUND_EXPORT_ROWS = 100_000  # larger views export as a background job
+MAX_EXPORT_FILES = 20
+EXPORT_FORMATS = {
+    "csv": {"label": "CSV", "extension": "csv", "mime": "text/csv"},
+    "csv.gz": {"label": "CSV (gzip)", "extension": "csv.gz", "mime": "application/gzip"},
+    "parquet": {"label": "Parquet", "extension": "parquet", "mime": "application/vnd.apache.parquet"},
+}
+CURRENCY_COLUMNS = ("invoice_amount", "expected_recovery")
+PERCENT_COLUMNS = ("recovery_probability", "churn_risk")
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="export")
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def parquet_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def available_formats():
+    """Export formats usable in this environment"""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or parquet_available()]
+
+
+# ==================== VECTORIZED FORMATTING ====================
+
+def format_currency_values(values):
+    """Vectorized format_currency: ₹ + integer part with thousands separators ('' for missing)"""
+    numbers = pd.to_numeric(values, errors="coerce")
+    missing = numbers.isna().to_numpy()
+    integers = numbers.fillna(0).to_numpy().astype(np.int64)
+    digits = pd.Series(np.abs(integers), index=values.index).astype(str)
+    grouped = digits.str.replace(r"\B(?=(\d{3})+(?!\d))", ",", regex=True)
+    text = "₹" + pd.Series(np.where(integers < 0, "-", ""), index=values.index) + grouped
+    return text.where(~missing, "")
+
+
+def format_percent_values(values):
+    numbers = pd.to_numeric(values, errors="coerce")
+    return (numbers.astype(str) + "%").where(numbers.notna(), "")
+
+
+def format_chunk(chunk):
+    """Display formatting for money and percentage columns, a column at a time"""
+    formatted = chunk.copy(deep=False)
+    for column in CURRENCY_COLUMNS:
+        if column in formatted.columns:
+            formatted[column] = format_currency_values(formatted[column])
+    for column in PERCENT_COLUMNS:
+        if column in formatted.columns:
+            formatted[column] = format_percent_values(formatted[column])
+    return formatted
+
+
+# ==================== STREAMING ====================
+
+def iter_chunks(df, rows=None, columns=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Row chunks of the view (df, rows), restricted to `columns`"""
+    frame = df if columns is None else df[list(columns)]
+    total = len(frame) if rows is None else len(rows)
+    for start in range(0, total, chunk_rows):
+        if rows is None:
+            yield frame.iloc[start:start + chunk_rows]
+        else:
+            yield frame.iloc[rows[start:start + chunk_rows]]
+
+
+def _iter_csv(chunks, formatted):
+    header = True
+    for chunk in chunks:
+        if formatted:
+            chunk = format_chunk(chunk)
+        yield chunk.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+
+
+def _iter_gzip(byte_chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for block in byte_chunks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back between row groups"""
+
+    def __init__(self):
+        self.buffer = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.buffer.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.buffer)
+        self.buffer = []
+        return data
+
+
+def _arrow_schema(frame):
+    """Stable schema for every row group: text columns are always strings"""
+    import pyarrow as pa
+
+    fields = []
+    for column in frame.columns:
+        dtype = frame[column].dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            arrow_type = pa.bool_()
+        elif pd.api.types.is_numeric_dtype(dtype):
+            arrow_type = pa.from_numpy_dtype(dtype)
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            arrow_type = pa.timestamp("ns")
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(str(column), arrow_type))
+    return pa.schema(fields)
+
+
+def _iter_parquet(df, rows, columns, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    frame = df if columns is None else df[list(columns)]
+    schema = _arrow_schema(frame)
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="snappy") as writer:
+        for chunk in iter_chunks(frame, rows, None, chunk_rows):
+            chunk = chunk.copy()
+            for field in schema:
+                if field.type == pa.string():
+                    values = chunk[field.name]
+                    chunk[field.name] = values.astype(object).where(values.notna(), None)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            data = sink.drain()
+            if data:
+                yield data
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def iter_export(df, fmt, rows=None, columns=None, formatted=False, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Encoded export of the view (df, rows) as a generator of byte chunks.
+    formatted=True applies display formatting (₹ / %) to CSV output
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "parquet":
+        if not parquet_available():
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+        return _iter_parquet(df, rows, columns, chunk_rows)
+
+    csv_chunks = _iter_csv(iter_chunks(df, rows, columns, chunk_rows), formatted)
+    if fmt == "csv.gz":
+        return _iter_gzip(csv_chunks)
+    return csv_chunks
+
+
+def export_bytes(df, fmt, rows=None, columns=None, formatted=False):
+    """Whole export as bytes, for an in-page download of a modest view"""
+    return b"".join(iter_export(df, fmt, rows, columns, formatted))
+
+
+def export_file_name(name, fmt, when=None, unique=None):
+    """Timestamped (to the microsecond) file name; `unique` (e.g. a job id) is appended"""
+    stamp = (when or datetime.now()).strftime("%Y%m%d_%H%M%S_%f")
+    suffix = f"_{unique}" if unique else ""
+    return f"{name}_{stamp}{suffix}.{EXPORT_FORMATS[fmt]['extension']}"
+
+
+def write_export(df, path, fmt, rows=None, columns=None, formatted=False, progress=None):
+    """Stream the export to `path` (visible only once complete). Returns bytes written"""
+    tmp_path = f"{path}.tmp"
+    written = 0
+    total = len(df) if rows is None else len(rows)
+    try:
+        with open(tmp_path, "wb") as f:
+            for block in iter_export(df, fmt, rows, columns, formatted):
+                f.write(block)
+                written += len(block)
+                if progress is not None:
+                    progress(written, total)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
+
+
+def read_export(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# ==================== BACKGROUND EXPORT JOBS ====================
+
+def _prune_exports(export_dir):
+    """Keep only the newest MAX_EXPORT_FILES finished exports"""
+    try:
+        files = [os.path.join(export_dir, name) for name in os.listdir(export_dir)
+                 if not name.endswith(".tmp")]
+    except OSError:
+        return
+    files.sort(key=os.path.getmtime, reverse=True)
+    for path in files[MAX_EXPORT_FILES:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _run_job(job_id, df, rows, columns, formatted, export_dir):
+    job = _jobs[job_id]
+    try:
+        os.makedirs(export_dir, exist_ok=True)
+        path = os.path.join(export_dir, job["file_name"])
+        job["bytes"] = write_export(df, path, job["format"], rows, columns, formatted)
+        job["path"] = path
+        job["status"] = "done"
+        _prune_exports(export_dir)
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        job["finished"] = datetime.now()
+
+
+def start_export_job(df, fmt, rows=None, columns=None, formatted=False, name="portfolio", owner=None,
+                     export_dir=EXPORT_DIR):
+    """Export the view on a background thread; returns the job id"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    job_id = uuid.uuid4().hex[:12]
+    started = datetime.now()
+    with _jobs_lock:
+        _jobs[job_id] = {
+            "id": job_id,
+            "owner": owner,
+            "format": fmt,
+            "file_name": export_file_name(name, fmt, started, unique=job_id),
+            "rows": len(df) if rows is None else len(rows),
+            "status": "running",
+            "bytes": 0,
+            "path": None,
+            "error": None,
+            "started": started,
+            "finished": None,
+        }
+    _executor.submit(_run_job, job_id, df, None if rows is None else np.asarray(rows), columns, formatted, export_dir)
+    return job_id
+
+
+def get_export_job(job_id):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
+
+
+def list_export_jobs(owner=None):
+    """Jobs (newest first), optionally only those started by `owner`"""
+    with _jobs_lock:
+        jobs = [dict(job) for job in _jobs.values() if owner is None or job["owner"] == owner]
+    return sorted(jobs, key=lambda job: job["started"], reverse=True)
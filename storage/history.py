@@ -0,0 +1,339 @@
+import json
+import os
+import threading
+from datetime import date
+import numpy as np
+import pandas as pd
+from perf import instrument
+from storage import portfolio
+
+# ==================== DAILY PORTFOLIO HISTORY ====================
+#
+# One record of the scored book per day, for trend analytics, without keeping a
+# full copy per day. Every KEYFRAME_EVERY days (and on the first day) a keyframe
+# stores the tracked columns in full; the days in between store only what
+# changed against the previous day:
+#
+#   - cases that left the book (positions in the previous day) and new cases
+#     (all their values);
+#   - integer columns (ageing_days) as the per-case difference, which is 1 for
+#     nearly every case and compresses to almost nothing;
+#   - other columns as the positions that changed and their new values.
+#
+# Each day is one compressed .npz file; manifest.json lists the days in order,
+# with the day's totals and per-DCA totals computed when it is recorded, so the
+# common trends (expected recovery by day, per-DCA trends) are read from the
+# manifest alone. Other queries rebuild days: a day's book is its keyframe plus
+# the deltas after it, read in one forward pass from the keyframe at or before
+# the first day asked for.
+#
+# Layout:
+#   data/history/manifest.json             -> [{day, kind, file, rows, totals, dca}, ...]
+#   data/history/<YYYY-MM-DD>.<kind>.npz   -> kind "key" or "delta"
+#
+# The history is append-only: a day can be re-recorded only while it is the
+# latest. Writers hold the lock on the manifest (portfolio.file_lock).
+
+HISTORY_DIR = "data/history"
+KEYFRAME_EVERY = 30
+TEXT_COLUMNS = ("assigned_dca", "status", "risk_level", "sla_status")
+INT_COLUMNS = ("ageing_days",)
+FLOAT_COLUMNS = ("invoice_amount", "expected_recovery", "recovery_probability", "priority_score")
+TRACKED_COLUMNS = TEXT_COLUMNS + INT_COLUMNS + FLOAT_COLUMNS
+RISK_ORDER = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+UNASSIGNED = "UNASSIGNED"
+DAY_TOTALS = ("cases", "open_cases", "invoice_amount", "expected_recovery", "recovery_probability", "sla_breaches")
+DCA_TOTALS = ("cases", "invoice_amount", "expected_recovery")
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _manifest_path(history_dir=HISTORY_DIR):
+    return os.path.join(history_dir, "manifest.json")
+
+
+def list_days(history_dir=HISTORY_DIR):
+    """Manifest entries, oldest first ([] before the first record)"""
+    try:
+        with open(_manifest_path(history_dir), encoding="utf-8") as f:
+            return json.load(f)["days"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def history_version(history_dir=HISTORY_DIR):
+    """Changes whenever a day is recorded (None before the first record)"""
+    try:
+        return str(os.stat(_manifest_path(history_dir)).st_mtime_ns)
+    except OSError:
+        return None
+
+
+def _state(df):
+    """Tracked columns of a scored frame as arrays (one row per case_id)"""
+    df = df.drop_duplicates("case_id", keep="last")
+    state = {"case_id": df["case_id"].astype(str).to_numpy(dtype=object)}
+    for column in TEXT_COLUMNS:
+        values = df[column] if column in df.columns else pd.Series("", index=df.index)
+        state[column] = values.fillna("").astype(str).to_numpy(dtype=object)
+    for column in INT_COLUMNS:
+        values = pd.to_numeric(df[column], errors="coerce") if column in df.columns else pd.Series(0, index=df.index)
+        state[column] = values.fillna(0).to_numpy(dtype=np.int64)
+    for column in FLOAT_COLUMNS:
+        values = pd.to_numeric(df[column], errors="coerce") if column in df.columns else pd.Series(np.nan, index=df.index)
+        state[column] = values.to_numpy(dtype=float)
+    return state
+
+
+def _text(values):
+    """Object array -> fixed-width unicode, which npz stores without pickling"""
+    return np.asarray(values, dtype=str) if len(values) else np.zeros(0, dtype="<U1")
+
+
+def _keyframe(state):
+    arrays = {"case_id": _text(state["case_id"])}
+    for column in TEXT_COLUMNS:
+        codes, categories = pd.factorize(state[column])
+        arrays[column] = codes.astype(np.int32)
+        arrays[f"{column}.categories"] = _text(categories)
+    for column in INT_COLUMNS + FLOAT_COLUMNS:
+        arrays[column] = state[column]
+    return arrays
+
+
+def _delta(previous, state):
+    """Arrays that turn `previous` into `state` (kept cases first, in previous order, then new ones)"""
+    position = pd.Index(state["case_id"], dtype=object).get_indexer(previous["case_id"])
+    kept_mask = position >= 0
+    position = position[kept_mask]
+    added = np.ones(len(state["case_id"]), dtype=bool)
+    added[position] = False
+
+    arrays = {"removed": np.flatnonzero(~kept_mask).astype(np.int64), "added.case_id": _text(state["case_id"][added])}
+    for column in TRACKED_COLUMNS:
+        old, new = previous[column][kept_mask], state[column][position]
+        if column in INT_COLUMNS:
+            arrays[f"{column}.diff"] = new - old
+        else:
+            changed = old != new
+            if column in FLOAT_COLUMNS:
+                changed &= ~(np.isnan(old) & np.isnan(new))
+            arrays[f"{column}.at"] = np.flatnonzero(changed).astype(np.int64)
+            arrays[f"{column}.values"] = _text(new[changed]) if column in TEXT_COLUMNS else new[changed]
+        added_values = state[column][added]
+        arrays[f"{column}.added"] = _text(added_values) if column in TEXT_COLUMNS else added_values
+    return arrays
+
+
+def _load_keyframe(arrays):
+    state = {"case_id": arrays["case_id"].astype(object)}
+    for column in TEXT_COLUMNS:
+        state[column] = arrays[f"{column}.categories"].astype(object)[arrays[column]] \
+            if len(arrays[column]) else np.zeros(0, dtype=object)
+    for column in INT_COLUMNS + FLOAT_COLUMNS:
+        state[column] = arrays[column]
+    return state
+
+
+def _apply_delta(previous, arrays):
+    kept = np.ones(len(previous["case_id"]), dtype=bool)
+    kept[arrays["removed"]] = False
+    state = {"case_id": np.concatenate([previous["case_id"][kept], arrays["added.case_id"].astype(object)])}
+    for column in TRACKED_COLUMNS:
+        values = previous[column][kept]
+        if column in INT_COLUMNS:
+            values = values + arrays[f"{column}.diff"]
+        else:
+            values = values.copy()
+            changed = arrays[f"{column}.values"]
+            values[arrays[f"{column}.at"]] = changed.astype(object) if column in TEXT_COLUMNS else changed
+        added = arrays[f"{column}.added"]
+        state[column] = np.concatenate([values, added.astype(object) if column in TEXT_COLUMNS else added])
+    return state
+
+
+def _read(history_dir, entry):
+    with np.load(os.path.join(history_dir, entry["file"]), allow_pickle=False) as arrays:
+        arrays = {name: arrays[name] for name in arrays.files}
+    return _load_keyframe(arrays) if entry["kind"] == "key" else arrays
+
+
+def _states(entries, history_dir=HISTORY_DIR, start=None, end=None):
+    """(day, state) for each recorded day in [start, end], in one pass from the keyframe before start"""
+    start = str(start) if start is not None else None
+    end = str(end) if end is not None else None
+    first = 0
+    for i, entry in enumerate(entries):
+        if start is not None and entry["kind"] == "key" and entry["day"] <= start:
+            first = i
+    state = None
+    for entry in entries[first:]:
+        if end is not None and entry["day"] > end:
+            break
+        loaded = _read(history_dir, entry)
+        state = loaded if entry["kind"] == "key" else _apply_delta(state, loaded)
+        if start is None or entry["day"] >= start:
+            yield entry["day"], state
+
+
+def _frame(state):
+    df = pd.DataFrame(state)
+    for column in TEXT_COLUMNS:
+        df[column] = df[column].replace("", None)
+    return df
+
+
+def _dca(state):
+    return np.where(state["assigned_dca"] == "", UNASSIGNED, state["assigned_dca"])
+
+
+def _summary(state):
+    """Day totals and per-DCA totals stored in the manifest entry, so trends need no replay"""
+    open_case = state["status"] != "CLOSED"
+    totals = {
+        "cases": len(state["case_id"]),
+        "open_cases": int(open_case.sum()),
+        "invoice_amount": float(np.nansum(state["invoice_amount"])),
+        "expected_recovery": float(np.nansum(state["expected_recovery"])),
+        "recovery_probability": float(np.nanmean(state["recovery_probability"])) if len(open_case) else 0.0,
+        "sla_breaches": int((state["sla_status"] == "BREACHED").sum()),
+    }
+    groups = pd.DataFrame({column: state[column] for column in DCA_TOTALS if column != "cases"}).groupby(_dca(state))
+    sums, sizes = groups.sum(), groups.size()
+    dca = {str(name): {"cases": int(sizes[name]), **{column: float(value) for column, value in sums.loc[name].items()}}
+           for name in sums.index}
+    return {"totals": totals, "dca": dca}
+
+
+def _between(entries, start=None, end=None):
+    return [entry for entry in entries if (start is None or entry["day"] >= str(start))
+            and (end is None or entry["day"] <= str(end))]
+
+
+def _write_npz(path, arrays):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def _write_manifest(entries, history_dir):
+    tmp_path = f"{_manifest_path(history_dir)}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"days": entries}, f, indent=1)
+    os.replace(tmp_path, _manifest_path(history_dir))
+
+
+@instrument("history.record")
+def record_day(scored_df, day=None, history_dir=HISTORY_DIR):
+    """
+    Record the scored book as of `day` (default today): a keyframe or a delta
+    against the previous recorded day. Returns the manifest entry
+    """
+    day = str(day or date.today())
+    os.makedirs(history_dir, exist_ok=True)
+    with portfolio.file_lock(_manifest_path(history_dir)):
+        entries = list_days(history_dir)
+        if entries and day < entries[-1]["day"]:
+            raise ValueError(f"history is append-only: {day} is before the last recorded day {entries[-1]['day']}")
+        if entries and day == entries[-1]["day"]:
+            entries = entries[:-1]  # re-record the latest day
+
+        state = _state(scored_df)
+        since_key = next((len(entries) - 1 - i for i in range(len(entries) - 1, -1, -1)
+                          if entries[i]["kind"] == "key"), None)
+        if since_key is None or since_key + 1 >= KEYFRAME_EVERY:
+            kind, arrays = "key", _keyframe(state)
+        else:
+            previous = None
+            for _, previous in _states(entries, history_dir, start=entries[-1]["day"]):
+                pass
+            kind, arrays = "delta", _delta(previous, state)
+
+        entry = {"day": day, "kind": kind, "file": f"{day}.{kind}.npz", "rows": len(state["case_id"]),
+                 **_summary(state)}
+        _write_npz(os.path.join(history_dir, entry["file"]), arrays)
+        _write_manifest(entries + [entry], history_dir)
+        for stale in {f"{day}.key.npz", f"{day}.delta.npz"} - {entry["file"]}:
+            if os.path.exists(os.path.join(history_dir, stale)):
+                os.remove(os.path.join(history_dir, stale))
+    return entry
+
+
+def history_stats(history_dir=HISTORY_DIR):
+    """Days, keyframes and bytes on disk"""
+    entries = list_days(history_dir)
+    size = sum(os.path.getsize(os.path.join(history_dir, entry["file"])) for entry in entries
+               if os.path.exists(os.path.join(history_dir, entry["file"])))
+    return {"days": len(entries), "keyframes": sum(entry["kind"] == "key" for entry in entries), "bytes": size}
+
+
+def _cached(name, key, compute, history_dir):
+    """Series results cached until the manifest changes"""
+    entries = list_days(history_dir)
+    signature = (name, key, history_dir, tuple((entry["day"], entry["file"]) for entry in entries))
+    with _cache_lock:
+        if signature in _cache:
+            return _cache[signature]
+    result = compute(entries)
+    with _cache_lock:
+        for stale in [cached for cached in _cache if cached[:3] == signature[:3]]:
+            del _cache[stale]
+        _cache[signature] = result
+    return result
+
+
+# ---------- time-series queries ----------
+
+def book_as_of(day, history_dir=HISTORY_DIR):
+    """The recorded book (tracked columns) of the last recorded day at or before `day`; None if none"""
+    entries = [entry for entry in list_days(history_dir) if entry["day"] <= str(day)]
+    if not entries:
+        return None
+    state = None
+    for _, state in _states(entries, history_dir, start=entries[-1]["day"]):
+        pass
+    return _frame(state)
+
+
+def daily_totals(start=None, end=None, history_dir=HISTORY_DIR):
+    """Per recorded day: cases, open cases, invoice amount, expected recovery, mean recovery probability, SLA breaches"""
+    rows = [dict(entry["totals"], day=entry["day"]) for entry in _between(list_days(history_dir), start, end)]
+    frame = pd.DataFrame(rows, columns=["day", *DAY_TOTALS])
+    frame["day"] = pd.to_datetime(frame["day"])
+    return frame
+
+
+def dca_trends(column="expected_recovery", start=None, end=None, history_dir=HISTORY_DIR):
+    """Per recorded day and DCA: sum of `column` (cases or a numeric tracked column), as a day x DCA frame"""
+    if column not in ("cases",) + INT_COLUMNS + FLOAT_COLUMNS:
+        raise ValueError(f"not a numeric tracked column: {column}")
+
+    def compute(entries):
+        if column in DCA_TOTALS:
+            series = {entry["day"]: pd.Series({dca: totals[column] for dca, totals in entry["dca"].items()})
+                      for entry in _between(entries, start, end)}
+        else:
+            series = {day: pd.Series(state[column]).groupby(_dca(state)).sum()
+                      for day, state in _states(entries, history_dir, start, end)}
+        frame = pd.DataFrame(series, dtype=float).T.fillna(0).sort_index(axis=1)
+        frame.index = pd.to_datetime(frame.index)
+        frame.index.name = "day"
+        return frame
+    return _cached("dca_trends", (column, str(start), str(end)), compute, history_dir)
+
+
+def risk_migration(day_from, day_to, history_dir=HISTORY_DIR):
+    """Cases by risk level on `day_from` (rows) and `day_to` (columns), for cases on the book both days"""
+    def compute(entries):
+        before, after = book_as_of(day_from, history_dir), book_as_of(day_to, history_dir)
+        if before is None or after is None:
+            return None
+        both = before[["case_id", "risk_level"]].merge(after[["case_id", "risk_level"]], on="case_id",
+                                                        suffixes=("_from", "_to"))
+        matrix = pd.crosstab(both["risk_level_from"], both["risk_level_to"]).reindex(
+            index=list(RISK_ORDER), columns=list(RISK_ORDER), fill_value=0)
+        matrix.index.name, matrix.columns.name = f"risk on {day_from}", f"risk on {day_to}"
+        return matrix
+    return _cached("risk_migration", (str(day_from), str(day_to)), compute, history_dir)
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+from storage.snapshot import SNAPSHOT_DIR, write_snapshot
+from storage.shared_store import get_shared_portfolio, session_view, shared_version
+from perf import instrument
+
+# ==================== PER-AGENCY PARTITIONS ====================
+#
+# The scored portfolio split by assigned_dca, each agency's cases in a snapshot
+# of its own (same format and freshness rules as the full snapshot), plus
+# aggregates precomputed when the partition is written. A DCA Agent session maps
+# only its agency's partition: it never holds, scores or filters the rest of the
+# book, and the rows it can see are fixed here rather than by each page.
+#
+# Layout:
+#   data/portfolio_snapshot/partitions/index.json           -> agency -> partition dir, rows
+#   data/portfolio_snapshot/partitions/<agency>/CURRENT     -> live version (see storage/snapshot.py)
+#   data/portfolio_snapshot/partitions/<agency>/aggregates.json
+#
+# Partitions are rewritten together with the full snapshot, so they are fresh
+# exactly when it is.
+
+PARTITION_DIR = os.path.join(SNAPSHOT_DIR, "partitions")
+PARTITION_COLUMN = "assigned_dca"
+UNASSIGNED = "UNASSIGNED"
+
+
+def portfolio_kpis(df):
+    """Headline portfolio figures (dashboard KPIs) of a scored frame"""
+    total_value = float(df["invoice_amount"].sum())
+    expected_recovery = float(df["expected_recovery"].sum())
+    return {
+        "total_value": total_value,
+        "expected_recovery": expected_recovery,
+        "recovery_rate": (expected_recovery / total_value * 100) if total_value > 0 else 0,
+        "sla_breaches": int((df["sla_status"] == "BREACHED").sum()),
+        "active_cases": int((df["status"] == "ACTIVE").sum()),
+        "high_priority": int((df["risk_level"] == "CRITICAL").sum()),
+        "avg_ageing": float(df["ageing_days"].mean()) if len(df) else 0.0,
+        "portfolio_at_risk": float(df.loc[df["risk_level"].isin(["HIGH", "CRITICAL"]), "invoice_amount"].sum()),
+    }
+
+
+def partition_aggregates(df):
+    """Aggregates stored with a partition, by name"""
+    return {
+        "kpis": portfolio_kpis(df),
+        "risk_level": {str(k): int(v) for k, v in df["risk_level"].value_counts().items()},
+        "sla_status": {str(k): int(v) for k, v in df["sla_status"].value_counts().items()},
+    }
+
+
+def _partition_name(agency):
+    """Directory name of an agency's partition: readable, and unique per agency"""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", agency).strip("_")[:40]
+    return f"{slug}-{hashlib.sha1(agency.encode('utf-8')).hexdigest()[:8]}"
+
+
+@instrument("partitions.write")
+def write_partitions(scored_df, source_path=None, model_version=None, partition_dir=PARTITION_DIR):
+    """Write one snapshot (and its aggregates) per agency; returns {agency: rows}"""
+    os.makedirs(partition_dir, exist_ok=True)
+    agencies = scored_df[PARTITION_COLUMN].fillna(UNASSIGNED).astype(str)
+    index = {}
+    for agency, positions in agencies.groupby(agencies, sort=True).indices.items():
+        part = scored_df.iloc[positions].reset_index(drop=True)
+        name = _partition_name(agency)
+        part_dir = os.path.join(partition_dir, name)
+        version = write_snapshot(part, source_path=source_path, model_version=model_version, snapshot_dir=part_dir)
+        _write_json(os.path.join(part_dir, "aggregates.json"),
+                    {"version": version, "aggregates": partition_aggregates(part)})
+        index[agency] = {"partition": name, "rows": len(part)}
+    _write_json(os.path.join(partition_dir, "index.json"), {"partitions": index})
+
+    # Agencies without cases any more (open maps of their files stay valid)
+    live = {entry["partition"] for entry in index.values()}
+    for name in os.listdir(partition_dir):
+        if name not in live and os.path.isdir(os.path.join(partition_dir, name)):
+            shutil.rmtree(os.path.join(partition_dir, name), ignore_errors=True)
+    return {agency: entry["rows"] for agency, entry in index.items()}
+
+
+def _write_json(path, payload):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def list_partitions(partition_dir=PARTITION_DIR):
+    """{agency: rows} of the written partitions ({} before the first write)"""
+    index = _read_json(os.path.join(partition_dir, "index.json")) or {}
+    return {agency: entry["rows"] for agency, entry in index.get("partitions", {}).items()}
+
+
+def load_partition(agency, source_path=None, model_version=None, partition_dir=PARTITION_DIR):
+    """
+    Session view over one agency's shared partition: (df, data_version, aggregates),
+    or None if it is missing or stale (the caller rebuilds from the full book)
+    """
+    entry = (_read_json(os.path.join(partition_dir, "index.json")) or {}).get("partitions", {}).get(agency)
+    if entry is None:
+        return None
+    part_dir = os.path.join(partition_dir, entry["partition"])
+    shared = get_shared_portfolio(source_path=source_path, model_version=model_version, snapshot_dir=part_dir)
+    if shared is None:
+        return None
+    data_version = shared_version(part_dir)
+    stored = _read_json(os.path.join(part_dir, "aggregates.json")) or {}
+    aggregates = stored.get("aggregates") if stored.get("version") == os.path.basename(data_version) else None
+    return session_view(shared), data_version, aggregates or {}
+
@@ -0,0 +1,286 @@
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+from models.score_cache import apply_scoring_cached
+from models.rules import get_compiled_ruleset, model_version
+from storage import events
+from storage.snapshot import write_snapshot
+from storage.partitions import PARTITION_COLUMN, UNASSIGNED, list_partitions, load_partition, write_partitions
+from storage.shared_store import get_shared_portfolio, session_view, shared_version
+from perf import timed, instrument
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ==================== PORTFOLIO LOAD / SAVE ====================
+#
+# Reading and writing the case portfolio and the audit trail. Kept free of
+# Streamlit and plotly so pages, jobs and services can share it. The case event
+# log (storage/events.py) is the source of truth: the CSV is its materialized
+# state and the audit trail is derived from it.
+
+DATA_PATH = "data/nexus_accounts.csv"
+AUDIT_PATH = "data/audit_log.csv"  # audit trail from before the case event log (read-only)
+VERSION_COLUMN = "case_version"
+CASE_ID_PREFIX = "CASE_"
+
+
+class VersionConflict(ValueError):
+    """A compare-and-set case update whose expected version is no longer current"""
+
+    def __init__(self, case_id, expected, current):
+        super().__init__(f"{case_id} was changed by someone else (version {current}, you had {expected}); reload and retry")
+        self.case_id = case_id
+        self.expected = expected
+        self.current = current
+
+
+class DuplicateCase(ValueError):
+    """An insert whose case_id is already in use (live or archived)"""
+
+    def __init__(self, case_id):
+        super().__init__(f"Case already exists: {case_id}")
+        self.case_id = case_id
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock on `path` shared by every process (advisory, on `path`.lock)"""
+    with open(f"{path}.lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@instrument("load.csv")
+def load_data():
+    df = pd.read_csv(DATA_PATH)
+    if "customer_name" not in df.columns:
+        df["customer_name"] = "UNKNOWN"
+    return df
+
+
+@instrument("load")
+def load_scored_data():
+    """
+    Session view over the process-wide read-only snapshot of the scored portfolio.
+    Falls back to CSV + scoring (and rebuilds the snapshot) when it is stale.
+    Returns (df, data_version); data_version keys compute-once derived columns
+    """
+    version = model_version(get_compiled_ruleset())
+    shared = get_shared_portfolio(source_path=DATA_PATH, model_version=version)
+    if shared is None:
+        df = load_data()
+        with timed("score"):
+            df = apply_scoring_cached(df)
+        refresh_snapshot(df, version)
+        shared = get_shared_portfolio(source_path=DATA_PATH, model_version=version)
+        if shared is None:
+            return df, None
+    return session_view(shared), shared_version()
+
+
+@instrument("load.partition")
+def load_agency_data(agency):
+    """
+    One agency's scored cases only, from its partition (see storage/partitions.py).
+    Returns (df, data_version, precomputed aggregates)
+    """
+    version = model_version(get_compiled_ruleset())
+    loaded = load_partition(agency, source_path=DATA_PATH, model_version=version)
+    if loaded is not None:
+        return loaded
+    # Stale or missing: bring the full snapshot (and with it the partitions) up to date
+    df, data_version = load_scored_data()
+    loaded = load_partition(agency, source_path=DATA_PATH, model_version=version)
+    if loaded is None and data_version is not None:
+        _refresh_partitions(df, version)
+        loaded = load_partition(agency, source_path=DATA_PATH, model_version=version)
+    if loaded is None:
+        return df[df[PARTITION_COLUMN].fillna(UNASSIGNED) == agency].reset_index(drop=True), None, {}
+    return loaded
+
+
+def list_agencies():
+    """Agencies with cases (partition names), building the partitions if needed"""
+    agencies = list_partitions()
+    if not agencies:
+        df, _ = load_scored_data()
+        agencies = list_partitions() or dict.fromkeys(df[PARTITION_COLUMN].fillna(UNASSIGNED).astype(str))
+    return sorted(agencies)
+
+
+def current_shared_portfolio():
+    """The process-wide portfolio for the current CSV and model (None if stale)"""
+    return get_shared_portfolio(source_path=DATA_PATH, model_version=model_version(get_compiled_ruleset()))
+
+
+@instrument("snapshot.write")
+def refresh_snapshot(scored_df, version=None):
+    """Write the scored portfolio snapshot for the next process / rerun to map"""
+    version = version or model_version(get_compiled_ruleset())
+    try:
+        write_snapshot(scored_df, source_path=DATA_PATH, model_version=version)
+    except OSError:
+        return
+    _refresh_partitions(scored_df, version)
+
+
+def _refresh_partitions(scored_df, version):
+    try:
+        write_partitions(scored_df, source_path=DATA_PATH, model_version=version)
+    except OSError:
+        pass
+
+
+@instrument("save")
+def save_data(df):
+    with timed("save.csv"):
+        df.to_csv(DATA_PATH, index=False)
+    # Snapshot exactly what a CSV reload would produce (new rows get scored here)
+    snapshot_df = df.copy()
+    if "customer_name" not in snapshot_df.columns:
+        snapshot_df["customer_name"] = "UNKNOWN"
+    refresh_snapshot(apply_scoring_cached(snapshot_df))
+
+
+def catch_up_csv():
+    """
+    Apply logged case changes the CSV missed (e.g. a crash between the event append
+    and the save) before a job rewrites it. The caller holds the portfolio lock.
+    Returns True if the CSV was behind
+    """
+    missing = events.unapplied()
+    if not missing:
+        return False
+    save_data(events.apply_events(with_case_versions(load_data()), missing))
+    events.mark_applied(missing[-1]["seq"])
+    return True
+
+
+def audit_log_version():
+    """Token of the audit trail; changes whenever an event is appended"""
+    return events.audit_version(legacy_path=AUDIT_PATH)
+
+
+def load_audit():
+    """The audit trail (timestamp, case_id, action, user, details), derived from the case event log"""
+    return events.audit_trail(legacy_path=AUDIT_PATH)
+
+
+@instrument("audit.write")
+def log_audit(case_id, action, user, details=""):
+    append_audit([audit_entry(case_id, action, user, details)])
+
+
+def audit_entry(case_id, action, user, details=""):
+    return {
+        "timestamp": datetime.now(),
+        "case_id": case_id,
+        "action": action,
+        "user": user,
+        "details": details
+    }
+
+
+def append_audit(entries):
+    """Log audit entries (dicts or a frame of audit columns) as events in one append (see storage/events.py)"""
+    if isinstance(entries, pd.DataFrame):
+        entries = entries.to_dict("records")
+    with file_lock(DATA_PATH):
+        events.append_events([events.audit_event(entry) for entry in entries])
+
+
+def case_version(df, case_id):
+    """Current version of a case (0 for cases written before versioning)"""
+    if VERSION_COLUMN not in df.columns:
+        return 0
+    versions = df.loc[df["case_id"] == case_id, VERSION_COLUMN]
+    return 0 if versions.empty or pd.isna(versions.iloc[-1]) else int(versions.iloc[-1])
+
+
+def with_case_versions(df):
+    """`df` with an integer version on every case (0 for cases written before versioning)"""
+    df = df.copy(deep=False)
+    if VERSION_COLUMN not in df.columns:
+        df[VERSION_COLUMN] = 0
+    elif df[VERSION_COLUMN].isna().any():
+        df[VERSION_COLUMN] = df[VERSION_COLUMN].fillna(0)
+    df[VERSION_COLUMN] = df[VERSION_COLUMN].astype("int64")
+    return df
+
+
+def highest_case_number(case_ids):
+    """Highest n among CASE_<n> ids (0 if there are none)"""
+    numbers = pd.Series(list(case_ids), dtype=object).astype(str).str.extract(
+        rf"^{CASE_ID_PREFIX}(\d+)$", expand=False)
+    highest = pd.to_numeric(numbers, errors="coerce").max()
+    return 0 if pd.isna(highest) else int(highest)
+
+
+def apply_case_changes(df, inserts=(), updates=(), taken_ids=()):
+    """
+    Append new case rows, then apply field updates [(case_id, expected_version, fields)]
+    in order. An insert without a case_id gets the next free CASE_<n>; one whose
+    case_id is live, in `taken_ids` (e.g. archived) or inserted earlier is rejected.
+    An update is rejected when expected_version (None = unconditional) is not the
+    case's version at that point; each accepted one bumps the version. Accepted
+    updates are written as one merged delta per case, column by column.
+    Returns (df, [case_id or the rejection error, per insert],
+    [new case version or the rejection error, per update])
+    """
+    used = set(df["case_id"]) | set(taken_ids)
+    accepted_rows, insert_outcomes = [], []
+    number = None
+    for row in inserts:
+        case_id = row.get("case_id")
+        if not case_id:
+            number = highest_case_number(used) + 1 if number is None else number
+            while f"{CASE_ID_PREFIX}{number}" in used:
+                number += 1
+            case_id = f"{CASE_ID_PREFIX}{number}"
+        if case_id in used:
+            insert_outcomes.append(DuplicateCase(case_id))
+            continue
+        used.add(case_id)
+        accepted_rows.append(dict(row, case_id=case_id))
+        insert_outcomes.append(case_id)
+    if accepted_rows:
+        df = pd.concat([df, pd.DataFrame(accepted_rows)], ignore_index=True)
+    df = with_case_versions(df)
+
+    present = df["case_id"].isin([case_id for case_id, _, _ in updates])
+    versions = dict(zip(df.loc[present, "case_id"], df.loc[present, VERSION_COLUMN]))
+    merged = {}
+    outcomes = []
+    for case_id, expected, fields in updates:
+        if case_id not in versions:
+            outcomes.append(KeyError(f"Case not found: {case_id}"))
+        elif expected is not None and expected != versions[case_id]:
+            outcomes.append(VersionConflict(case_id, expected, versions[case_id]))
+        else:
+            versions[case_id] += 1
+            merged.setdefault(case_id, {}).update(fields)
+            outcomes.append(versions[case_id])
+
+    for case_id in merged:
+        merged[case_id][VERSION_COLUMN] = versions[case_id]
+    columns = dict.fromkeys(column for fields in merged.values() for column in fields)
+    for column in columns:
+        values = {case_id: fields[column] for case_id, fields in merged.items() if column in fields}
+        mask = present & df["case_id"].isin(list(values))
+        df.loc[mask, column] = df.loc[mask, "case_id"].map(values)
+    return df, insert_outcomes, outcomes
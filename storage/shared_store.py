@@ -0,0 +1,69 @@
+import threading
+import numpy as np
+import pandas as pd
+from storage.snapshot import SNAPSHOT_DIR, read_manifest, is_snapshot_fresh, load_snapshot
+
+# ==================== SHARED READ-ONLY PORTFOLIO ====================
+#
+# One read-only mapping of the current snapshot per process, shared by every
+# Streamlit session in it. Numeric columns are np.memmap(mode="r") views, so all
+# sessions and all worker processes read the same page-cache pages (zero-copy).
+#
+# Sessions never touch the shared frame directly: they get a shallow view, and
+# Copy-on-Write turns any column a session writes (or adds) into a private overlay
+# column, leaving the base untouched.
+#
+# The same applies to each per-agency partition (storage/partitions.py): every
+# snapshot directory has its own process-wide mapping.
+
+if int(pd.__version__.split(".")[0]) < 3:
+    # Always on from pandas 3; required here so session writes never hit the maps
+    pd.set_option("mode.copy_on_write", True)
+
+_shared = {}  # snapshot_dir -> {"version_dir", "frame"}
+_shared_lock = threading.Lock()
+
+
+def get_shared_portfolio(source_path=None, model_version=None, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Process-wide read-only portfolio for the current snapshot version.
+    Remapped only when the snapshot changes; None if no fresh snapshot exists
+    """
+    manifest, version_dir = read_manifest(snapshot_dir)
+    if not is_snapshot_fresh(manifest, source_path, model_version):
+        return None
+
+    with _shared_lock:
+        shared = _shared.setdefault(snapshot_dir, {"version_dir": None, "frame": None})
+        if shared["version_dir"] != version_dir:
+            # Text stays object dtype so sessions share the decoded arrays as well
+            frame = load_snapshot(source_path, model_version, snapshot_dir,
+                                  mmap_mode="r", text_dtype=object)
+            if frame is None:
+                return None
+            shared["version_dir"] = version_dir
+            shared["frame"] = frame
+        return shared["frame"]
+
+
+def shared_version(snapshot_dir=SNAPSHOT_DIR):
+    """Snapshot version currently mapped by this process (None before the first map)"""
+    return _shared.get(snapshot_dir, {}).get("version_dir")
+
+
+def session_view(shared):
+    """
+    Per-session frame over the shared portfolio. Shares every base column;
+    only columns the session assigns or adds are materialized for it
+    """
+    return shared.copy(deep=False)
+
+
+def overlay_columns(view, shared):
+    """Columns of a session view that no longer share memory with the base frame"""
+    overlay = []
+    for column in view.columns:
+        if column not in shared.columns or not np.shares_memory(
+                view[column].to_numpy(), shared[column].to_numpy()):
+            overlay.append(column)
+    return overlay
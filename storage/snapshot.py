@@ -0,0 +1,236 @@
+import os
+import json
+import shutil
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# ==================== WARM-START PORTFOLIO SNAPSHOT ====================
+#
+# The fully scored portfolio is written column by column as .npy files that a new
+# process maps with np.load(mmap_mode=...) instead of parsing the CSV and rescoring
+# the book. Numeric columns are zero-copy views over the mapped file; text columns
+# are dictionary encoded (int32 codes + a categories array).
+#
+# Layout:
+#   data/portfolio_snapshot/CURRENT          -> name of the live version directory
+#   data/portfolio_snapshot/v<timestamp>/    -> manifest.json + one .npy per column
+#
+# A new version is fully written before CURRENT is atomically switched to it, so a
+# reader never sees a half-written snapshot.
+
+SNAPSHOT_DIR = "data/portfolio_snapshot"
+SNAPSHOT_FORMAT = 1
+
+
+def _source_signature(source_path):
+    """mtime/size of the CSV the snapshot was built from (None if absent)"""
+    if not source_path or not os.path.exists(source_path):
+        return None
+    stat = os.stat(source_path)
+    return {"path": source_path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _encode_column(values, base_path):
+    """Write one column; returns its manifest entry"""
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        array = values.to_numpy()
+        np.save(f"{base_path}.npy", array)
+        return {"kind": "numeric", "dtype": str(array.dtype)}
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        np.save(f"{base_path}.npy", values.to_numpy(dtype="datetime64[ns]").view(np.int64))
+        return {"kind": "datetime", "dtype": "datetime64[ns]"}
+
+    codes, categories = pd.factorize(values.astype(object), use_na_sentinel=True)
+    np.save(f"{base_path}.npy", codes.astype(np.int32))
+    np.save(f"{base_path}.categories.npy", np.asarray(categories.astype(str), dtype=str))
+    return {"kind": "text", "dtype": "str"}
+
+
+def _new_version(snapshot_dir):
+    os.makedirs(snapshot_dir, exist_ok=True)
+    version = f"v{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{os.getpid()}"
+    os.makedirs(os.path.join(snapshot_dir, version))
+    return version, os.path.join(snapshot_dir, version)
+
+
+def _publish(snapshot_dir, version, rows, columns, source_path, model_version):
+    """Write the manifest and make `version` current"""
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "rows": rows,
+        "columns": columns,
+        "source": _source_signature(source_path),
+        "model_version": model_version,
+        "created": datetime.now().isoformat(),
+    }
+    with open(os.path.join(snapshot_dir, version, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    # Atomic switch, then drop older versions (open maps of them stay valid)
+    pointer_tmp = os.path.join(snapshot_dir, f"CURRENT.{os.getpid()}.tmp")
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(snapshot_dir, "CURRENT"))
+
+    for entry in os.listdir(snapshot_dir):
+        if entry.startswith("v") and entry != version:
+            shutil.rmtree(os.path.join(snapshot_dir, entry), ignore_errors=True)
+
+
+def write_snapshot(df, source_path=None, model_version=None, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Persist a scored portfolio as a new snapshot version and make it current.
+    Returns the version directory name
+    """
+    version, version_dir = _new_version(snapshot_dir)
+    columns = []
+    for index, name in enumerate(df.columns):
+        entry = _encode_column(df[name], os.path.join(version_dir, f"c{index}"))
+        entry.update({"name": name, "file": f"c{index}"})
+        columns.append(entry)
+    _publish(snapshot_dir, version, len(df), columns, source_path, model_version)
+    return version
+
+
+# ---------- streamed books ----------
+#
+# A book too large to hold in memory (e.g. the nightly roll-forward) is written
+# from chunks: column_kinds() over the chunks fixes each column's type, then
+# write_snapshot_chunks() fills preallocated .npy files chunk by chunk, so only
+# one chunk is in memory. Text columns share one growing category table.
+
+_KIND_RANK = {"bool": 0, "int": 1, "float": 2, "text": 3}
+_KIND_DTYPE = {"bool": np.bool_, "int": np.int64, "float": np.float64, "text": np.int32}
+
+
+def column_kinds(chunk, kinds=None):
+    """Merge the kind of each column of `chunk` ("bool", "int", "float" or "text") into `kinds`"""
+    kinds = {} if kinds is None else kinds
+    for name in chunk.columns:
+        values = chunk[name]
+        if pd.api.types.is_bool_dtype(values):
+            kind = "bool"
+        elif pd.api.types.is_integer_dtype(values):
+            kind = "int"
+        elif pd.api.types.is_float_dtype(values):
+            kind = "float"  # also a text column with no value in this chunk: the merge keeps "text"
+        else:
+            kind = "text"
+        kinds[name] = max(kinds.get(name, kind), kind, key=_KIND_RANK.get)
+    return kinds
+
+
+def write_snapshot_chunks(chunks, kinds, rows, source_path=None, model_version=None, snapshot_dir=SNAPSHOT_DIR):
+    """
+    write_snapshot() for a book streamed as `chunks` (frames with the columns of
+    `kinds`, `rows` rows in all). Returns the version directory name
+    """
+    version, version_dir = _new_version(snapshot_dir)
+    names = list(kinds)
+    arrays = {name: np.lib.format.open_memmap(os.path.join(version_dir, f"c{index}.npy"), mode="w+",
+                                              dtype=_KIND_DTYPE[kinds[name]], shape=(rows,))
+              for index, name in enumerate(names)}
+    categories = {name: {} for name in names if kinds[name] == "text"}
+    start = 0
+    for chunk in chunks:
+        stop = start + len(chunk)
+        if stop > rows:
+            raise ValueError(f"more than the {rows} rows announced")
+        for name in names:
+            if kinds[name] == "text":
+                codes, uniques = pd.factorize(chunk[name].astype(object), use_na_sentinel=True)
+                known = categories[name]
+                # Chunk codes -> codes in the shared table; the trailing -1 maps missing values
+                shared = np.array([known.setdefault(str(value), len(known)) for value in uniques] + [-1],
+                                  dtype=np.int32)
+                arrays[name][start:stop] = shared[codes]
+            else:
+                arrays[name][start:stop] = chunk[name].to_numpy(dtype=_KIND_DTYPE[kinds[name]])
+        start = stop
+    if start != rows:
+        raise ValueError(f"{start} rows written, {rows} announced")
+
+    columns = []
+    for index, name in enumerate(names):
+        arrays[name].flush()
+        entry = {"kind": "numeric", "dtype": str(arrays[name].dtype)}
+        if kinds[name] == "text":
+            entry = {"kind": "text", "dtype": "str"}
+            np.save(os.path.join(version_dir, f"c{index}.categories.npy"), np.asarray(list(categories[name]), dtype=str))
+        entry.update({"name": name, "file": f"c{index}"})
+        columns.append(entry)
+    del arrays
+    _publish(snapshot_dir, version, rows, columns, source_path, model_version)
+    return version
+
+
+def read_manifest(snapshot_dir=SNAPSHOT_DIR):
+    """Manifest of the current snapshot plus its directory, or (None, None)"""
+    try:
+        with open(os.path.join(snapshot_dir, "CURRENT"), encoding="utf-8") as f:
+            version_dir = os.path.join(snapshot_dir, f.read().strip())
+        with open(os.path.join(version_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        return None, None
+    return manifest, version_dir
+
+
+def is_snapshot_fresh(manifest, source_path=None, model_version=None):
+    """A snapshot is stale if the source CSV or the scoring model changed since it was written"""
+    if manifest is None:
+        return False
+    if source_path is not None and manifest.get("source") != _source_signature(source_path):
+        return False
+    if model_version is not None and manifest.get("model_version") != model_version:
+        return False
+    return True
+
+
+def map_column(version_dir, entry, mmap_mode="c"):
+    """
+    Map one column from disk. Numeric columns come back as memmaps;
+    text columns as (codes memmap, categories array)
+    """
+    base = os.path.join(version_dir, entry["file"])
+    data = np.load(f"{base}.npy", mmap_mode=mmap_mode)
+    if entry["kind"] == "text":
+        return data, np.load(f"{base}.categories.npy")
+    if entry["kind"] == "datetime":
+        return data.view("datetime64[ns]")
+    return data
+
+
+def _decode_text(codes, categories):
+    """Codes -> object array of strings (NaN for missing)"""
+    lookup = np.append(categories.astype(object), np.nan)
+    return lookup[codes]
+
+
+def load_snapshot(source_path=None, model_version=None, snapshot_dir=SNAPSHOT_DIR, mmap_mode="c",
+                  text_dtype=None):
+    """
+    Map the current snapshot as a DataFrame, or return None if it is missing or stale.
+    mmap_mode="c" keeps the file read-only while letting the session mutate its frame.
+    text_dtype=None lets pandas infer the string dtype (as read_csv does)
+    """
+    manifest, version_dir = read_manifest(snapshot_dir)
+    if not is_snapshot_fresh(manifest, source_path, model_version):
+        return None
+
+    data = {}
+    try:
+        for entry in manifest["columns"]:
+            mapped = map_column(version_dir, entry, mmap_mode=mmap_mode)
+            if entry["kind"] == "text":
+                data[entry["name"]] = pd.Series(_decode_text(*mapped), dtype=text_dtype, copy=False)
+            else:
+                data[entry["name"]] = mapped
+    except OSError:
+        # Version replaced by a concurrent writer between reading CURRENT and mapping
+        return None
+    return pd.DataFrame(data, copy=False)
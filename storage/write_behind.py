@@ -0,0 +1,280 @@
+import os
+import atexit
+import queue
+import threading
+import time
+from perf import instrument
+from storage import archive, events, portfolio
+
+# ==================== WRITE-BEHIND QUEUE ====================
+#
+# UI actions enqueue case mutations and audit events and return immediately;
+# one background writer drains the queue in batches:
+#   - new cases get their case_id here, under the lock (duplicates are rejected)
+#   - case updates are row-level deltas, checked against per-case versions
+#     (compare-and-set) and merged per case
+#   - the batch's applied inserts, updates and audit events are one append to
+#     the case event log (storage/events.py), the source of truth
+#   - the case changes of a batch then cost one portfolio save (CSV + snapshot),
+#     which materializes the log; a CSV that missed events catches up first
+# Every submit returns a WriteTicket that is acknowledged once its batch is in
+# the log (ticket.wait()); a failed save after that leaves the tickets
+# committed and the CSV is caught up by the next batch or job. Pending writes
+# are flushed at interpreter shutdown.
+#
+# A batch is applied under the portfolio file lock to the latest CSV on disk, so
+# writers in other processes never lose each other's updates. The writer keeps
+# its working copy between batches and only rereads the CSV when another process
+# has changed it.
+#
+# Only the log append is row-level. The CSV has no in-place row update, so the
+# save still rewrites the whole file, snapshot and partitions once per batch,
+# and it holds the one portfolio lock while it does; rescoring is per changed
+# row (models/score_cache.py). Batching is what bounds that cost: a burst of UI
+# writes pays for one save, not one per write.
+
+WRITE_BATCH_LINGER_S = 0.05  # after the first op, wait this long for more to batch
+WRITE_BATCH_MAX_OPS = 1000
+SHUTDOWN_FLUSH_TIMEOUT_S = 30
+
+
+class WriteTicket:
+    """Durability acknowledgement for one submitted write"""
+
+    def __init__(self, kind, case_id):
+        self.kind = kind
+        self.case_id = case_id
+        self.error = None
+        self.version = None  # case version an applied update produced
+        self._committed = threading.Event()
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self._committed.is_set()
+
+    def wait(self, timeout=None):
+        """True once the write is durable (check .error for failures)"""
+        return self._committed.wait(timeout)
+
+    def add_done_callback(self, callback):
+        """Call `callback(ticket)` once the write is resolved (on the writer thread; now if it already is)"""
+        with self._callbacks_lock:
+            if not self.done:
+                self._callbacks.append(callback)
+                return
+        _run_callback(callback, self)
+
+    def _resolve(self, error=None):
+        self.error = error
+        with self._callbacks_lock:
+            self._committed.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            _run_callback(callback, self)
+
+
+def _run_callback(callback, ticket):
+    try:
+        callback(ticket)
+    except Exception:
+        _stats["callback_errors"] += 1
+
+
+_queue = queue.Queue()
+_state = {"thread": None, "frame": None, "source_mtime_ns": None}
+_stats = {"submitted": 0, "batches": 0, "coalesced": 0, "failed": 0, "save_failures": 0, "last_save_error": None,
+          "callback_errors": 0}
+_lock = threading.Lock()
+
+
+def _submit(kind, case_id, payload):
+    ticket = WriteTicket(kind, case_id)
+    with _lock:
+        if _state["thread"] is None or not _state["thread"].is_alive():
+            thread = threading.Thread(target=_writer_loop, name="write-behind", daemon=True)
+            thread.start()
+            _state["thread"] = thread
+        _stats["submitted"] += 1
+    _queue.put((kind, case_id, payload, ticket))
+    return ticket
+
+
+def submit_case_update(case_id, expected_version=None, audit_event=None, **fields):
+    """
+    Queue field changes for an existing case. With expected_version (the
+    case_version the caller read) the update is compare-and-set: it fails with
+    VersionConflict if anyone changed the case in between. audit_event
+    (portfolio.audit_entry) is logged only if the update is applied
+    """
+    return _submit("update", case_id, (expected_version, fields, audit_event))
+
+
+def submit_case_insert(row, audit_events=()):
+    """
+    Queue a new case row. Without a case_id the writer allocates the next free
+    CASE_<n> under the lock (ticket.case_id once committed); an insert whose
+    case_id is already live or archived fails with DuplicateCase. audit_events
+    (portfolio.audit_entry, case_id filled in) are logged only if it is applied
+    """
+    return _submit("insert", row.get("case_id"), (dict(row), list(audit_events)))
+
+
+def submit_audit(case_id, action, user, details=""):
+    """Queue an audit event (timestamped when it is logged)"""
+    return _submit("audit", case_id, portfolio.audit_entry(case_id, action, user, details))
+
+
+def _next_batch():
+    batch = [_queue.get()]
+    deadline = time.monotonic() + WRITE_BATCH_LINGER_S
+    while len(batch) < WRITE_BATCH_MAX_OPS:
+        remaining = deadline - time.monotonic()
+        try:
+            batch.append(_queue.get(timeout=remaining) if remaining > 0 else _queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _writer_loop():
+    while True:
+        batch = _next_batch()
+        try:
+            _commit(batch)
+        except Exception as e:
+            _stats["failed"] += len(batch)
+            _state["frame"] = None  # reread the CSV next time
+            for *_, ticket in batch:
+                ticket._resolve(e)
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+
+def _working_frame():
+    """Writer's copy of the portfolio CSV, reread only if changed behind its back"""
+    try:
+        mtime_ns = os.stat(portfolio.DATA_PATH).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    if _state["frame"] is None or mtime_ns != _state["source_mtime_ns"]:
+        _state["frame"] = portfolio.load_data()
+        _state["source_mtime_ns"] = mtime_ns
+    return _state["frame"]
+
+
+@instrument("write.batch")
+def _commit(batch):
+    inserts, updates = [], []
+    for kind, case_id, payload, _ in batch:
+        if kind == "insert":
+            inserts.append(payload[0])
+        elif kind == "update":
+            expected_version, fields, _ = payload
+            updates.append((case_id, expected_version, fields))
+
+    with portfolio.file_lock(portfolio.DATA_PATH):
+        base = portfolio.with_case_versions(_working_frame())
+        base, caught_up = events.catch_up(base)
+        events.ensure_checkpoint(base)
+        events.ensure_tracked()  # so a save that fails after the append is caught up later
+        archived = archive.load_archive()["case_id"] if inserts else ()
+        df, insert_outcomes, outcomes = portfolio.apply_case_changes(base, inserts, updates, taken_ids=archived)
+        logged = _batch_events(batch, insert_outcomes, outcomes)
+        changed = any(entry["type"] != events.AUDIT_KIND for entry in logged)
+        # One append holds the batch's case changes and audit events: the log is the
+        # source of truth, the CSV save below only materializes it
+        seq = events.append_events(logged) if logged else None
+        try:
+            if seq is not None:
+                events.checkpoint_if_due(df, seq)
+            if changed or caught_up:
+                portfolio.save_data(df)
+                _state["source_mtime_ns"] = os.stat(portfolio.DATA_PATH).st_mtime_ns
+            if seq is not None:
+                events.mark_applied(seq)
+            _state["frame"] = df
+        except Exception as e:
+            # The batch is durable in the log; the next commit catches the CSV up from it
+            _state["frame"] = None
+            _stats["save_failures"] += 1
+            _stats["last_save_error"] = f"{type(e).__name__}: {e}"
+
+    accepted = [case_id for (case_id, _, _), outcome in zip(updates, outcomes) if not isinstance(outcome, Exception)]
+    _stats["coalesced"] += len(accepted) - len(set(accepted))
+    _stats["batches"] += 1
+    insert_outcomes, outcomes = iter(insert_outcomes), iter(outcomes)
+    for kind, _, _, ticket in batch:
+        if kind == "insert":
+            outcome = next(insert_outcomes)
+            if not isinstance(outcome, Exception):
+                ticket.case_id, outcome = outcome, None  # the allocated id; inserts carry no version
+        else:
+            outcome = next(outcomes) if kind == "update" else None
+        if isinstance(outcome, Exception):
+            ticket._resolve(outcome)
+        else:
+            ticket.version = outcome
+            ticket._resolve()
+
+
+def _batch_events(batch, insert_outcomes, outcomes):
+    """
+    Events of one batch, in submission order: applied inserts and updates (with
+    their audit entry, if any) and audit events. Audit entries of rejected
+    inserts and updates are dropped with them
+    """
+    logged = []
+    insert_outcomes, outcomes = iter(insert_outcomes), iter(outcomes)
+    for kind, case_id, payload, _ in batch:
+        if kind == "insert":
+            row, audits = payload
+            case_id = next(insert_outcomes)
+            if isinstance(case_id, Exception):
+                continue
+            first = audits[0] if audits else {}
+            logged.append(events.event(case_id, "create", dict(row, case_id=case_id, **{portfolio.VERSION_COLUMN: 0}),
+                                       version=0, action=first.get("action"), user=first.get("user"),
+                                       details=first.get("details")))
+            logged.extend(events.audit_event(dict(entry, case_id=case_id)) for entry in audits[1:])
+        elif kind == "update":
+            _, fields, audit = payload
+            version = next(outcomes)
+            if isinstance(version, Exception):
+                continue
+            audit = audit or {}
+            logged.append(events.event(case_id, "update", dict(fields, **{portfolio.VERSION_COLUMN: version}),
+                                       version=version, action=audit.get("action"), user=audit.get("user"),
+                                       details=audit.get("details")))
+        else:
+            logged.append(events.audit_event(payload))
+    return logged
+
+
+def pending_writes():
+    """Submitted writes not yet committed"""
+    return _queue.unfinished_tasks
+
+
+def flush(timeout=None):
+    """Block until every write submitted so far is committed; False on timeout"""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with _queue.all_tasks_done:
+        while _queue.unfinished_tasks:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            _queue.all_tasks_done.wait(remaining)
+    return True
+
+
+def writer_stats():
+    return dict(_stats, pending=pending_writes())
+
+
+@atexit.register
+def _flush_on_shutdown():
+    if _state["thread"] is not None and _state["thread"].is_alive():
+        flush(SHUTDOWN_FLUSH_TIMEOUT_S)
@@ -0,0 +1,46 @@
+import os
+import pandas as pd
+import pytest
+from storage import write_behind
+
+
+def make_book(n=6):
+    """A small unscored portfolio as it is stored in the CSV"""
+    return pd.DataFrame({
+        "case_id": [f"CASE_{i:03d}" for i in range(1, n + 1)],
+        "customer_name": [f"Customer {i % 3}" for i in range(1, n + 1)],
+        "ageing_days": [5 * i for i in range(1, n + 1)],
+        "invoice_amount": [10000.0 * i for i in range(1, n + 1)],
+        "business_type": [("Enterprise", "Large", "Medium", "Small")[i % 4] for i in range(n)],
+        "dispute_status": ["None"] * n,
+        "assigned_dca": [f"DCA Agent {i % 2 + 1}" for i in range(1, n + 1)],
+        "last_dca_update_days": [i for i in range(1, n + 1)],
+        "status": ["ACTIVE"] * n,
+        "created_date": ["2026-01-01"] * n,
+    })
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty project data directory (every storage path is relative to data/)"""
+    os.makedirs(tmp_path / "data")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def stored_book(workdir):
+    """workdir with a portfolio CSV"""
+    book = make_book()
+    book.to_csv("data/nexus_accounts.csv", index=False)
+    return book
+
+
+@pytest.fixture
+def writer(stored_book):
+    """The write-behind writer starting from the stored book"""
+    write_behind.flush(30)
+    write_behind._state.update(frame=None, source_mtime_ns=None)
+    yield write_behind
+    write_behind.flush(30)
+    write_behind._state.update(frame=None, source_mtime_ns=None)
@@ -0,0 +1,241 @@
+import numpy as np
+
+# ==================== ROW-WISE REFERENCE MODEL ====================
+#
+# The row-by-row scoring model as it stood before the declarative ruleset
+# (models/scoring_rules.json), kept verbatim so tests can check the compiled
+# evaluators against it.
+
+def compute_recovery_score(row):
+    """
+    Multi-factor recovery prediction model using weighted ML approach
+    Factors: Ageing, Business Type, Dispute, DCA Performance, Payment History
+    """
+    score = 0.5  # Base score
+    
+    # 1. AGEING DECAY (exponential decay - older cases lose value faster)
+    ageing_days = row["ageing_days"]
+    ageing_factor = np.exp(-0.015 * ageing_days) * 0.35
+    score += ageing_factor
+    
+    # 2. BUSINESS SEGMENT MULTIPLIER (enterprise vs SMB)
+    business_multiplier = {
+        "Enterprise": 1.25,
+        "Large": 1.10,
+        "Medium": 0.95,
+        "Small": 0.70
+    }
+    segment_boost = business_multiplier.get(row.get("business_type", "Medium"), 0.95) - 1
+    score += segment_boost * 0.15
+    
+    # 3. DISPUTE IMPACT (critical blocker)
+    if row.get("dispute_status") == "Open":
+        score -= 0.40
+    elif row.get("dispute_status") == "Resolved":
+        score += 0.10
+    elif row.get("dispute_status") == "Pending_Resolution":
+        score -= 0.20
+    
+    # 4. DCA RESPONSIVENESS (accountability metric)
+    last_update = row.get("last_dca_update_days", 30)
+    responsiveness = max(0, 1 - (last_update / 30)) * 0.20
+    score += responsiveness
+    
+    if last_update > 14:
+        score -= 0.15
+    
+    # 5. PAYMENT HISTORY (if available)
+    if "payment_history" in row and row["payment_history"] == "Good":
+        score += 0.15
+    elif "payment_history" in row and row["payment_history"] == "Bad":
+        score -= 0.20
+    
+    # 6. SLA BREACH PENALTY
+    if row.get("sla_status") == "BREACHED":
+        score -= 0.25
+    elif row.get("sla_status") == "AT_RISK":
+        score -= 0.10
+    
+    # 7. INVOICE AMOUNT NORMALIZATION (larger amounts = higher urgency)
+    invoice_normalized = min(row.get("invoice_amount", 100000) / 500000, 1.0)
+    score += invoice_normalized * 0.10
+    
+    # Normalize to 0-1 range with sigmoid-like scaling
+    final_score = max(0, min(score, 1.0))
+    return round(final_score, 3)
+
+
+def compute_recovery_probability(row):
+    """Estimates actual recovery probability (0-100%)"""
+    base_probability = compute_recovery_score(row) * 100
+    
+    # Adjust based on ageing
+    if row["ageing_days"] > 180:
+        base_probability *= 0.6
+    elif row["ageing_days"] > 120:
+        base_probability *= 0.75
+    elif row["ageing_days"] > 60:
+        base_probability *= 0.9
+    
+    return round(base_probability, 1)
+
+
+def compute_priority_score(row):
+    """
+    Priority = Recovery Probability × Invoice Amount × Urgency Factor
+    Higher score = Higher priority for DCA allocation
+    """
+    recovery_prob = compute_recovery_score(row)
+    invoice_amount = row.get("invoice_amount", 100000)
+    
+    # Urgency increases with ageing
+    urgency = 1 + (row["ageing_days"] / 180)  # 1.0 to 2.0+ factor
+    
+    priority = recovery_prob * invoice_amount * urgency
+    return round(priority, 0)
+
+
+def next_best_action(row):
+    """
+    AI-driven action recommendation engine
+    """
+    # BLOCKER CHECKS
+    if row.get("dispute_status") == "Open":
+        return "🛑 Resolve Dispute First"
+    
+    if row.get("last_dca_update_days", 0) > 14:
+        return "⚠️ Auto-Escalate: DCA Unresponsive"
+    
+    if row.get("sla_status") == "BREACHED":
+        return "🚨 CRITICAL: SLA Breach - Manager Review"
+    
+    # RECOVERY PROBABILITY BASED ACTIONS
+    recovery_prob = compute_recovery_probability(row)
+    invoice_amount = row.get("invoice_amount", 0)
+    ageing_days = row.get("ageing_days", 0)
+    
+    # High-value escalations
+    if invoice_amount > 500000 and ageing_days > 90:
+        return "👨‍⚖️ Escalate to Legal Team"
+    
+    if invoice_amount > 250000 and recovery_prob < 30:
+        return "📋 Review for Settlement / Write-off"
+    
+    # Recovery probability driven actions
+    if recovery_prob > 80:
+        return "💪 Aggressive Follow-up - High Success Rate"
+    elif recovery_prob > 60:
+        return "📞 Priority Follow-up Campaign"
+    elif recovery_prob > 40:
+        return "✉️ Standard Collection Process"
+    elif recovery_prob > 20:
+        return "⏳ Nurture Phase - Periodic Contact"
+    else:
+        return "📊 Low Probability - Review Strategy"
+
+
+def calculate_expected_recovery(row):
+    """Expected recovery amount = Invoice × Recovery Probability"""
+    recovery_prob = compute_recovery_probability(row) / 100
+    return round(row.get("invoice_amount", 0) * recovery_prob, 2)
+
+
+def compute_churn_risk(row):
+    """
+    Churn Risk Prediction: Probability that customer WON'T pay
+    High churn risk = customer likely to default/abandon
+    Factors: Aging, dispute status, DCA inactivity, business type
+    Returns: 0-100 (0=low risk, 100=high risk)
+    """
+    churn_score = 0
+    
+    # AGING FACTOR (critical) - older cases have higher churn
+    ageing = row.get("ageing_days", 0)
+    if ageing > 180:
+        churn_score += 40
+    elif ageing > 120:
+        churn_score += 30
+    elif ageing > 60:
+        churn_score += 15
+    
+    # DISPUTE STATUS (major predictor)
+    if row.get("dispute_status") == "Open":
+        churn_score += 35
+    elif row.get("dispute_status") == "Pending_Resolution":
+        churn_score += 15
+    
+    # DCA INACTIVITY (indicates customer disengagement)
+    last_update = row.get("last_dca_update_days", 0)
+    if last_update > 21:
+        churn_score += 25
+    elif last_update > 14:
+        churn_score += 15
+    
+    # BUSINESS TYPE (SMB higher churn than Enterprise)
+    business_type = row.get("business_type", "Medium")
+    if business_type == "Small":
+        churn_score += 20
+    elif business_type == "Medium":
+        churn_score += 10
+    
+    # SLA STATUS
+    if row.get("sla_status") == "BREACHED":
+        churn_score += 20
+    
+    # NORMALIZE TO 0-100
+    churn_risk = min(max(churn_score, 0), 100)
+    return round(churn_risk, 1)
+
+
+def compute_optimal_followup_timing(row):
+    """
+    Optimal Follow-up Timing Recommendation
+    Based on aging pattern, recovery probability, and DCA activity
+    Returns: Days until optimal follow-up
+    """
+    recovery_prob = compute_recovery_probability(row)
+    ageing = row.get("ageing_days", 0)
+    last_update = row.get("last_dca_update_days", 0)
+    
+    # High probability cases: follow up faster
+    if recovery_prob > 75:
+        optimal_days = 3  # Aggressive 3-day cycle
+    elif recovery_prob > 60:
+        optimal_days = 5  # Medium-aggressive
+    elif recovery_prob > 40:
+        optimal_days = 7  # Weekly follow-ups
+    elif recovery_prob > 20:
+        optimal_days = 14  # Bi-weekly for low probability
+    else:
+        optimal_days = 30  # Monthly for very low probability
+    
+    # ADJUST for aging
+    if ageing > 150:
+        optimal_days = max(1, optimal_days - 2)  # Increase frequency
+    
+    # If DCA hasn't updated in a while, force immediate action
+    if last_update > 14:
+        optimal_days = 1
+    
+    return optimal_days
+
+
+def risk_assessment(row):
+    """
+    Risk categorization for portfolio management
+    HIGH: >120 days ageing + open disputes
+    MEDIUM: 60-120 days
+    LOW: <60 days
+    """
+    ageing = row.get("ageing_days", 0)
+    
+    if ageing > 120 and row.get("dispute_status") == "Open":
+        return "CRITICAL"
+    elif ageing > 120:
+        return "HIGH"
+    elif ageing > 60:
+        return "MEDIUM"
+    else:
+        return "LOW"
+
+
@@ -0,0 +1,65 @@
+import gzip
+import io
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from storage import export
+
+
+def _view():
+    return pd.DataFrame({
+        "case_id": ["A", "B", "C", "D", "E"],
+        "customer_name": ["Acme, Ltd", "Beta", None, "Delta", "Echo"],
+        "invoice_amount": [1234.0, 1234567.9, np.nan, -2500.0, 0.0],
+        "recovery_probability": [0.5, 12.25, np.nan, 100.0, 0.0],
+        "ageing_days": [1, 2, 3, 4, 5],
+    })
+
+
+def test_csv_and_gzip_round_trip():
+    df = _view()
+    plain = export.export_bytes(df, "csv")
+    pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(plain)), df)
+    assert gzip.decompress(export.export_bytes(df, "csv.gz")) == plain
+
+
+def test_rows_columns_and_chunking():
+    df = _view()
+    rows = np.array([4, 0, 2])
+    chunks = list(export.iter_export(df, "csv", rows=rows, columns=["case_id", "ageing_days"], chunk_rows=2))
+    assert len(chunks) == 2
+    assert b"".join(chunks).decode() == "case_id,ageing_days\nE,5\nA,1\nC,3\n"
+
+
+def test_formatted_csv():
+    formatted = pd.read_csv(io.BytesIO(export.export_bytes(_view(), "csv", formatted=True)),
+                            keep_default_na=False)
+    assert formatted["invoice_amount"].tolist() == ["₹1,234", "₹1,234,567", "", "₹-2,500", "₹0"]
+    assert formatted["recovery_probability"].tolist() == ["0.5%", "12.25%", "", "100.0%", "0.0%"]
+
+
+def test_parquet_round_trip():
+    pytest.importorskip("pyarrow")
+    df = _view()
+    chunks = list(export.iter_export(df, "parquet", chunk_rows=2))
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(b"".join(chunks))), df, check_dtype=False)
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="Unknown export format"):
+        export.export_bytes(_view(), "xlsx")
+
+
+def test_file_names_and_write_export(tmp_path):
+    when = datetime(2026, 3, 1, 9, 30, 5, 123456)
+    assert export.export_file_name("portfolio", "csv.gz", when) == "portfolio_20260301_093005_123456.csv.gz"
+    assert export.export_file_name("portfolio", "csv", when, unique="ab12") == "portfolio_20260301_093005_123456_ab12.csv"
+
+    path = tmp_path / "out.csv"
+    progress = []
+    written = export.write_export(_view(), str(path), "csv", rows=[1, 3],
+                                  progress=lambda done, total: progress.append(total))
+    assert written == path.stat().st_size and progress == [2]
+    assert pd.read_csv(path)["case_id"].tolist() == ["B", "D"]
+    assert not (tmp_path / "out.csv.tmp").exists()
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from storage import history
+
+FIRST_DAY = date(2026, 1, 1)
+COLUMNS = ["case_id", *history.TRACKED_COLUMNS]
+
+
+def _scored(n=8):
+    return pd.DataFrame({
+        "case_id": [f"CASE_{i}" for i in range(1, n + 1)],
+        "assigned_dca": [("DCA 1", "DCA 2", None)[i % 3] for i in range(n)],
+        "status": ["ACTIVE"] * n,
+        "risk_level": [history.RISK_ORDER[i % 4] for i in range(n)],
+        "sla_status": ["OK"] * n,
+        "ageing_days": list(range(10, 10 + n)),
+        "invoice_amount": [1000.0 * (i + 1) for i in range(n)],
+        "expected_recovery": [400.0 * (i + 1) for i in range(n)],
+        "recovery_probability": [0.4] * (n - 1) + [np.nan],
+        "priority_score": [float(i) for i in range(n)],
+    })
+
+
+def _next_day(df, day):
+    """Ageing moves on; a case closes, one leaves, one arrives, an amount changes"""
+    df = df.copy()
+    df["ageing_days"] += 1
+    df.loc[day % len(df), "status"] = "CLOSED"
+    df.loc[(day + 1) % len(df), "expected_recovery"] = 123.0 * day
+    df.loc[(day + 2) % len(df), "sla_status"] = "BREACHED"
+    df.loc[(day + 3) % len(df), "recovery_probability"] = np.nan if day % 2 else 0.9
+    arrived = df.iloc[[-1]].assign(case_id=f"NEW_{day}", risk_level="HIGH", assigned_dca=None)
+    return pd.concat([df.iloc[1:], arrived], ignore_index=True)
+
+
+def _expected(df):
+    frame = history._frame(history._state(df))
+    return frame[COLUMNS].reset_index(drop=True)
+
+
+def test_keyframes_and_deltas_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, "KEYFRAME_EVERY", 3)
+    books, df = [], _scored()
+    for offset in range(7):
+        history.record_day(df, FIRST_DAY + timedelta(days=offset), history_dir=tmp_path)
+        books.append(df)
+        df = _next_day(df, offset + 1)
+
+    kinds = [entry["kind"] for entry in history.list_days(tmp_path)]
+    assert kinds == ["key", "delta", "delta", "key", "delta", "delta", "key"]
+    for offset, book in enumerate(books):
+        stored = history.book_as_of(FIRST_DAY + timedelta(days=offset), history_dir=tmp_path)
+        pd.testing.assert_frame_equal(stored[COLUMNS].reset_index(drop=True), _expected(book))
+
+    totals = history.daily_totals(history_dir=tmp_path)
+    assert totals["cases"].tolist() == [len(book) for book in books]
+    assert totals["expected_recovery"].tolist() == pytest.approx([book["expected_recovery"].sum() for book in books])
+    assert totals["sla_breaches"].tolist() == [(book["sla_status"] == "BREACHED").sum() for book in books]
+
+    trends = history.dca_trends("ageing_days", history_dir=tmp_path)  # rebuilt from the deltas
+    assert trends.loc[pd.Timestamp(FIRST_DAY + timedelta(days=6)), "UNASSIGNED"] == \
+        books[6].loc[books[6]["assigned_dca"].isna(), "ageing_days"].sum()
+
+
+def test_history_is_append_only(tmp_path):
+    history.record_day(_scored(), "2026-01-02", history_dir=tmp_path)
+    history.record_day(_next_day(_scored(), 1), "2026-01-02", history_dir=tmp_path)  # the latest day may be redone
+    assert [entry["day"] for entry in history.list_days(tmp_path)] == ["2026-01-02"]
+    assert history.book_as_of("2026-01-02", history_dir=tmp_path)["case_id"].iloc[-1] == "NEW_1"
+    with pytest.raises(ValueError, match="append-only"):
+        history.record_day(_scored(), "2026-01-01", history_dir=tmp_path)
+    assert history.book_as_of("2025-12-31", history_dir=tmp_path) is None
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+import pandas as pd
+from jobs.nudges import NUDGE_ACTION, RecentNudges, plan_nudges, send_nudges
+from storage import portfolio
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+def _book():
+    return pd.DataFrame({
+        "case_id": ["A", "B", "C", "D", "E"],
+        "assigned_dca": ["DCA 1", "DCA 1", "DCA 1", "DCA 2", "DCA 2"],
+        "status": ["ACTIVE", "ACTIVE", "ACTIVE", "CLOSED", "ACTIVE"],
+        "sla_status": ["BREACHED", "OK", "OK", "BREACHED", "OK"],
+        "last_dca_update_days": [1, 20, 30, 30, 2],
+        "priority_score": [10.0, 30.0, 20.0, 50.0, 40.0],
+    })
+
+
+def test_candidates_are_open_quiet_or_breached_cases_by_priority(workdir):
+    planned = plan_nudges(_book(), RecentNudges(), now=NOW)
+    assert planned["case_id"].tolist() == ["B", "C", "A"]
+    assert planned.set_index("case_id").loc["A", "reason"] == "SLA breached"
+    assert plan_nudges(_book(), RecentNudges(), now=NOW, max_per_dca=2)["case_id"].tolist() == ["B", "C"]
+
+
+def test_nudged_cases_wait_out_the_cooldown(workdir):
+    index = RecentNudges()
+    assert send_nudges(plan_nudges(_book(), index, now=NOW), index, now=NOW) == {"DCA 1": 3}
+    assert plan_nudges(_book(), index, now=NOW + timedelta(hours=1)).empty
+
+    # A fresh process reads the nudges back from the event log, stamped when they were sent
+    fresh = RecentNudges()
+    assert plan_nudges(_book(), fresh, now=NOW + timedelta(hours=71)).empty
+    trail = portfolio.load_audit()
+    assert trail.loc[trail["action"] == NUDGE_ACTION, "timestamp"].tolist() == [NOW.isoformat(sep=" ")] * 3
+    later = plan_nudges(_book(), fresh, now=NOW + timedelta(hours=73))
+    assert later["case_id"].tolist() == ["B", "C", "A"]
+
+
+def test_overlapping_runs_nudge_a_case_once(workdir):
+    first, second = RecentNudges(), RecentNudges()
+    planned_first = plan_nudges(_book(), first, now=NOW)
+    planned_second = plan_nudges(_book(), second, now=NOW + timedelta(minutes=1))
+    assert send_nudges(planned_first, first, now=NOW) == {"DCA 1": 3}
+    assert send_nudges(planned_second, second, now=NOW + timedelta(minutes=1)) == {}
+    assert (portfolio.load_audit()["action"] == NUDGE_ACTION).sum() == 3
+
+
+def test_legacy_audit_csv_nudges_count(workdir):
+    pd.DataFrame([{"timestamp": NOW.isoformat(sep=" "), "case_id": "B", "action": NUDGE_ACTION,
+                   "user": "Nudge Engine", "details": ""}]).to_csv(portfolio.AUDIT_PATH, index=False)
+    assert plan_nudges(_book(), RecentNudges(), now=NOW + timedelta(hours=1))["case_id"].tolist() == ["C", "A"]
@@ -0,0 +1,58 @@
+from conftest import make_book
+from storage.portfolio import (VERSION_COLUMN, DuplicateCase, VersionConflict, apply_case_changes,
+                               case_version, highest_case_number)
+
+
+def test_update_bumps_version_and_rejects_stale_expectation():
+    df, _, outcomes = apply_case_changes(make_book(), updates=[
+        ("CASE_001", 0, {"status": "ESCALATED"}),
+        ("CASE_001", 0, {"status": "CLOSED"}),  # read before the first update
+        ("CASE_001", 1, {"assigned_dca": "DCA Agent 3"}),
+    ])
+    assert outcomes[0] == 1
+    assert isinstance(outcomes[1], VersionConflict)
+    assert outcomes[1].current == 1
+    assert outcomes[2] == 2
+    case = df.set_index("case_id").loc["CASE_001"]
+    assert (case["status"], case["assigned_dca"], case[VERSION_COLUMN]) == ("ESCALATED", "DCA Agent 3", 2)
+    assert case_version(df, "CASE_002") == 0
+
+
+def test_unconditional_and_unknown_updates():
+    df, _, outcomes = apply_case_changes(make_book(), updates=[
+        ("CASE_002", None, {"status": "CLOSED"}),
+        ("CASE_999", None, {"status": "CLOSED"}),
+    ])
+    assert outcomes[0] == 1
+    assert isinstance(outcomes[1], KeyError)
+    assert (df["status"] == "CLOSED").sum() == 1
+
+
+def test_inserts_get_the_next_free_case_id():
+    assert highest_case_number(["CASE_001", "CASE_010", "CASE_7", "OTHER_99"]) == 10
+    assert highest_case_number([]) == 0
+    df, inserted, _ = apply_case_changes(make_book(), inserts=[{"customer_name": "A"}, {"customer_name": "B"}],
+                                         taken_ids=["CASE_7"])
+    assert inserted == ["CASE_8", "CASE_9"]  # past the archived CASE_7
+    assert df.set_index("case_id").loc[["CASE_8", "CASE_9"], VERSION_COLUMN].tolist() == [0, 0]
+
+
+def test_duplicate_inserts_are_rejected():
+    df, inserted, _ = apply_case_changes(make_book(), inserts=[
+        {"case_id": "CASE_001", "customer_name": "live"},
+        {"case_id": "CASE_ARCHIVED", "customer_name": "archived"},
+        {"case_id": "CASE_NEW", "customer_name": "first"},
+        {"case_id": "CASE_NEW", "customer_name": "second"},
+    ], taken_ids=["CASE_ARCHIVED"])
+    assert [type(outcome) for outcome in inserted] == [DuplicateCase, DuplicateCase, str, DuplicateCase]
+    assert inserted[0].case_id == "CASE_001"
+    assert len(df) == len(make_book()) + 1
+    assert df.set_index("case_id").loc["CASE_NEW", "customer_name"] == "first"
+
+
+def test_updates_apply_to_cases_inserted_in_the_same_batch():
+    df, inserted, outcomes = apply_case_changes(make_book(), inserts=[{"case_id": "CASE_NEW"}],
+                                                updates=[("CASE_NEW", 0, {"status": "ACTIVE"})])
+    assert inserted == ["CASE_NEW"]
+    assert outcomes == [1]
+    assert df.set_index("case_id").loc["CASE_NEW", "status"] == "ACTIVE"
@@ -0,0 +1,50 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+import pytest
+from jobs.rollforward import roll_forward_file
+from storage import events, portfolio, snapshot
+
+
+def test_snapshot_written_from_chunks_matches_the_whole_book(tmp_path):
+    book = pd.DataFrame({
+        "case_id": ["A", "B", "C", "D", "E"],
+        "note": [np.nan, np.nan, "x", np.nan, "y"],  # the first chunk has no text
+        "ageing_days": [1, 2, 3, 4, 5],
+        "amount": [1.5, 2.0, np.nan, 4.0, 5.5],
+        "flag": [True, False, True, True, False],
+    })
+    chunks = [book.iloc[:2], book.iloc[2:4], book.iloc[4:]]
+    kinds = {}
+    for chunk in chunks:
+        snapshot.column_kinds(chunk, kinds)
+    assert kinds == {"case_id": "text", "note": "text", "ageing_days": "int", "amount": "float", "flag": "bool"}
+    snapshot.write_snapshot_chunks(iter(chunks), kinds, len(book), snapshot_dir=tmp_path / "chunked")
+    snapshot.write_snapshot(book, snapshot_dir=tmp_path / "whole")
+    pd.testing.assert_frame_equal(snapshot.load_snapshot(snapshot_dir=tmp_path / "chunked"),
+                                  snapshot.load_snapshot(snapshot_dir=tmp_path / "whole"))
+    with pytest.raises(ValueError, match="announced"):
+        snapshot.write_snapshot_chunks(iter(chunks), kinds, 4, snapshot_dir=tmp_path / "short")
+
+
+def test_roll_forward_streams_missed_events_and_the_checkpoint(stored_book):
+    events.ensure_checkpoint(portfolio.with_case_versions(stored_book))
+    events.mark_applied(events._last_seq())
+    events.append_events([  # logged, but the CSV save never happened
+        events.event("CASE_002", "update", {"status": "CLOSED", portfolio.VERSION_COLUMN: 1}, version=1),
+        events.event("CASE_003", "archive"),
+        events.event("CASE_010", "create", {"customer_name": "Late", "ageing_days": 0, "status": "ACTIVE",
+                                            "created_date": "2026-02-01", portfolio.VERSION_COLUMN: 0}, version=0),
+    ])
+    rows, _ = roll_forward_file(as_of=date(2026, 3, 1), chunk_rows=2)
+    stored = pd.read_csv(portfolio.DATA_PATH).set_index("case_id")
+    assert rows == len(stored) == 6
+    assert "CASE_003" not in stored.index
+    assert stored.loc["CASE_002", "status"] == "CLOSED"
+    assert stored.loc["CASE_010", "ageing_days"] == 28
+    assert (stored["days_as_of"] == "2026-03-01").all()
+    assert events.unapplied() == []
+    assert events.drift(pd.read_csv(portfolio.DATA_PATH), events.replay()) == []
+
+    with pytest.raises(ValueError, match="cannot roll back"):
+        roll_forward_file(as_of=date(2026, 2, 1), chunk_rows=2)
@@ -0,0 +1,101 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+import legacy_scoring as legacy
+from models import rules, scoring
+from models.rules import evaluate_ruleset, get_compiled_ruleset
+
+LEGACY_OUTPUTS = {
+    "recovery_score": legacy.compute_recovery_score,
+    "recovery_probability": legacy.compute_recovery_probability,
+    "priority_score": legacy.compute_priority_score,
+    "expected_recovery": legacy.calculate_expected_recovery,
+    "churn_risk": legacy.compute_churn_risk,
+    "optimal_followup_days": legacy.compute_optimal_followup_timing,
+    "ai_next_action": legacy.next_best_action,
+    "risk_level": legacy.risk_assessment,
+}
+
+
+def _book(n=5000, seed=0, missing=0.05):
+    """Random cases; every input but ageing_days is missing on a share of rows"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "ageing_days": rng.integers(0, 400, n).astype(float),
+        "invoice_amount": np.round(rng.uniform(1000, 900000, n), 2),
+        "business_type": rng.choice(["Enterprise", "Large", "Medium", "Small", "Other"], n).astype(object),
+        "dispute_status": rng.choice(["None", "Open", "Resolved", "Pending_Resolution"], n).astype(object),
+        "last_dca_update_days": rng.integers(0, 40, n).astype(float),
+        "payment_history": rng.choice(["Good", "Bad", "Fair"], n).astype(object),
+    })
+    for column in df.columns.drop("ageing_days"):
+        df.loc[rng.random(n) < missing, column] = np.nan
+    # sla_status is derived from ageing_days by the ruleset; the legacy model read it
+    df["sla_status"] = np.select([df["ageing_days"] > 30, df["ageing_days"] > 20], ["BREACHED", "AT_RISK"], "OK")
+    return df
+
+
+def _same(expected, actual):
+    expected, actual = np.asarray(expected), np.asarray(actual)
+    if expected.dtype.kind not in "biuf" or actual.dtype.kind not in "biuf":
+        return expected.astype(str) == actual.astype(str)
+    return (expected == actual) | (np.isnan(expected.astype(float)) & np.isnan(actual.astype(float)))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_compiled_ruleset_matches_row_wise_model(seed):
+    df = _book(seed=seed)
+    scored = evaluate_ruleset(get_compiled_ruleset(), df)
+    for name, compute in LEGACY_OUTPUTS.items():
+        expected = df.apply(compute, axis=1).to_numpy()
+        mismatched = ~_same(expected, scored[name])
+        assert not mismatched.any(), f"{name}: {mismatched.sum()} rows differ, e.g. {df[mismatched].iloc[0].to_dict()}"
+
+
+def test_missing_business_type_adds_no_churn():
+    row = {"ageing_days": 10, "invoice_amount": 50000, "business_type": np.nan, "dispute_status": "None",
+           "last_dca_update_days": 2}
+    assert scoring.compute_churn_risk(row) == legacy.compute_churn_risk(pd.Series(row)) == 0
+    del row["business_type"]
+    assert scoring.compute_churn_risk(row) == legacy.compute_churn_risk(pd.Series(row)) == 10  # absent: Medium
+
+
+def test_row_helpers_match_row_wise_model():
+    for row in _book(n=200, seed=3).to_dict("records"):
+        for name, compute in LEGACY_OUTPUTS.items():
+            helper = getattr(scoring, compute.__name__)
+            assert _same([compute(pd.Series(row))], [helper(row)]).all(), (name, row)
+
+
+def test_selected_outputs_match_full_evaluation():
+    df = _book(n=500, seed=4)
+    compiled = get_compiled_ruleset()
+    full = evaluate_ruleset(compiled, df)
+    for name in ("sla_status", "expected_recovery", "churn_risk", "ai_next_action"):
+        only = evaluate_ruleset(compiled, df, outputs=[name])
+        assert list(only) == [name]
+        assert _same(full[name], only[name]).all()
+
+
+def test_ruleset_file_is_reread_only_when_it_changes(tmp_path, monkeypatch):
+    path = str(tmp_path / "rules.json")
+    shutil.copy(rules.DEFAULT_RULES_PATH, path)
+    loads = []
+    original = rules.load_ruleset
+    monkeypatch.setattr(rules, "load_ruleset", lambda p: loads.append(p) or original(p))
+
+    first = rules.get_compiled_ruleset(path)
+    assert rules.get_compiled_ruleset(path) is first
+    assert len(loads) == 1
+
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace('"version": "', '"version": "test-', 1))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    changed = rules.get_compiled_ruleset(path)
+    assert len(loads) == 2
+    assert changed.hash != first.hash
@@ -0,0 +1,48 @@
+import http.client
+import threading
+import pytest
+from service import server
+from service.queries import QueryError, score_cases
+
+
+@pytest.mark.parametrize("cases, message", [
+    ([{}], "cases[0].ageing_days is required"),
+    ([1], "cases[0]: expected an object"),
+    ([{"ageing_days": None}], "cases[0].ageing_days: null is not a number"),
+    ([{"ageing_days": True}], "cases[0].ageing_days: true is not a number"),
+    ([{"ageing_days": "12"}], "cases[0].ageing_days: \"12\" is not a number"),
+    ([{"ageing_days": 10}, {"ageing_days": 10, "invoice_amount": None}], "cases[1].invoice_amount: null"),
+])
+def test_score_rejects_unusable_inputs(cases, message):
+    with pytest.raises(QueryError) as error:
+        score_cases(cases)
+    assert str(error.value).startswith(message)
+    assert error.value.status == 400
+
+
+def test_cases_leaving_out_inputs_score_as_if_alone():
+    cases = [{"case_id": "A", "ageing_days": 10},
+             {"case_id": "B", "ageing_days": 50, "invoice_amount": 5.0, "last_dca_update_days": 20}]
+    _, batch = score_cases(cases)
+    for i, case in enumerate(cases):
+        assert batch.iloc[i].equals(score_cases([case])[1].iloc[0])
+
+
+def test_idle_keep_alive_connections_do_not_starve_the_pool(stored_book, monkeypatch):
+    monkeypatch.setattr(server.ServiceHandler, "timeout", 0.5)
+    httpd = server.make_server(port=0, workers=2)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+    try:
+        idle = []
+        for _ in range(2):
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            connection.request("GET", "/health")
+            connection.getresponse().read()
+            idle.append(connection)
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        connection.request("GET", "/health")
+        assert connection.getresponse().status == 200
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
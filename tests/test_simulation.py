@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+from models.simulation import simulate_portfolio_recovery
+
+
+def _scored(n=500):
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        "case_id": [f"CASE_{i}" for i in range(n)],
+        "recovery_probability": rng.uniform(0, 100, n),
+        "invoice_amount": rng.uniform(1_000, 500_000, n).round(2),
+        "assigned_dca": [f"DCA Agent {i % 3 + 1}" for i in range(n)],
+        "risk_level": [("LOW", "MEDIUM", "HIGH", "CRITICAL")[i % 4] for i in range(n)],
+    })
+
+
+@pytest.mark.parametrize("outcome", ["bernoulli", "beta"])
+def test_bands_are_ordered_and_groups_add_up(outcome):
+    df = _scored()
+    summary = simulate_portfolio_recovery(df, n_scenarios=600, outcome=outcome, n_jobs=1)
+    assert (summary["p5"] <= summary["p50"]).all() and (summary["p50"] <= summary["p95"]).all()
+
+    portfolio = summary[summary["level"] == "portfolio"].iloc[0]
+    for level in ("assigned_dca", "risk_level"):
+        groups = summary[summary["level"] == level]
+        assert len(groups) == df[level].nunique()
+        assert groups["mean"].sum() == pytest.approx(portfolio["mean"], abs=0.01 * len(groups))
+
+    expected = (df["recovery_probability"] / 100 * df["invoice_amount"]).sum()
+    assert portfolio["mean"] == pytest.approx(expected, rel=0.02)
+
+
+def test_same_seed_same_result():
+    df = _scored()
+    first = simulate_portfolio_recovery(df, n_scenarios=300, n_jobs=1, seed=11)
+    pd.testing.assert_frame_equal(first, simulate_portfolio_recovery(df, n_scenarios=300, n_jobs=1, seed=11))
+    assert not first.equals(simulate_portfolio_recovery(df, n_scenarios=300, n_jobs=1, seed=12))
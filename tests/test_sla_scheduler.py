@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+from jobs.sla_scheduler import SlaScheduler, audit_sink, logged_sla_events, next_sla_events
+from storage import write_behind
+
+DAY = 86400.0
+
+
+def _seconds(when):
+    return (np.datetime64(when, "ns") - np.datetime64("1970-01-01T00:00:00", "ns")) / np.timedelta64(1, "s")
+
+
+class Clock:
+    def __init__(self, when):
+        self.now = _seconds(when)
+
+    def __call__(self):
+        return self.now
+
+
+def _book(**overrides):
+    book = pd.DataFrame({
+        "case_id": ["A", "B", "C"],
+        "created_date": ["2026-01-01", "2026-01-11", "2026-01-01"],
+        "invoice_amount": [1000.0, 1000.0, 1000.0],
+        "status": ["ACTIVE", "ACTIVE", "CLOSED"],
+        "sla_status": ["OK", "OK", "OK"],
+    })
+    for column, values in overrides.items():
+        book[column] = values
+    return book
+
+
+def test_next_events_skip_closed_and_breached_cases():
+    upcoming = next_sla_events(_book(sla_status=["BREACHED", "AT_RISK", "OK"]), now=_seconds("2026-01-02"))
+    assert upcoming["case_id"].tolist() == ["B"]
+    assert upcoming["event"].tolist() == ["BREACHED"]  # already at risk: the breach is next
+    assert upcoming["due"].iloc[0] == _seconds("2026-02-10")
+
+
+def test_events_fire_in_due_order_and_at_risk_rolls_to_breach():
+    clock = Clock("2026-01-02")
+    scheduler = SlaScheduler(clock=clock)
+    emitted = []
+    scheduler.subscribe(lambda event: emitted.append((event["case_id"], event["event"])))
+    assert scheduler.sync(_book()) == 2
+    assert scheduler.run_due() == []
+
+    clock.now = _seconds("2026-01-22")  # A at risk (day 20 of 30)
+    scheduler.run_due()
+    clock.now = _seconds("2026-02-05")  # B at risk
+    scheduler.run_due()
+    clock.now = _seconds("2026-03-01")  # both breached
+    scheduler.run_due()
+    assert emitted == [("A", "AT_RISK"), ("B", "AT_RISK"), ("A", "BREACHED"), ("B", "BREACHED")]
+    assert scheduler.pending() == 0
+
+
+def test_resync_reschedules_and_cancels():
+    clock = Clock("2026-01-02")
+    scheduler = SlaScheduler(clock=clock)
+    emitted = []
+    scheduler.subscribe(lambda event: emitted.append((event["case_id"], event["event"])))
+    scheduler.sync(_book())
+    # A is escalated (7-day SLA) and B closed: B's heap entry goes stale
+    scheduler.sync(_book(status=["ESCALATED", "CLOSED", "CLOSED"]))
+    assert scheduler.pending() == 1
+    assert scheduler.sync(_book(status=["ESCALATED", "CLOSED", "CLOSED"])) == 0  # nothing changed
+
+    clock.now = _seconds("2026-03-01")
+    scheduler.run_due()
+    assert emitted == [("A", "AT_RISK"), ("A", "BREACHED")]  # the stale B entry is skipped
+
+
+def test_events_in_the_audit_trail_are_not_emitted_again(writer):
+    def run(when):
+        # One cron --once run: a fresh scheduler over a book whose sla_status has not caught up
+        scheduler = SlaScheduler(clock=Clock(when))
+        emitted = []
+        scheduler.subscribe(audit_sink)
+        scheduler.subscribe(lambda event: emitted.append((event["case_id"], event["event"])))
+        scheduler.mark_emitted(logged_sla_events())
+        scheduler.sync(_book())
+        scheduler.run_due()
+        assert write_behind.flush(60)
+        return emitted
+
+    assert run("2026-02-05") == [("A", "BREACHED"), ("B", "AT_RISK")]
+    assert run("2026-02-05") == []
+    assert run("2026-02-11") == [("B", "BREACHED")]
+    assert run("2026-02-12") == []
@@ -0,0 +1,74 @@
+import pandas as pd
+from storage import events, portfolio, write_behind
+
+
+def _submit_and_wait(*tickets):
+    assert write_behind.flush(60)
+    for ticket in tickets:
+        assert ticket.done
+    return tickets
+
+
+def test_writes_are_logged_and_replayable(writer):
+    insert, update, stale, note = _submit_and_wait(
+        writer.submit_case_insert({"customer_name": "New Co", "ageing_days": 1, "invoice_amount": 5000.0,
+                                   "status": "ACTIVE"},
+                                  audit_events=[portfolio.audit_entry(None, "Case Created", "admin")]),
+        writer.submit_case_update("CASE_001", expected_version=0, status="ESCALATED",
+                                  audit_event=portfolio.audit_entry("CASE_001", "Status Updated", "admin")),
+        writer.submit_case_update("CASE_002", expected_version=3, status="CLOSED"),
+        writer.submit_audit("CASE_003", "Note", "agent"),
+    )
+    assert insert.error is None and insert.case_id == "CASE_7"
+    assert update.error is None and update.version == 1
+    assert isinstance(stale.error, portfolio.VersionConflict)
+
+    stored = pd.read_csv(portfolio.DATA_PATH).set_index("case_id")
+    assert stored.loc["CASE_001", "status"] == "ESCALATED"
+    assert stored.loc["CASE_002", "status"] == "ACTIVE"
+    assert "CASE_7" in stored.index
+    assert events.applied_seq() == events._last_seq()
+    assert events.drift(pd.read_csv(portfolio.DATA_PATH), events.replay()) == []
+
+    # The audit trail is read from the same log: one row per applied write
+    trail = portfolio.load_audit()
+    assert trail[["case_id", "action"]].values.tolist() == [
+        ["CASE_7", "Case Created"], ["CASE_001", "Status Updated"], ["CASE_003", "Note"]]
+
+
+def test_duplicate_insert_is_rejected_with_its_audit_entry(writer):
+    (duplicate,) = _submit_and_wait(writer.submit_case_insert(
+        {"case_id": "CASE_001"}, audit_events=[portfolio.audit_entry(None, "Case Created", "admin")]))
+    assert isinstance(duplicate.error, portfolio.DuplicateCase)
+    assert portfolio.load_audit().empty
+    assert len(pd.read_csv(portfolio.DATA_PATH)) == 6
+
+
+def test_a_failed_save_after_the_log_append_still_commits(writer, monkeypatch):
+    save_data = portfolio.save_data
+
+    def failing_save(df):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(portfolio, "save_data", failing_save)
+    (update,) = _submit_and_wait(writer.submit_case_update("CASE_001", expected_version=0, status="ESCALATED"))
+    assert update.error is None and update.version == 1
+    assert [entry["case_id"] for entry in events.unapplied()] == ["CASE_001"]
+    assert writer.writer_stats()["save_failures"] == 1
+
+    monkeypatch.setattr(portfolio, "save_data", save_data)
+    _submit_and_wait(writer.submit_case_update("CASE_002", expected_version=0, status="CLOSED"))
+    stored = pd.read_csv(portfolio.DATA_PATH).set_index("case_id")
+    assert stored.loc[["CASE_001", "CASE_002"], "status"].tolist() == ["ESCALATED", "CLOSED"]
+    assert events.unapplied() == []
+
+
+def test_done_callbacks_see_the_outcome(writer):
+    resolved = []
+    applied = writer.submit_case_update("CASE_001", expected_version=0, status="ESCALATED")
+    stale = writer.submit_case_update("CASE_002", expected_version=5, status="CLOSED")
+    for ticket in (applied, stale):
+        ticket.add_done_callback(lambda done: resolved.append((done.case_id, type(done.error).__name__)))
+    _submit_and_wait(applied, stale)
+    applied.add_done_callback(lambda done: resolved.append((done.case_id, "late")))
+    assert resolved == [("CASE_001", "NoneType"), ("CASE_002", "VersionConflict"), ("CASE_001", "late")]
@@ -0,0 +1,48 @@
+import importlib
+import sys
+from time import perf_counter
+from perf import record
+
+# ==================== PAGE REGISTRY ====================
+#
+# Each page lives in its own module under views/ and exposes render(data).
+# A page module (and with it plotly, the scoring models, the simulator...) is
+# imported only the first time that page is visited in the process, so a cold
+# start or a rerun of a chart-free page never pays for the charting stack.
+
+PAGES = {
+    "dashboard": "views.dashboard",
+    "add": "views.add_case",
+    "assign": "views.assign",
+    "workflow": "views.workflow",
+    "dca_performance": "views.dca_performance",
+    "analytics": "views.analytics",
+    "predictive": "views.predictive",
+    "live_updates": "views.live_updates",
+    "audit": "views.audit",
+    "database": "views.database",
+    "diagnostics": "views.diagnostics",
+}
+
+# Pages that must render without importing plotly
+CHART_FREE_PAGES = ("add", "assign", "workflow", "dca_performance", "audit", "database")
+
+
+def load_page(page):
+    """Page module for `page` (imported on first use), or None for an unknown page"""
+    module_name = PAGES.get(page)
+    if module_name is None:
+        return None
+    module = sys.modules.get(module_name)
+    if module is None:
+        started = perf_counter()
+        module = importlib.import_module(module_name)
+        # Recorded even with timing disabled: it happens once per process
+        record(f"import.{page}", (perf_counter() - started) * 1000)
+    return module
+
+
+def render_page(page, data):
+    module = load_page(page)
+    if module is not None:
+        module.render(data)
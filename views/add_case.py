@@ -0,0 +1,56 @@
+import streamlit as st
+from datetime import datetime
+from storage.portfolio import audit_entry
+from storage.write_behind import submit_case_insert
+from views.common import check_access, track_writes
+
+INSERT_WAIT_S = 5  # show the allocated case id when the save is this quick
+
+# ================= ADD ENTERPRISE =================
+def render(data):
+    df = data.df
+    if check_access(["FedEx Admin"]):
+        st.title("✏️ Add New Case")
+        with st.form("add_enterprise"):
+            customer_name = st.text_input("Enterprise / Customer Name")
+            amount = st.number_input("Invoice Amount (₹)", min_value=1000)
+            ageing = st.number_input("Ageing Days", min_value=1)
+            business_type = st.selectbox("Business Type", ["Enterprise", "Large", "Medium", "Small"])
+            dispute_status = st.selectbox("Dispute Status", ["None", "Open", "Pending_Resolution"])
+            # Populate DCA options from existing data; fallback to UNASSIGNED
+            try:
+                dca_opts = [d for d in sorted(df['assigned_dca'].dropna().unique().tolist()) if d != ""]
+            except Exception:
+                dca_opts = []
+            dca_options = ["UNASSIGNED"] + [d for d in dca_opts if d not in ["UNASSIGNED"]]
+            assigned_dca = st.selectbox("Assign to DCA (optional)", options=dca_options, index=0)
+            submit = st.form_submit_button("Save")
+
+            if submit:
+                # case_id is allocated by the writer under the portfolio lock
+                new_case = {
+                    "customer_name": customer_name,
+                    "ageing_days": ageing,
+                    "invoice_amount": amount,
+                    "business_type": business_type,
+                    "dispute_status": dispute_status,
+                    "assigned_dca": assigned_dca,
+                    "last_dca_update_days": 0,
+                    "sla_status": "OK",
+                    "status": "ACTIVE",
+                    "created_date": datetime.now(),
+                    "days_as_of": datetime.now().strftime("%Y-%m-%d")
+                }
+                # Persist and log only when the form is submitted
+                user = st.session_state.user_role
+                audit_events = [audit_entry(None, "Case Created", user)]
+                if assigned_dca and assigned_dca != "UNASSIGNED":
+                    audit_events.append(audit_entry(None, f"Assigned to {assigned_dca}", user))
+                ticket = submit_case_insert(new_case, audit_events=audit_events)
+                track_writes(ticket)
+                if not ticket.wait(INSERT_WAIT_S):
+                    st.info("💾 Case queued; its ID is assigned when it is saved.")
+                elif ticket.error is not None:
+                    st.error(f"⚠️ Case not added: {ticket.error}")
+                else:
+                    st.success(f"✅ Case {ticket.case_id} added successfully!")
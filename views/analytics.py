@@ -0,0 +1,149 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from models.simulation import simulate_portfolio_recovery
+from perf import timed
+from storage import history
+from views.figure_cache import cached_figure
+from views.common import check_access, format_currency
+
+# ================= ADVANCED ANALYTICS =================
+def render(data):
+    df = data.df
+    if check_access(["FedEx Admin", "Compliance Officer"]):
+        st.title("📊 Advanced Analytics & Insights")
+    
+    st.subheader("💡 Key Insights")
+    
+    insight_col1, insight_col2, insight_col3 = st.columns(3)
+    
+    with insight_col1:
+        critical_cases = len(df[df["risk_level"] == "CRITICAL"])
+        st.metric(
+            "🚨 Critical Cases",
+            critical_cases,
+            f"{critical_cases/len(df)*100:.1f}% of portfolio"
+        )
+    
+    with insight_col2:
+        high_recovery = len(df[df["recovery_probability"] > 75])
+        st.metric(
+            "✅ High Recovery Prob",
+            high_recovery,
+            f"Expected: {format_currency(df[df['recovery_probability'] > 75]['expected_recovery'].sum())}"
+        )
+    
+    with insight_col3:
+        aging_90plus = len(df[df["ageing_days"] > 90])
+        st.metric(
+            "⏳ Aging >90 Days",
+            aging_90plus,
+            f"{aging_90plus/len(df)*100:.1f}% at risk"
+        )
+    
+    st.divider()
+    
+    st.subheader("📈 Recovery Trend Analysis")
+    
+    # Recovery by recovery probability buckets (kept off the shared frame)
+    recovery_bucket = pd.Series(data.derived(["recovery_bucket"])["recovery_bucket"],
+                                index=df.index, name="recovery_bucket")
+    
+    with timed("prep.analytics.recovery_buckets"):
+        recovery_by_bucket = df.groupby(recovery_bucket, observed=False).agg({
+            "case_id": "count",
+            "expected_recovery": "sum"
+        }).reset_index()
+    
+    def build_recovery_buckets():
+        fig_recovery = px.bar(
+            recovery_by_bucket,
+            x="recovery_bucket",
+            y=["case_id", "expected_recovery"],
+            title="Cases & Expected Recovery by Probability Bucket",
+            barmode="group",
+            labels={"case_id": "Number of Cases", "expected_recovery": "Expected Recovery"}
+        )
+        fig_recovery.update_layout(
+            plot_bgcolor="#1F2937",
+            paper_bgcolor="#0E1117",
+            font=dict(color="#F9FAFB")
+        )
+        return fig_recovery
+    
+    with timed("chart.analytics.recovery_buckets"):
+        fig_recovery = cached_figure("analytics.recovery_buckets", data.data_version, build_recovery_buckets)
+    st.plotly_chart(fig_recovery, use_container_width=True)
+
+    _recovery_history()
+
+    st.divider()
+
+    st.subheader("🎲 Recovery Range (Monte Carlo)")
+    st.markdown("**Simulated portfolio outcomes - each case recovers with its predicted probability**")
+
+    with timed("prep.analytics.monte_carlo"):
+        sim_summary = data.cached("analytics.monte_carlo",
+                                  lambda: simulate_portfolio_recovery(df, n_scenarios=2000, n_jobs=1))
+    portfolio_sim = sim_summary[sim_summary["level"] == "portfolio"].iloc[0]
+
+    sim_col1, sim_col2, sim_col3 = st.columns(3)
+    with sim_col1:
+        st.metric("P5 (Downside)", format_currency(portfolio_sim["p5"]))
+    with sim_col2:
+        st.metric("P50 (Median)", format_currency(portfolio_sim["p50"]))
+    with sim_col3:
+        st.metric("P95 (Upside)", format_currency(portfolio_sim["p95"]))
+
+    sim_display = sim_summary[sim_summary["level"] != "portfolio"].copy()
+    for band in ["mean", "p5", "p50", "p95"]:
+        sim_display[band] = sim_display[band].apply(format_currency)
+    st.dataframe(sim_display, use_container_width=True, hide_index=True)
+
+
+@st.fragment
+def _recovery_history():
+    """Trends over the recorded daily history (storage/history.py); the day pickers rerun only this section"""
+    days = [entry["day"] for entry in history.list_days()]
+    if not days:
+        st.info("No daily history recorded yet: the nightly roll-forward records one day per run "
+                "(python -m jobs.rollforward, or python -m jobs.history).")
+        return
+    version = history.history_version()
+
+    def build_by_day():
+        totals = history.daily_totals()
+        fig = px.line(totals, x="day", y="expected_recovery", markers=True,
+                      title="Expected Recovery by Day",
+                      labels={"day": "Day", "expected_recovery": "Expected Recovery"})
+        fig.update_layout(plot_bgcolor="#1F2937", paper_bgcolor="#0E1117", font=dict(color="#F9FAFB"))
+        return fig
+
+    def build_dca_trend():
+        trends = history.dca_trends("expected_recovery").reset_index()
+        fig = px.line(trends.melt(id_vars="day", var_name="assigned_dca", value_name="expected_recovery"),
+                      x="day", y="expected_recovery", color="assigned_dca",
+                      title="Expected Recovery by DCA",
+                      labels={"day": "Day", "expected_recovery": "Expected Recovery", "assigned_dca": "DCA"})
+        fig.update_layout(plot_bgcolor="#1F2937", paper_bgcolor="#0E1117", font=dict(color="#F9FAFB"))
+        return fig
+
+    with timed("chart.analytics.history_by_day"):
+        fig_by_day = cached_figure("analytics.history_by_day", version, build_by_day)
+    with timed("chart.analytics.history_by_dca"):
+        fig_by_dca = cached_figure("analytics.history_by_dca", version, build_dca_trend)
+    trend_col1, trend_col2 = st.columns(2)
+    with trend_col1:
+        st.plotly_chart(fig_by_day, use_container_width=True)
+    with trend_col2:
+        st.plotly_chart(fig_by_dca, use_container_width=True)
+
+    st.markdown("**Risk Migration** - cases by risk level on one day (rows) and a later day (columns)")
+    if len(days) < 2:
+        st.caption(f"Needs two recorded days; history starts {days[0]}.")
+        return
+    day_from, day_to = st.select_slider("Between", options=days, value=(days[0], days[-1]),
+                                        key="analytics_migration_days")
+    with timed("prep.analytics.risk_migration"):
+        matrix = history.risk_migration(day_from, day_to)
+    st.dataframe(matrix, use_container_width=True)
@@ -0,0 +1,32 @@
+import streamlit as st
+from storage.portfolio import audit_entry
+from storage.write_behind import submit_case_update
+from views.common import check_access, track_writes, seen_case_version
+
+# ================= ASSIGN CASE PAGE =================
+def render(data):
+    df = data.df
+    if check_access(["FedEx Admin"]):
+        st.title("📝 Assign Case to DCA")
+
+        with st.form("assign_case_form"):
+            case_id_input = st.text_input("Case ID to assign")
+            try:
+                dca_opts = [d for d in sorted(df['assigned_dca'].dropna().unique().tolist()) if d != ""]
+            except Exception:
+                dca_opts = []
+            dca_options = ["UNASSIGNED"] + [d for d in dca_opts if d not in ["UNASSIGNED"]]
+            assign_to = st.selectbox("Assign to DCA", options=dca_options, index=0)
+            assign_submit = st.form_submit_button("Assign")
+
+            if assign_submit:
+                if case_id_input and case_id_input in df['case_id'].values:
+                    track_writes(submit_case_update(
+                        case_id_input,
+                        expected_version=seen_case_version(df, case_id_input),
+                        audit_event=audit_entry(case_id_input, f"Assigned to {assign_to}", st.session_state.get('user_role', 'FedEx Admin')),
+                        assigned_dca=assign_to
+                    ))
+                    st.success(f"✅ {case_id_input} assigned to {assign_to}")
+                else:
+                    st.error("Case not found. Please verify the Case ID.")
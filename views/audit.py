@@ -0,0 +1,94 @@
+import streamlit as st
+from datetime import datetime, time, timedelta
+from storage.events import case_as_of, case_history
+from storage.portfolio import load_audit
+from views.common import check_access
+
+# ================= COMPLIANCE & AUDIT TRAIL =================
+def render(data):
+    if check_access(["FedEx Admin", "Compliance Officer"]):
+        st.title("🔍 Compliance & Audit Trail")
+    
+    st.subheader("📋 Full Audit Log")
+    
+    try:
+        audit_df = load_audit()
+        
+        _filtered_log(audit_df)
+        
+        st.divider()
+        st.subheader("📊 Audit Statistics")
+        
+        stat_col1, stat_col2, stat_col3 = st.columns(3)
+        
+        with stat_col1:
+            st.metric("Total Audit Events", len(audit_df))
+        with stat_col2:
+            st.metric("Unique Users", audit_df["user"].nunique())
+        with stat_col3:
+            st.metric("Actions Logged", audit_df["action"].nunique())
+        
+    except:
+        st.info("No audit log found yet")
+
+    st.divider()
+    _case_timeline()
+
+
+@st.fragment
+def _filtered_log(audit_df):
+    """Audit log filters rerun only this table"""
+    # Filters
+    filter_col1, filter_col2, filter_col3 = st.columns(3)
+    
+    with filter_col1:
+        action_filter = st.multiselect(
+            "Action Type",
+            options=audit_df["action"].unique(),
+            default=audit_df["action"].unique()[:3]
+        )
+    
+    with filter_col2:
+        user_filter = st.multiselect(
+            "User",
+            options=audit_df["user"].unique(),
+            default=audit_df["user"].unique()
+        )
+    
+    with filter_col3:
+        days_back = st.slider("Last N Days", 1, 90, 30)
+    
+    # Filter audit (timestamps are ISO "YYYY-MM-DD HH:MM:SS...", so they compare as text)
+    since = (datetime.now() - timedelta(days=days_back)).isoformat(sep=" ")
+    filtered_audit = audit_df[
+        (audit_df["action"].isin(action_filter)) &
+        (audit_df["user"].isin(user_filter)) &
+        (audit_df["timestamp"].astype(str) >= since)
+    ].sort_values("timestamp", ascending=False)
+    
+    st.dataframe(filtered_audit, use_container_width=True, hide_index=True)
+
+
+@st.fragment
+def _case_timeline():
+    """A case's logged changes and its state at a past moment, replayed from the case event log"""
+    st.subheader("⏪ Case History & Point-in-Time View")
+    case_id = st.text_input("Case ID", key="timeline_case")
+    if not case_id:
+        return
+    history = case_history(case_id)
+    if history.empty:
+        st.info(f"No logged changes for {case_id}")
+    else:
+        st.dataframe(history, use_container_width=True, hide_index=True)
+
+    as_of_col1, as_of_col2 = st.columns(2)
+    with as_of_col1:
+        as_of_day = st.date_input("As of", value=datetime.now().date(), key="timeline_day")
+    with as_of_col2:
+        as_of_time = st.time_input("Time", value=time(23, 59), key="timeline_time")
+    case = case_as_of(case_id, datetime.combine(as_of_day, as_of_time))
+    if case is None:
+        st.warning(f"{case_id} did not exist then (or predates the recorded history)")
+    else:
+        st.dataframe(case.dropna().astype(str).rename("value").to_frame(), use_container_width=True)
@@ -0,0 +1,83 @@
+import json
+import os
+import subprocess
+import sys
+from views import PAGES, CHART_FREE_PAGES
+
+# ==================== IMPORT-TIME BUDGET ====================
+#
+# Measures, in fresh interpreters, what each page adds on top of the app shell
+# (streamlit, pandas, storage, perf) when it is first visited, and checks it
+# against the budget. Run from the project root:
+#
+#   python -m views.budget            # exit status 1 if any page is over budget
+#
+# Streamlit itself imports the plotly base package (for its chart theme), so the
+# chart-free check is that those pages never pull in plotly.express.
+
+SHELL_MODULES = ("streamlit", "pandas", "numpy", "perf", "memprof", "storage.portfolio", "views.common")
+HEAVY_MODULES = ("plotly.express", "models.simulation")
+SHELL_BUDGET_MS = 1500
+PAGE_BUDGET_MS = 250
+CHART_FREE_BUDGET_MS = 25
+CHART_FREE_FORBIDDEN = ("plotly.express",)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, importlib
+from time import perf_counter
+started = perf_counter()
+for name in {shell!r}:
+    importlib.import_module(name)
+shell_ms = (perf_counter() - started) * 1000
+started = perf_counter()
+importlib.import_module({module!r})
+page_ms = (perf_counter() - started) * 1000
+print(json.dumps({{"shell_ms": shell_ms, "page_ms": page_ms,
+                  "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure_page_import(page, repeat=3):
+    """Best-of-`repeat` shell and page import times (ms) plus the heavy modules the page loaded"""
+    probe = _PROBE.format(shell=SHELL_MODULES, module=PAGES[page], heavy=HEAVY_MODULES)
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", probe], cwd=PROJECT_ROOT, capture_output=True,
+                                text=True, check=True).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        if best is None or sample["page_ms"] < best["page_ms"]:
+            best = sample
+    return best
+
+
+def check_import_budget(pages=None, repeat=3):
+    """One row per page: measured import cost, its budget and whether it fits"""
+    rows = []
+    for page in pages or PAGES:
+        sample = measure_page_import(page, repeat)
+        chart_free = page in CHART_FREE_PAGES
+        budget = CHART_FREE_BUDGET_MS if chart_free else PAGE_BUDGET_MS
+        forbidden = [name for name in sample["heavy"] if chart_free and name in CHART_FREE_FORBIDDEN]
+        rows.append({
+            "page": page,
+            "shell_ms": round(sample["shell_ms"], 1),
+            "page_ms": round(sample["page_ms"], 1),
+            "budget_ms": budget,
+            "heavy_imports": ", ".join(sample["heavy"]),
+            "ok": sample["page_ms"] <= budget and sample["shell_ms"] <= SHELL_BUDGET_MS and not forbidden,
+        })
+    return rows
+
+
+def main():
+    rows = check_import_budget()
+    for row in rows:
+        status = "ok" if row["ok"] else "OVER BUDGET"
+        print(f"{row['page']:<16} shell {row['shell_ms']:>8.1f} ms  page {row['page_ms']:>7.1f} ms "
+              f"(budget {row['budget_ms']} ms)  {status}  {row['heavy_imports']}")
+    return 0 if all(row["ok"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# ==================== CHART DATA LAYER ====================
+#
+# Charts are fed pre-aggregated data computed server side, once per data version
+# (via PageData.cached), so what reaches the browser is bounded by the number of
+# bins / points, not by the size of the book:
+#   - histogram():       fixed-width bins -> one bar per bin
+#   - category_counts(): one value per category
+#   - line_counts():     counts per distinct x, re-binned past LINE_MAX_POINTS
+#   - scatter_points():  raw points up to SCATTER_SVG_MAX, WebGL (scattergl) up
+#                        to SCATTER_WEBGL_MAX, a 2-D binned density grid above that
+#
+# Kept free of plotly so the binning can be reused and tested on its own.
+
+SCATTER_SVG_MAX = 2000
+SCATTER_WEBGL_MAX = 20000
+LINE_MAX_POINTS = 200
+DENSITY_BINS = 40
+
+
+def histogram(data, column, bin_width, lower=0, upper=100):
+    """Counts of `column` in [lower, upper] by fixed-width bins (bin_start, bin_mid, count)"""
+    def compute():
+        edges = np.arange(lower, upper + bin_width, bin_width, dtype=float)
+        values = data.df[column].to_numpy(dtype=float)
+        counts, _ = np.histogram(values[~np.isnan(values)], bins=edges)
+        return pd.DataFrame({
+            "bin_start": edges[:-1],
+            "bin_mid": (edges[:-1] + edges[1:]) / 2,
+            "count": counts,
+        })
+    return data.cached(f"chart_data.histogram.{column}.{bin_width}.{lower}.{upper}", compute)
+
+
+def category_counts(data, column, derived=False):
+    """value_counts of a frame column (or of a registered derived column)"""
+    def compute():
+        if derived:
+            return pd.Series(data.derived([column])[column]).value_counts()
+        if column in data.aggregates:  # precomputed with the agency partition
+            counts = data.aggregates[column]
+            return pd.Series(counts.values(), index=pd.Index(counts.keys(), name=column), name="count")
+        return data.df[column].value_counts()
+    return data.cached(f"chart_data.counts.{column}", compute)
+
+
+def line_counts(data, column, max_points=LINE_MAX_POINTS):
+    """
+    Cases per distinct value of `column` (column, count). With more than
+    `max_points` distinct values, values are summed into max_points equal-width
+    bins plotted at their midpoints
+    """
+    def compute():
+        counts = data.df[column].value_counts().sort_index()
+        if len(counts) <= max_points:
+            return pd.DataFrame({column: counts.index.to_numpy(), "count": counts.to_numpy()})
+        edges = np.linspace(counts.index.min(), counts.index.max(), max_points + 1)
+        binned, _ = np.histogram(counts.index.to_numpy(dtype=float), bins=edges, weights=counts.to_numpy())
+        mids = (edges[:-1] + edges[1:]) / 2
+        keep = binned > 0
+        return pd.DataFrame({column: mids[keep], "count": binned[keep].astype(np.int64)})
+    return data.cached(f"chart_data.line.{column}.{max_points}", compute)
+
+
+def scatter_points(data, x, y, columns=()):
+    """
+    Scatter payload for `x` vs `y`:
+      {"mode": "svg" | "webgl", "points": frame of x, y and `columns`}
+      {"mode": "density", "x": bin centres, "y": bin centres, "z": counts[y, x]}
+    """
+    def compute():
+        df = data.df
+        if len(df) <= SCATTER_WEBGL_MAX:
+            mode = "svg" if len(df) <= SCATTER_SVG_MAX else "webgl"
+            return {"mode": mode, "points": df[[x, y, *columns]]}
+
+        x_values = df[x].to_numpy(dtype=float)
+        y_values = df[y].to_numpy(dtype=float)
+        valid = ~(np.isnan(x_values) | np.isnan(y_values))
+        counts, x_edges, y_edges = np.histogram2d(x_values[valid], y_values[valid], bins=DENSITY_BINS)
+        return {
+            "mode": "density",
+            "x": (x_edges[:-1] + x_edges[1:]) / 2,
+            "y": (y_edges[:-1] + y_edges[1:]) / 2,
+            "z": counts.T,
+        }
+    return data.cached(f"chart_data.scatter.{x}.{y}.{','.join(columns)}", compute)
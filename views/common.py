@@ -0,0 +1,122 @@
+import uuid
+from collections import OrderedDict
+import streamlit as st
+from models.derived import resolve_columns
+from storage.portfolio import load_agency_data, load_scored_data, case_version
+
+# ==================== SHARED PAGE HELPERS ====================
+#
+# Everything a page module needs besides its own imports. Deliberately light:
+# no plotly and no scoring models here, so chart-free pages stay cheap to load.
+
+# Page-level aggregates (KPIs, chart inputs) memoized per data version, shared by
+# every session in the process
+_section_cache = OrderedDict()
+MAX_CACHED_VERSIONS = 4
+
+
+class PageData:
+    """
+    Scored portfolio for one rerun, loaded on first access. With an `agency`
+    (DCA Agent sessions) only that agency's partition is loaded
+    """
+
+    def __init__(self, agency=None):
+        self.agency = agency
+        self._df = None
+        self.data_version = None
+        self.aggregates = {}
+
+    @property
+    def df(self):
+        if self._df is None:
+            if self.agency is None:
+                self._df, self.data_version = load_scored_data()
+            else:
+                self._df, self.data_version, self.aggregates = load_agency_data(self.agency)
+        return self._df
+
+    def aggregate(self, name, compute):
+        """Aggregate precomputed with the partition, else compute() once per data version"""
+        self.df
+        if name in self.aggregates:
+            return self.aggregates[name]
+        return self.cached(f"aggregate.{name}", compute)
+
+    def derived(self, names):
+        """Derived columns for the current data version, computed at most once"""
+        df = self.df
+        return resolve_columns(df, names, data_version=self.data_version, trust_existing=True)
+
+    def cached(self, key, compute):
+        """compute() at most once per data version for `key` (every call if unversioned)"""
+        self.df  # loads the portfolio and with it the data version
+        if self.data_version is None:
+            return compute()
+        entries = _section_cache.setdefault(self.data_version, {})
+        _section_cache.move_to_end(self.data_version)
+        while len(_section_cache) > MAX_CACHED_VERSIONS:
+            _section_cache.popitem(last=False)
+        if key not in entries:
+            entries[key] = compute()
+        return entries[key]
+
+
+def format_currency(value):
+    """Format value as Indian currency"""
+    return f"₹{int(value):,}"
+
+
+def track_writes(*tickets):
+    """Remember queued writes so the sidebar can show until they are on disk"""
+    st.session_state.setdefault("pending_writes", []).extend(tickets)
+
+
+def render_write_status():
+    """Saving / saved / failed indicator for this session's queued writes"""
+    tickets = st.session_state.get("pending_writes", [])
+    if not tickets:
+        return
+    failed = [t for t in tickets if t.done and t.error is not None]
+    pending = sum(not t.done for t in tickets)
+    for ticket in failed:
+        st.error(f"⚠️ Save failed for {ticket.case_id or 'new case'}: {ticket.error}")
+    if pending:
+        st.caption(f"💾 Saving {pending} change(s)…")
+    # This session's own applied updates count as seen, even before the reloaded data shows them
+    seen = st.session_state.setdefault("seen_case_versions", {})
+    for ticket in tickets:
+        if ticket.done and ticket.version is not None:
+            seen[ticket.case_id] = max(seen.get(ticket.case_id, 0), ticket.version)
+    st.session_state.pending_writes = [t for t in tickets if not t.done]
+
+
+def seen_case_version(df, case_id):
+    """
+    Version of a case as this session last displayed it (on the previous rerun),
+    for compare-and-set updates: an edit by someone else since then is rejected
+    instead of silently overwritten
+    """
+    seen = st.session_state.setdefault("seen_case_versions", {})
+    current = case_version(df, case_id)
+    expected = seen.get(case_id, current)
+    seen[case_id] = max(current, expected)
+    return expected
+
+
+def session_owner(agency=None):
+    """
+    Owner key of per-session resources (background exports): the role, the
+    agency it is scoped to and this browser session
+    """
+    session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+    return f"{st.session_state.get('user_role')}:{agency or '*'}:{session_id}"
+
+
+def check_access(required_roles):
+    """Check if current user role has access to page"""
+    current_role = st.session_state.get("user_role", "FedEx Admin")
+    if current_role not in required_roles:
+        st.error(f"🔒 Access Denied\n\nYour role ({current_role}) does not have access to this page.\n\nOnly {', '.join(required_roles)} can view this.")
+        return False
+    return True
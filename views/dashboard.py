@@ -0,0 +1,351 @@
+import os
+import streamlit as st
+import numpy as np
+from datetime import datetime
+import plotly.express as px
+from perf import timed
+from views.figure_cache import cached_figure
+from views.common import format_currency, session_owner
+from views.chart_data import histogram, category_counts, line_counts
+from storage.partitions import portfolio_kpis
+from storage.export import (EXPORT_FORMATS, BACKGROUND_EXPORT_ROWS, available_formats, export_bytes,
+                            export_file_name, format_currency_values, list_export_jobs, read_export,
+                            start_export_job)
+
+# ================= DASHBOARD =================
+def render(data):
+    df = data.df
+    # Big logo on dashboard - Professional FedEx theme
+    st.markdown(
+        """
+        <div style="margin-top:-20px; margin-bottom:32px; text-align:center;">
+            <div style="padding: 24px 0; background: linear-gradient(180deg, rgba(71, 71, 71, 0.05) 0%, rgba(71, 71, 71, 0) 100%); border-radius: 12px;">
+                <p style="margin: 0; font-size: 12px; letter-spacing: 2.5px; color: #9CA3AF; font-weight: 700; text-transform: uppercase;">Debt Collection Management</p>
+                <h1 style="margin: 8px 0 0 0; font-size: 48px; font-weight: 900; letter-spacing: -1.5px;">
+                    <span style="color: #4D148C;">Fed</span><span style="color: #FF6600;">Ex</span> <span style="color: #FF6600;">DCA</span>
+                </h1>
+                <p style="margin: 16px 0 0 0; font-size: 13px; letter-spacing: 0.8px; color: #D1D5DB; font-weight: 500;">AI-POWERED RECOVERY INTELLIGENCE PLATFORM</p>
+            </div>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    st.title("📊 Real-Time Command Center")
+    # Recent Updates panel (visible to FedEx Admin & Compliance Officer)
+    header_main_col, header_updates_col = st.columns([4, 1])
+    
+    # ========== KEY PERFORMANCE INDICATORS ==========
+    st.subheader("🎯 Executive KPIs")
+    
+    kpi_col1, kpi_col2, kpi_col3, kpi_col4 = st.columns(4, gap="medium")
+    
+    # Calculate KPIs (once per data version)
+    with timed("prep.dashboard.kpis"):
+        kpis = data.aggregate("kpis", lambda: portfolio_kpis(df))
+    total_value = kpis["total_value"]
+    expected_recovery = kpis["expected_recovery"]
+    recovery_rate = kpis["recovery_rate"]
+    sla_breaches = kpis["sla_breaches"]
+    active_cases = kpis["active_cases"]
+    high_priority = kpis["high_priority"]
+    avg_ageing = kpis["avg_ageing"]
+    portfolio_at_risk = kpis["portfolio_at_risk"]
+    
+    # Enhanced KPI Cards with better styling
+    st.markdown("""
+    <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 16px; margin-bottom: 24px;">
+    """, unsafe_allow_html=True)
+    
+    kpi_cards = [
+        {
+            "icon": "💼",
+            "title": "Portfolio Value",
+            "value": format_currency(total_value),
+            "delta": f"{active_cases} Active Cases",
+            "color": "#FF6600"
+        },
+        {
+            "icon": "📈",
+            "title": "Expected Recovery",
+            "value": format_currency(expected_recovery),
+            "delta": f"{recovery_rate:.1f}% Recovery Rate",
+            "color": "#10B981"
+        },
+        {
+            "icon": "⚠️",
+            "title": "At-Risk Portfolio",
+            "value": format_currency(portfolio_at_risk),
+            "delta": f"{high_priority} Critical",
+            "color": "#EF4444"
+        },
+        {
+            "icon": "📋",
+            "title": "Avg. Ageing",
+            "value": f"{int(avg_ageing)} days",
+            "delta": f"{sla_breaches} SLA Breaches",
+            "color": "#F59E0B"
+        }
+    ]
+    
+    col_kpi1, col_kpi2, col_kpi3, col_kpi4 = st.columns(4)
+    kpi_cols = [col_kpi1, col_kpi2, col_kpi3, col_kpi4]
+    
+    for idx, (col, card) in enumerate(zip(kpi_cols, kpi_cards)):
+        with col:
+            st.metric(
+                label=f"{card['icon']} {card['title']}",
+                value=card['value'],
+                delta=card['delta'],
+                delta_color="normal"
+            )
+
+    st.divider()
+    
+    # ========== RISK DISTRIBUTION & RECOVERY INSIGHTS ==========
+    st.subheader("📊 Portfolio Analytics")
+    
+    chart_col1, chart_col2, chart_col3 = st.columns(3, gap="medium")
+    
+    with chart_col1:
+        # Risk Level Pie Chart
+        risk_dist = category_counts(data, "risk_level")
+        colors = {"CRITICAL": "#FF0000", "HIGH": "#FF6600", "MEDIUM": "#FFB84D", "LOW": "#10B981"}
+        
+        def build_risk_pie():
+            fig_risk = px.pie(
+                values=risk_dist.values,
+                names=risk_dist.index,
+                title="Case Risk Distribution",
+                color_discrete_map={k: colors[k] for k in risk_dist.index if k in colors}
+            )
+            fig_risk.update_layout(
+                plot_bgcolor="#1F2937",
+                paper_bgcolor="#0E1117",
+                font=dict(color="#F9FAFB"),
+                showlegend=True,
+                height=400
+            )
+            return fig_risk
+        
+        with timed("chart.dashboard.risk_pie"):
+            fig_risk = cached_figure("dashboard.risk_pie", data.data_version, build_risk_pie)
+        st.plotly_chart(fig_risk, use_container_width=True)
+    
+    with chart_col2:
+        # Recovery Probability Distribution (pre-binned server side)
+        prob_bins = histogram(data, "recovery_probability", bin_width=5)
+        
+        def build_probability_hist():
+            fig_prob = px.bar(
+                prob_bins,
+                x="bin_mid",
+                y="count",
+                title="Recovery Probability Distribution",
+                labels={"bin_mid": "Recovery Probability (%)", "count": "Cases"},
+                color_discrete_sequence=["#4D148C"]
+            )
+            fig_prob.update_traces(width=5)
+            fig_prob.update_layout(
+                bargap=0,
+                plot_bgcolor="#1F2937",
+                paper_bgcolor="#0E1117",
+                font=dict(color="#F9FAFB"),
+                height=400,
+                showlegend=False
+            )
+            return fig_prob
+        
+        with timed("chart.dashboard.probability_hist"):
+            fig_prob = cached_figure("dashboard.probability_hist", data.data_version, build_probability_hist)
+        st.plotly_chart(fig_prob, use_container_width=True)
+    
+    with chart_col3:
+        # SLA Status Breakdown
+        sla_dist = category_counts(data, "sla_status")
+        sla_colors = {"OK": "#10B981", "AT_RISK": "#FFB84D", "BREACHED": "#FF0000"}
+        
+        def build_sla_bar():
+            fig_sla = px.bar(
+                x=sla_dist.index,
+                y=sla_dist.values,
+                title="SLA Status Overview",
+                labels={"x": "Status", "y": "Number of Cases"},
+                color=sla_dist.index,
+                color_discrete_map={k: sla_colors[k] for k in sla_dist.index if k in sla_colors}
+            )
+            fig_sla.update_layout(
+                plot_bgcolor="#1F2937",
+                paper_bgcolor="#0E1117",
+                font=dict(color="#F9FAFB"),
+                showlegend=False,
+                height=400
+            )
+            return fig_sla
+        
+        with timed("chart.dashboard.sla_bar"):
+            fig_sla = cached_figure("dashboard.sla_bar", data.data_version, build_sla_bar)
+        st.plotly_chart(fig_sla, use_container_width=True)
+    
+    st.divider()
+    
+    # ========== AGEING TREND ==========
+    st.subheader("📉 Portfolio Ageing Trend")
+    
+    ageing_trend = line_counts(data, "ageing_days")
+    
+    def build_ageing_line():
+        fig_ageing = px.line(
+            ageing_trend,
+            x="ageing_days",
+            y="count",
+            title="Cases by Ageing Days",
+            labels={"ageing_days": "Days in System", "count": "Number of Cases"},
+            markers=True,
+            line_shape="spline"
+        )
+        fig_ageing.update_traces(line=dict(color="#FF6600", width=3), marker=dict(size=8))
+        fig_ageing.update_layout(
+            plot_bgcolor="#1F2937",
+            paper_bgcolor="#0E1117",
+            font=dict(color="#F9FAFB"),
+            hovermode="x unified",
+            height=350
+        )
+        return fig_ageing
+    
+    with timed("chart.dashboard.ageing_line"):
+        fig_ageing = cached_figure("dashboard.ageing_line", data.data_version, build_ageing_line)
+    st.plotly_chart(fig_ageing, use_container_width=True)
+    
+    st.divider()
+    
+    # ========== INTELLIGENT CASE QUEUE ==========
+    _case_queue(data)
+
+
+@st.fragment
+def _case_queue(data):
+    """Filter widgets rerun only this section; the priority ranking is cached per data version"""
+    df = data.df
+    ranking = data.cached("dashboard.queue_ranking",
+                          lambda: np.argsort(-df["priority_score"].to_numpy(), kind="stable"))
+    st.subheader("🎯 AI-Prioritized Case Queue (Top 30)")
+    
+    # Filter controls
+    filter_col1, filter_col2, filter_col3 = st.columns(3)
+    
+    with filter_col1:
+        risk_filter = st.multiselect(
+            "Risk Level Filter",
+            options=["CRITICAL", "HIGH", "MEDIUM", "LOW"],
+            default=["CRITICAL", "HIGH"]
+        )
+    
+    with filter_col2:
+        sla_filter = st.multiselect(
+            "SLA Status Filter",
+            options=["BREACHED", "AT_RISK", "OK"],
+            default=["BREACHED", "AT_RISK"]
+        )
+    
+    with filter_col3:
+        min_recovery = st.slider("Min Recovery Probability (%)", 0, 100, 0)
+    
+    # Apply filters, walking the cached ranking instead of re-sorting the book
+    with timed("prep.dashboard.queue"):
+        matches = (
+            (df["risk_level"].isin(risk_filter)) &
+            (df["sla_status"].isin(sla_filter)) &
+            (df["recovery_probability"] >= min_recovery)
+        ).to_numpy()
+        filtered_df = df.iloc[ranking[matches[ranking]][:30]]
+    
+    # Format display dataframe
+    display_cols = [
+        "case_id",
+        "customer_name",
+        "invoice_amount",
+        "ageing_days",
+        "recovery_probability",
+        "risk_level",
+        "sla_status",
+        "assigned_dca",
+        "ai_next_action"
+    ]
+    
+    display_df = filtered_df[display_cols].head(30).copy()
+    display_df["invoice_amount"] = format_currency_values(display_df["invoice_amount"])
+    display_df["recovery_probability"] = display_df["recovery_probability"].astype(str) + "%"
+    
+    st.dataframe(
+        display_df,
+        use_container_width=True,
+        height=500,
+        hide_index=True
+    )
+    
+    # Export option
+    csv = display_df.to_csv(index=False)
+    st.download_button(
+        label="📥 Download Prioritized Queue (CSV)",
+        data=csv,
+        file_name=f"dca_queue_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv"
+    )
+    
+    # Full filtered export: every matching case in priority order, streamed in chunks
+    _full_export(df, ranking[matches[ranking]], session_owner(data.agency))
+
+
+def _full_export(df, rows, owner):
+    with st.expander(f"📦 Export All Matching Cases ({len(rows):,})"):
+        exp_col1, exp_col2 = st.columns(2)
+        with exp_col1:
+            fmt = st.selectbox(
+                "Format",
+                options=available_formats(),
+                format_func=lambda f: EXPORT_FORMATS[f]["label"],
+                key="dashboard_export_format"
+            )
+        with exp_col2:
+            formatted = st.checkbox(
+                "Display formatting (₹ / %)",
+                value=False,
+                disabled=fmt == "parquet",
+                key="dashboard_export_formatted"
+            )
+        formatted = formatted and fmt != "parquet"
+        
+        if len(rows) <= BACKGROUND_EXPORT_ROWS:
+            # Generated only when the button is clicked
+            st.download_button(
+                label=f"📥 Download ({EXPORT_FORMATS[fmt]['label']})",
+                data=lambda: export_bytes(df, fmt, rows, formatted=formatted),
+                file_name=export_file_name("dca_portfolio", fmt),
+                mime=EXPORT_FORMATS[fmt]["mime"],
+                key="dashboard_export_download"
+            )
+        elif st.button("⏳ Start Background Export", key="dashboard_export_start"):
+            start_export_job(df, fmt, rows, formatted=formatted, name="dca_portfolio", owner=owner)
+            st.info(f"Exporting {len(rows):,} cases in the background")
+        
+        jobs = list_export_jobs(owner=owner)
+        if jobs:
+            st.caption("Background exports")
+            if any(job["status"] == "running" for job in jobs):
+                st.button("🔄 Refresh Status", key="dashboard_export_refresh")
+            for job in jobs[:5]:
+                label = f"{job['file_name']} · {job['rows']:,} cases"
+                if job["status"] == "running":
+                    st.write(f"⏳ {label}")
+                elif job["status"] == "failed":
+                    st.write(f"❌ {label}: {job['error']}")
+                elif os.path.exists(job["path"]):
+                    st.download_button(
+                        label=f"📥 {label} ({job['bytes'] / 1024 / 1024:.1f} MB)",
+                        data=lambda path=job["path"]: read_export(path),
+                        file_name=job["file_name"],
+                        mime=EXPORT_FORMATS[job["format"]]["mime"],
+                        key=f"dashboard_export_job_{job['id']}"
+                    )
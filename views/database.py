@@ -0,0 +1,12 @@
+import streamlit as st
+from storage.archive import query_cases
+from views.common import check_access
+
+# ================= DATABASE =================
+def render(data):
+    df = data.df
+    if check_access(["FedEx Admin"]):
+        st.title("Complete Dataset")
+        if st.checkbox("Include archived (closed) cases"):
+            df = query_cases(hot=df)
+        st.dataframe(df, use_container_width=True, height=600)
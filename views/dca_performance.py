@@ -0,0 +1,55 @@
+import streamlit as st
+from perf import start_timer
+from models.scoring import dca_scorecard
+from views.common import check_access, format_currency
+
+# ================= DCA PERFORMANCE ANALYTICS =================
+def render(data):
+    df = data.df
+    if check_access(["FedEx Admin", "Compliance Officer"]):
+        st.title("👥 DCA Performance & Accountability")
+    
+    st.subheader("📊 Agent Performance Scorecard")
+    
+    # Group by DCA (once per data version)
+    scorecard_timer = start_timer("prep.dca_performance.scorecard")
+    dca_perf = data.cached("dca_performance.scorecard", lambda: dca_scorecard(df))
+    scorecard_timer.stop()
+    
+    st.dataframe(dca_perf, use_container_width=True)
+    
+    st.divider()
+    
+    _dca_deep_dive(data)
+
+
+@st.fragment
+def _dca_deep_dive(data):
+    """Individual DCA drill-down; changing the agent reruns only this section"""
+    df = data.df
+    st.subheader("📈 Individual DCA Deep Dive")
+    selected_dca = st.selectbox("Select DCA Agent", df["assigned_dca"].unique())
+    
+    dca_cases = df[df["assigned_dca"] == selected_dca]
+    
+    perf_col1, perf_col2, perf_col3, perf_col4 = st.columns(4)
+    
+    with perf_col1:
+        st.metric("Cases Assigned", len(dca_cases))
+    with perf_col2:
+        st.metric("Portfolio Value", format_currency(dca_cases["invoice_amount"].sum()))
+    with perf_col3:
+        st.metric("Expected Recovery", format_currency(dca_cases["expected_recovery"].sum()))
+    with perf_col4:
+        sla_ok = (dca_cases["sla_status"] == "OK").sum()
+        st.metric("SLA Compliant", f"{sla_ok}/{len(dca_cases)}")
+    
+    st.markdown("**Recent Cases:**")
+    st.dataframe(
+        dca_cases[[
+            "case_id", "customer_name", "invoice_amount", 
+            "ageing_days", "recovery_probability", "sla_status"
+        ]].head(10),
+        use_container_width=True,
+        hide_index=True
+    )
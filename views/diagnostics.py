@@ -0,0 +1,137 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import memprof
+from perf import set_enabled, is_enabled, set_log_path, stage_summary, stage_histogram, reset as reset_perf
+from storage.portfolio import current_shared_portfolio
+from views.figure_cache import figure_cache_stats, clear_figure_cache
+from views.budget import check_import_budget, SHELL_BUDGET_MS
+from views.common import check_access
+
+# ================= DIAGNOSTICS =================
+def render(data):
+    df = data.df
+    if check_access(["FedEx Admin"]):
+        st.title("🩺 Performance Diagnostics")
+        st.markdown("**Per-stage latency for load, scoring, chart builds and writes (this process)**")
+
+        diag_col1, diag_col2, diag_col3 = st.columns([1, 2, 1])
+        with diag_col1:
+            perf_enabled = st.toggle("Enable timing", value=is_enabled())
+            if perf_enabled != is_enabled():
+                set_enabled(perf_enabled)
+                st.rerun()
+        with diag_col2:
+            perf_log = st.text_input("JSON-lines log file (blank = off)",
+                                     value=st.session_state.get("perf_log_path", ""))
+            if perf_log != st.session_state.get("perf_log_path", ""):
+                st.session_state.perf_log_path = perf_log
+                set_log_path(perf_log or None)
+        with diag_col3:
+            if st.button("🧹 Reset Stats", use_container_width=True):
+                reset_perf()
+                st.rerun()
+
+        summary = pd.DataFrame(stage_summary())
+        if len(summary) == 0:
+            st.info("No samples yet - enable timing and browse a few pages")
+        else:
+            st.dataframe(summary, use_container_width=True, hide_index=True)
+
+            fig_p95 = px.bar(
+                summary.sort_values("p95_ms", ascending=False),
+                x="stage",
+                y="p95_ms",
+                title="p95 Latency by Stage (ms)"
+            )
+            fig_p95.update_layout(
+                plot_bgcolor="#1F2937",
+                paper_bgcolor="#0E1117",
+                font=dict(color="#F9FAFB")
+            )
+            st.plotly_chart(fig_p95, use_container_width=True)
+
+            selected_stage = st.selectbox("Latency histogram", summary["stage"].tolist())
+            histogram = pd.DataFrame(stage_histogram(selected_stage), columns=["bucket", "count"])
+            fig_hist = px.bar(histogram, x="bucket", y="count", title=f"{selected_stage} Latency Distribution")
+            fig_hist.update_layout(
+                plot_bgcolor="#1F2937",
+                paper_bgcolor="#0E1117",
+                font=dict(color="#F9FAFB")
+            )
+            st.plotly_chart(fig_hist, use_container_width=True)
+
+        st.divider()
+        st.subheader("🧠 Memory Profiling")
+        st.markdown("**Per-page allocation peaks (tracemalloc) and resident size of the scored portfolio**")
+
+        mem_col1, mem_col2, mem_col3 = st.columns([1, 2, 1])
+        with mem_col1:
+            mem_enabled = st.toggle("Enable allocation profiling", value=memprof.is_enabled())
+            if mem_enabled != memprof.is_enabled():
+                memprof.set_enabled(mem_enabled)
+                st.rerun()
+        with mem_col2:
+            mem_budget = st.number_input("Per-render allocation budget (MB)", min_value=1.0,
+                                         value=memprof.budget_mb(), step=8.0)
+            if mem_budget != memprof.budget_mb():
+                memprof.set_budget_mb(mem_budget)
+        with mem_col3:
+            if st.button("🧹 Reset Profiles", use_container_width=True):
+                memprof.reset()
+                st.rerun()
+
+        over_budget = memprof.pages_over_budget()
+        if over_budget:
+            st.warning(f"⚠️ Pages over the {memprof.budget_mb():g} MB allocation budget: {', '.join(over_budget)}")
+
+        page_mem = pd.DataFrame(memprof.page_summary())
+        if len(page_mem) == 0:
+            st.info("No page renders profiled yet - enable profiling and browse a few pages")
+        else:
+            st.dataframe(page_mem, use_container_width=True, hide_index=True)
+            selected_page = st.selectbox("Top allocation sites (last render)", page_mem["page"].tolist())
+            st.dataframe(pd.DataFrame(memprof.page_sites(selected_page)), use_container_width=True, hide_index=True)
+
+        frame_mem = pd.DataFrame(memprof.frame_memory(df, current_shared_portfolio()))
+        backing_mb = frame_mem.groupby("backing")["mb"].sum()
+        fm_col1, fm_col2, fm_col3 = st.columns(3)
+        with fm_col1:
+            st.metric("File-backed (mmap)", f"{backing_mb.get('mmap', 0):.1f} MB")
+        with fm_col2:
+            st.metric("Shared In-Process", f"{backing_mb.get('shared', 0):.1f} MB")
+        with fm_col3:
+            st.metric("Session Private", f"{backing_mb.get('session', 0):.1f} MB")
+        st.dataframe(frame_mem.sort_values("mb", ascending=False), use_container_width=True, hide_index=True)
+
+        st.divider()
+        st.subheader("🖼️ Figure Cache")
+        st.markdown("**Built chart specs reused across reruns and sessions (LRU, memory capped)**")
+        cache_stats = figure_cache_stats()
+        fc_col1, fc_col2, fc_col3, fc_col4 = st.columns(4)
+        with fc_col1:
+            st.metric("Cached Figures", cache_stats["entries"])
+        with fc_col2:
+            st.metric("Memory", f"{cache_stats['mb']:.1f} / {cache_stats['max_mb']:g} MB")
+        with fc_col3:
+            lookups = cache_stats["hits"] + cache_stats["misses"]
+            st.metric("Hit Rate", f"{cache_stats['hits'] / lookups * 100:.0f}%" if lookups else "—")
+        with fc_col4:
+            st.metric("Evictions", cache_stats["evictions"])
+        if st.button("🧹 Clear Figure Cache", use_container_width=True):
+            clear_figure_cache()
+            st.rerun()
+
+        st.divider()
+        st.subheader("📦 Page Import Budget")
+        st.markdown(f"**Cost each page adds on first visit, measured in fresh interpreters "
+                    f"(app shell budget {SHELL_BUDGET_MS} ms)**")
+        if st.button("⏱️ Measure Import Times", use_container_width=True):
+            with st.spinner("Importing each page in a fresh interpreter..."):
+                budget_df = pd.DataFrame(check_import_budget(repeat=1))
+            over = budget_df.loc[~budget_df["ok"], "page"].tolist()
+            if over:
+                st.warning(f"⚠️ Over import budget: {', '.join(over)}")
+            else:
+                st.success("✅ All pages within their import budget")
+            st.dataframe(budget_df, use_container_width=True, hide_index=True)
@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+import plotly.graph_objects as go
+
+# ==================== FIGURE CACHE ====================
+#
+# Built Plotly figures, stored as their JSON spec and keyed by
+# (chart id, data version, filter params). On a hit the figure is rebuilt from
+# the spec without re-validation (a few ms) instead of re-running plotly.express.
+# Process-wide and shared by every session; least recently used figures are
+# evicted past FIGURE_CACHE_MAX_ENTRIES or FIGURE_CACHE_MAX_MB of specs.
+
+FIGURE_CACHE_MAX_ENTRIES = 256
+FIGURE_CACHE_MAX_MB = float(os.environ.get("DCA_FIGURE_CACHE_MB", "64"))
+MB = 1024 * 1024
+
+_figures = OrderedDict()
+_stats = {"bytes": 0, "hits": 0, "misses": 0, "evictions": 0}
+_lock = threading.Lock()
+
+
+def figure_key(chart_id, data_version, **params):
+    """Hashable cache key; params may hold lists / dicts (e.g. multiselect values)"""
+    return chart_id, str(data_version), json.dumps(params, sort_keys=True, default=str)
+
+
+def _evict(max_bytes):
+    while _figures and (len(_figures) > FIGURE_CACHE_MAX_ENTRIES or _stats["bytes"] > max_bytes):
+        _, (_, size) = _figures.popitem(last=False)
+        _stats["bytes"] -= size
+        _stats["evictions"] += 1
+
+
+def cached_figure(chart_id, data_version, build, **params):
+    """
+    Figure for `chart_id` at `data_version` with the given filter params; build()
+    only runs on a miss. Unversioned data (None) is never cached
+    """
+    if data_version is None:
+        return build()
+
+    key = figure_key(chart_id, data_version, **params)
+    with _lock:
+        entry = _figures.get(key)
+        if entry is not None:
+            _figures.move_to_end(key)
+            _stats["hits"] += 1
+        else:
+            _stats["misses"] += 1
+    if entry is not None:
+        return go.Figure(json.loads(entry[0]), _validate=False)
+
+    figure = build()
+    spec = figure.to_json()
+    size = sys.getsizeof(spec)
+    max_bytes = FIGURE_CACHE_MAX_MB * MB
+    if size <= max_bytes:
+        with _lock:
+            previous = _figures.pop(key, None)
+            if previous is not None:
+                _stats["bytes"] -= previous[1]
+            _figures[key] = (spec, size)
+            _stats["bytes"] += size
+            _evict(max_bytes)
+    return figure
+
+
+def figure_cache_stats():
+    with _lock:
+        return {
+            "entries": len(_figures),
+            "mb": round(_stats["bytes"] / MB, 2),
+            "max_mb": FIGURE_CACHE_MAX_MB,
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "evictions": _stats["evictions"],
+        }
+
+
+def clear_figure_cache():
+    with _lock:
+        _figures.clear()
+        _stats["bytes"] = 0
@@ -0,0 +1,218 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta
+import plotly.express as px
+from storage.portfolio import audit_log_version, load_audit
+from perf import timed
+from views.figure_cache import cached_figure
+from views.common import check_access
+
+# ================= LIVE UPDATES / DCA ACTIVITY =================
+def render(data):
+    df = data.df
+    if check_access(["FedEx Admin", "Compliance Officer"]):
+        st.title("⚡ Live DCA Activity & Updates")
+        
+        st.markdown("**Real-time tracking of all DCA actions and case updates**")
+
+        st.divider()
+        
+        try:
+            with timed("load.audit"):
+                audit_version = audit_log_version()
+                audit_df = load_audit()
+            
+            if len(audit_df) == 0:
+                st.info("No activity recorded yet")
+            else:
+                # Convert timestamp to datetime
+                audit_df['timestamp'] = pd.to_datetime(audit_df['timestamp'])
+                
+                # Sort by most recent
+                audit_df = audit_df.sort_values('timestamp', ascending=False)
+                
+                _activity(audit_df, audit_version, data.cached("live_updates.dca_options",
+                                                               lambda: sorted(df['assigned_dca'].unique().tolist())))
+        
+        except Exception as e:
+            st.error(f"Error loading activity data: {str(e)}")
+
+
+@st.fragment
+def _activity(audit_df, audit_version, dca_options):
+    """Activity filters rerun only the feed, summary and charts below them"""
+    try:
+        # Activity filters
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            time_filter = st.selectbox(
+                "Time Range",
+                ["Last Hour", "Last 24 Hours", "Last 7 Days", "All Time"]
+            )
+
+        with col2:
+            dca_filter = st.multiselect(
+                "Filter by DCA",
+                options=["All"] + dca_options,
+                default=["All"]
+            )
+
+        with col3:
+            action_filter = st.multiselect(
+                "Filter by Action Type",
+                options=["All"] + sorted(audit_df['action'].unique().tolist()),
+                default=["All"]
+            )
+
+        # Apply time filter
+        now = datetime.now()
+        # Charts are cached per audit log version and filters (time windows per minute)
+        chart_params = {
+            "time_filter": time_filter,
+            "dca_filter": dca_filter,
+            "action_filter": action_filter,
+            "window": None if time_filter == "All Time" else now.strftime("%Y%m%d%H%M"),
+        }
+        if time_filter == "Last Hour":
+            filtered_audit = audit_df[audit_df['timestamp'] > (now - timedelta(hours=1))]
+        elif time_filter == "Last 24 Hours":
+            filtered_audit = audit_df[audit_df['timestamp'] > (now - timedelta(days=1))]
+        elif time_filter == "Last 7 Days":
+            filtered_audit = audit_df[audit_df['timestamp'] > (now - timedelta(days=7))]
+        else:
+            filtered_audit = audit_df
+
+        # Apply DCA filter
+        if "All" not in dca_filter:
+            filtered_audit = filtered_audit[filtered_audit['user'].isin(dca_filter)]
+
+        # Apply action filter
+        if "All" not in action_filter:
+            filtered_audit = filtered_audit[filtered_audit['action'].isin(action_filter)]
+
+        st.divider()
+
+        # Stats
+        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+
+        with metric_col1:
+            st.metric("Total Updates", len(filtered_audit), delta=None)
+        with metric_col2:
+            st.metric("Active DCAs", filtered_audit['user'].nunique(), delta=None)
+        with metric_col3:
+            st.metric("Cases Updated", filtered_audit['case_id'].nunique(), delta=None)
+        with metric_col4:
+            st.metric("Action Types", filtered_audit['action'].nunique(), delta=None)
+
+        st.divider()
+
+        # Live feed
+        st.subheader("📡 Activity Feed")
+
+        if len(filtered_audit) == 0:
+            st.info("No activities found for selected filters")
+        else:
+            # Display as cards/timeline
+            for idx, row in filtered_audit.iterrows():
+                with st.container():
+                    col_time, col_content = st.columns([1, 4])
+
+                    with col_time:
+                        time_str = row['timestamp'].strftime('%H:%M:%S')
+                        date_str = row['timestamp'].strftime('%m/%d')
+                        st.markdown(f"**{time_str}**")
+                        st.caption(date_str)
+
+                    with col_content:
+                        # Action badge color coding
+                        action = row['action']
+                        if 'Status' in action or 'Update' in action:
+                            badge_color = "🟢"
+                        elif 'Error' in action or 'Reject' in action:
+                            badge_color = "🔴"
+                        elif 'Create' in action or 'Add' in action:
+                            badge_color = "🔵"
+                        else:
+                            badge_color = "🟡"
+
+                        st.markdown(f"{badge_color} **{action}**")
+
+                        # Case and user details
+                        details_str = f"**Case:** {row['case_id']} | **DCA:** {row['user']}"
+                        if pd.notna(row['details']) and row['details'] != "":
+                            details_str += f" | **Details:** {row['details']}"
+
+                        st.caption(details_str)
+
+                st.divider()
+
+        # DCA Activity Summary
+        st.subheader("👥 DCA Activity Summary")
+
+        dca_activity = filtered_audit.groupby('user').agg({
+            'case_id': 'count',
+            'action': 'nunique',
+            'timestamp': lambda x: (now - x.max()).total_seconds() / 60  # minutes ago
+        }).rename(columns={
+            'case_id': 'Actions Taken',
+            'action': 'Action Types',
+            'timestamp': 'Last Active (mins ago)'
+        }).round(0)
+
+        dca_activity = dca_activity.sort_values('Actions Taken', ascending=False)
+
+        st.dataframe(dca_activity, use_container_width=True)
+
+        # Action Type Distribution
+        st.subheader("📊 Action Distribution")
+
+        col_chart1, col_chart2 = st.columns(2)
+
+        with col_chart1:
+            action_dist = filtered_audit['action'].value_counts().reset_index()
+            action_dist.columns = ['Action', 'Count']
+
+            def build_actions_by_type():
+                fig_action = px.bar(
+                    action_dist,
+                    x='Action',
+                    y='Count',
+                    title='Actions by Type',
+                    labels={'Count': 'Number of Actions'}
+                )
+                fig_action.update_layout(
+                    plot_bgcolor="#1F2937",
+                    paper_bgcolor="#0E1117",
+                    font=dict(color="#F9FAFB"),
+                    xaxis_tickangle=-45
+                )
+                return fig_action
+            
+            with timed("chart.live_updates.actions_by_type"):
+                fig_action = cached_figure("live_updates.actions_by_type", audit_version, build_actions_by_type, **chart_params)
+            st.plotly_chart(fig_action, use_container_width=True)
+
+        with col_chart2:
+            dca_dist = filtered_audit['user'].value_counts().reset_index()
+            dca_dist.columns = ['DCA', 'Count']
+
+            def build_actions_by_dca():
+                fig_dca = px.pie(
+                    dca_dist,
+                    names='DCA',
+                    values='Count',
+                    title='Actions by DCA'
+                )
+                fig_dca.update_layout(
+                    paper_bgcolor="#0E1117",
+                    font=dict(color="#F9FAFB")
+                )
+                return fig_dca
+            
+            with timed("chart.live_updates.actions_by_dca"):
+                fig_dca = cached_figure("live_updates.actions_by_dca", audit_version, build_actions_by_dca, **chart_params)
+            st.plotly_chart(fig_dca, use_container_width=True)
+    
+    except Exception as e:
+        st.error(f"Error loading activity data: {str(e)}")
@@ -0,0 +1,353 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from models.customers import get_customer_index
+from models.scoring import get_predictive_insights, compute_dca_efficiency_score
+from perf import timed, start_timer
+from views.figure_cache import cached_figure
+from views.common import check_access, format_currency
+from views.chart_data import category_counts, scatter_points
+
+# ================= PREDICTIVE ANALYTICS =================
+def render(data):
+    df = data.df
+    if check_access(["FedEx Admin", "Compliance Officer"]):
+        st.title("🧠 Predictive Analytics & AI Insights")
+        
+        st.markdown("**Advanced ML predictions for optimal case management and recovery strategy**")
+        st.divider()
+        
+        # churn_risk / optimal_followup_days are already produced by the scoring pass
+        
+        # Tabs for different analyses
+        tab1, tab2, tab3, tab4 = st.tabs([
+            "📊 Recovery Probability Analysis",
+            "⚠️ Churn Risk Assessment", 
+            "📞 Follow-up Strategy",
+            "👥 DCA Efficiency Scores"
+        ])
+        
+        # ===== TAB 1: RECOVERY PROBABILITY =====
+        with tab1:
+            st.subheader("Recovery Probability Heatmap")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.metric("Average Recovery Probability", 
+                         f"{df['recovery_probability'].mean():.1f}%")
+                st.metric("High Confidence Cases (>70%)", 
+                         len(df[df['recovery_probability'] > 70]))
+                st.metric("Low Probability Cases (<30%)", 
+                         len(df[df['recovery_probability'] < 30]))
+            
+            with col2:
+                st.metric("Expected Total Recovery", 
+                         format_currency(df['expected_recovery'].sum()))
+                st.metric("At-Risk Cases (30-50%)", 
+                         len(df[(df['recovery_probability'] >= 30) & (df['recovery_probability'] <= 50)]))
+                st.metric("Medium Probability (50-70%)", 
+                         len(df[(df['recovery_probability'] > 50) & (df['recovery_probability'] <= 70)]))
+            
+            st.divider()
+            
+            # Recovery probability distribution
+            prob_dist = category_counts(data, 'probability_band', derived=True)
+            
+            def build_probability_bands():
+                fig_prob_dist = px.bar(
+                    prob_dist.sort_index(),
+                    title='Cases by Recovery Probability Range',
+                    labels={'index': 'Probability Range', 'value': 'Number of Cases'},
+                    color_discrete_sequence=['#EF4444', '#F97316', '#FBBF24', '#86EFAC', '#22C55E']
+                )
+                fig_prob_dist.update_layout(
+                    plot_bgcolor="#1F2937",
+                    paper_bgcolor="#0E1117",
+                    font=dict(color="#F9FAFB"),
+                    showlegend=False
+                )
+                return fig_prob_dist
+            
+            with timed("chart.predictive.probability_bands"):
+                fig_prob_dist = cached_figure("predictive.probability_bands", data.data_version, build_probability_bands)
+            st.plotly_chart(fig_prob_dist, use_container_width=True)
+            
+            # Top recovery cases
+            st.subheader("🔝 Top 10 Highest Recovery Probability Cases")
+            top_recovery = df.nlargest(10, 'recovery_probability')[
+                ['case_id', 'customer_name', 'invoice_amount', 'recovery_probability', 
+                 'ageing_days', 'dispute_status']
+            ].copy()
+            top_recovery['invoice_amount'] = top_recovery['invoice_amount'].apply(format_currency)
+            top_recovery['recovery_probability'] = top_recovery['recovery_probability'].apply(lambda x: f"{x:.1f}%")
+            st.dataframe(top_recovery, use_container_width=True, hide_index=True)
+        
+        # ===== TAB 2: CHURN RISK =====
+        with tab2:
+            st.subheader("Churn Risk Prediction")
+            st.markdown("**Probability that customers WON'T pay - Higher % = Higher default risk**")
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                avg_churn = df['churn_risk'].mean()
+                st.metric("Average Churn Risk", f"{avg_churn:.1f}%")
+            
+            with col2:
+                high_churn = len(df[df['churn_risk'] > 70])
+                st.metric("🔴 CRITICAL Churn Risk (>70%)", high_churn)
+            
+            with col3:
+                low_churn = len(df[df['churn_risk'] < 30])
+                st.metric("🟢 Low Churn Risk (<30%)", low_churn)
+            
+            st.divider()
+            
+            # Churn vs Recovery scatter (WebGL / binned density for large books)
+            churn_points = scatter_points(data, 'recovery_probability', 'churn_risk',
+                                          ['invoice_amount', 'risk_level', 'case_id', 'customer_name', 'ageing_days'])
+            
+            def build_churn_scatter():
+                if churn_points["mode"] == "density":
+                    fig_churn_scatter = go.Figure(go.Heatmap(
+                        x=churn_points["x"],
+                        y=churn_points["y"],
+                        z=churn_points["z"],
+                        colorscale="Inferno",
+                        colorbar=dict(title="Cases"),
+                        hovertemplate="Recovery %{x:.0f}% · Churn %{y:.0f}%<br>%{z:,.0f} cases<extra></extra>"
+                    ))
+                    fig_churn_scatter.update_layout(
+                        title='Churn Risk vs Recovery Probability (case density)',
+                        xaxis_title='Recovery Probability (%)',
+                        yaxis_title='Churn Risk (%)'
+                    )
+                else:
+                    fig_churn_scatter = px.scatter(
+                        churn_points["points"],
+                        x='recovery_probability',
+                        y='churn_risk',
+                        size='invoice_amount',
+                        color='risk_level',
+                        hover_data=['case_id', 'customer_name', 'ageing_days'],
+                        title='Churn Risk vs Recovery Probability',
+                        labels={'recovery_probability': 'Recovery Probability (%)', 
+                               'churn_risk': 'Churn Risk (%)'},
+                        color_discrete_map={'LOW': '#22C55E', 'MEDIUM': '#FBBF24', 
+                                           'HIGH': '#F97316', 'CRITICAL': '#EF4444'},
+                        render_mode=churn_points["mode"]
+                    )
+                fig_churn_scatter.update_layout(
+                    plot_bgcolor="#1F2937",
+                    paper_bgcolor="#0E1117",
+                    font=dict(color="#F9FAFB")
+                )
+                return fig_churn_scatter
+            
+            with timed("chart.predictive.churn_scatter"):
+                fig_churn_scatter = cached_figure("predictive.churn_scatter", data.data_version, build_churn_scatter)
+            st.plotly_chart(fig_churn_scatter, use_container_width=True)
+            
+            # High churn risk cases
+            st.subheader("🚨 High Churn Risk Cases (Immediate Action Required)")
+            high_risk_churn = df[df['churn_risk'] > 70].nlargest(10, 'churn_risk')[
+                ['case_id', 'customer_name', 'invoice_amount', 'churn_risk', 
+                 'ageing_days', 'dispute_status']
+            ].copy()
+            high_risk_churn['invoice_amount'] = high_risk_churn['invoice_amount'].apply(format_currency)
+            high_risk_churn['churn_risk'] = high_risk_churn['churn_risk'].apply(lambda x: f"{x:.1f}%")
+            
+            if len(high_risk_churn) > 0:
+                st.dataframe(high_risk_churn, use_container_width=True, hide_index=True)
+            else:
+                st.success("✅ No high churn risk cases detected!")
+        
+        # ===== TAB 3: FOLLOW-UP STRATEGY =====
+        with tab3:
+            st.subheader("Optimal Follow-up Timing Recommendations")
+            st.markdown("**AI-optimized contact frequency based on recovery probability and case aging**")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                urgent_3day = len(df[df['optimal_followup_days'] <= 3])
+                st.metric("🔥 Urgent (≤3 days)", urgent_3day)
+            
+            with col2:
+                medium_week = len(df[(df['optimal_followup_days'] > 3) & (df['optimal_followup_days'] <= 7)])
+                st.metric("⚡ Weekly (4-7 days)", medium_week)
+            
+            with col3:
+                biweekly = len(df[(df['optimal_followup_days'] > 7) & (df['optimal_followup_days'] <= 14)])
+                st.metric("📅 Bi-weekly (8-14 days)", biweekly)
+            
+            with col4:
+                monthly = len(df[df['optimal_followup_days'] > 14])
+                st.metric("📆 Monthly+ (>14 days)", monthly)
+            
+            st.divider()
+            
+            # Follow-up frequency distribution
+            followup_counts = category_counts(data, 'followup_bucket', derived=True)
+            
+            def build_followup_pie():
+                fig_followup = px.pie(
+                    names=followup_counts.index.astype(str),
+                    values=followup_counts.to_numpy(),
+                    title='Case Distribution by Recommended Follow-up Frequency',
+                    color_discrete_sequence=['#EF4444', '#F97316', '#FBBF24', '#86EFAC']
+                )
+                fig_followup.update_layout(
+                    paper_bgcolor="#0E1117",
+                    font=dict(color="#F9FAFB")
+                )
+                return fig_followup
+            
+            with timed("chart.predictive.followup_pie"):
+                fig_followup = cached_figure("predictive.followup_pie", data.data_version, build_followup_pie)
+            st.plotly_chart(fig_followup, use_container_width=True)
+            
+            # Cases needing urgent follow-up
+            st.subheader("🔥 Urgent Follow-up Required (Within 3 Days)")
+            urgent_cases = df[df['optimal_followup_days'] <= 3].nlargest(10, 'priority_score')[
+                ['case_id', 'customer_name', 'invoice_amount', 'optimal_followup_days',
+                 'recovery_probability', 'churn_risk']
+            ].copy()
+            urgent_cases['invoice_amount'] = urgent_cases['invoice_amount'].apply(format_currency)
+            urgent_cases['recovery_probability'] = urgent_cases['recovery_probability'].apply(lambda x: f"{x:.1f}%")
+            urgent_cases['churn_risk'] = urgent_cases['churn_risk'].apply(lambda x: f"{x:.1f}%")
+            urgent_cases['optimal_followup_days'] = urgent_cases['optimal_followup_days'].apply(lambda x: f"{int(x)} days")
+            
+            if len(urgent_cases) > 0:
+                st.dataframe(urgent_cases, use_container_width=True, hide_index=True)
+            else:
+                st.success("✅ No urgent follow-ups needed!")
+        
+        # ===== TAB 4: DCA EFFICIENCY =====
+        with tab4:
+            st.subheader("Individual DCA Efficiency Scores")
+            st.markdown("**Composite metric: Recovery Rate × Responsiveness × Resolution Rate**")
+            
+            # Calculate efficiency for each DCA
+            efficiency_timer = start_timer("prep.predictive.dca_efficiency")
+            efficiency_df = data.cached("predictive.dca_efficiency", lambda: _dca_efficiency(df))
+            efficiency_timer.stop()
+            
+            # Display efficiency scores
+            
+            def build_dca_efficiency():
+                fig_dca_eff = px.bar(
+                    efficiency_df,
+                    x='DCA',
+                    y='Efficiency Score',
+                    title='DCA Efficiency Comparison',
+                    color='Efficiency Score',
+                    color_continuous_scale='RdYlGn'
+                )
+                fig_dca_eff.update_layout(
+                    plot_bgcolor="#1F2937",
+                    paper_bgcolor="#0E1117",
+                    font=dict(color="#F9FAFB"),
+                    showlegend=False
+                )
+                return fig_dca_eff
+            
+            with timed("chart.predictive.dca_efficiency"):
+                fig_dca_eff = cached_figure("predictive.dca_efficiency", data.data_version, build_dca_efficiency)
+            st.plotly_chart(fig_dca_eff, use_container_width=True)
+            
+            # Detailed efficiency table
+            st.subheader("📊 DCA Performance Details")
+            st.dataframe(efficiency_df, use_container_width=True, hide_index=True)
+            
+            # Top performer highlights
+            if len(efficiency_df) > 0:
+                top_dca = efficiency_df.iloc[0]
+                st.success(f"🏆 **Top Performer:** {top_dca['DCA']} with {top_dca['Efficiency Score']:.1f} efficiency score")
+        
+        # ===== CASE-LEVEL INSIGHTS =====
+        _case_insights(data)
+
+
+def _dca_efficiency(df):
+    dca_efficiency = []
+    for dca in df['assigned_dca'].unique():
+        dca_cases = df[df['assigned_dca'] == dca]
+        efficiency = compute_dca_efficiency_score(dca_cases)
+        avg_recovery = dca_cases['recovery_probability'].mean()
+        cases_count = len(dca_cases)
+        expected_recovery = dca_cases['expected_recovery'].sum()
+        avg_responsiveness = 100 - dca_cases['last_dca_update_days'].mean()
+
+        dca_efficiency.append({
+            'DCA': dca,
+            'Efficiency Score': efficiency,
+            'Cases': cases_count,
+            'Avg Recovery %': round(avg_recovery, 1),
+            'Responsiveness %': round(avg_responsiveness, 1),
+            'Expected Recovery': format_currency(expected_recovery)
+        })
+
+    efficiency_df = pd.DataFrame(dca_efficiency).sort_values('Efficiency Score', ascending=False)
+    return efficiency_df
+
+
+@st.fragment
+def _case_insights(data):
+    """Picking a case reruns only this section"""
+    df = data.df
+    # One label per case, built once per data version (not a scan per option)
+    case_labels = data.cached("predictive.case_labels", lambda: dict(zip(
+        df['case_id'], df['case_id'].astype(str) + " - " + df['customer_name'].astype(str))))
+    st.divider()
+    st.subheader("🔍 Case-Level Predictive Insights")
+    st.markdown("Select a case to view comprehensive predictive analysis")
+
+    selected_case = st.selectbox(
+        "Select Case",
+        options=df['case_id'].tolist(),
+        format_func=case_labels.get
+    )
+
+    case_data = df[df['case_id'] == selected_case].iloc[0]
+    insights = get_predictive_insights(case_data)
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Recovery Probability", f"{insights['recovery_probability']:.1f}%")
+    with col2:
+        st.metric("Churn Risk", f"{insights['churn_risk']:.1f}%")
+    with col3:
+        st.metric("Optimal Follow-up", f"{insights['optimal_followup_days']} days")
+    with col4:
+        st.metric("Invoice Amount", format_currency(case_data['invoice_amount']))
+
+    st.divider()
+
+    col_insight1, col_insight2 = st.columns(2)
+
+    with col_insight1:
+        st.info(f"**Insight:** {insights['insight_type']}")
+
+    with col_insight2:
+        st.warning(f"**Recommendation:** {insights['recommendation']}")
+
+    # Customer-level exposure across all of this customer's invoices
+    exposure = get_customer_index(df, data.data_version).exposure(str(case_data['customer_name']))
+    if exposure is not None:
+        st.markdown(f"**Customer Exposure — {exposure['customer_name']}**")
+        exp_col1, exp_col2, exp_col3, exp_col4 = st.columns(4)
+        with exp_col1:
+            st.metric("Open Cases", f"{exposure['open_cases']} of {exposure['cases']}")
+        with exp_col2:
+            st.metric("Total Invoiced", format_currency(exposure['invoice_amount']))
+        with exp_col3:
+            st.metric("Expected Recovery", format_currency(exposure['expected_recovery']))
+        with exp_col4:
+            st.metric("Worst Risk", exposure['worst_risk_level'] or "—")
+        other_disputes = exposure['open_disputes'] - int(case_data['dispute_status'] == "Open" and case_data['status'] != "CLOSED")
+        if other_disputes:
+            st.error(f"⚠️ {other_disputes} other open dispute(s) for this customer")
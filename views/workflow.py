@@ -0,0 +1,104 @@
+import streamlit as st
+import pandas as pd
+from jobs.followups import contact_fields, get_calendar
+from storage.portfolio import audit_entry
+from storage.write_behind import submit_case_update
+from views.common import check_access, format_currency, track_writes, seen_case_version
+
+# ================= WORKFLOW MANAGEMENT =================
+@st.fragment
+def _followup_worklist(data):
+    """Agent's follow-ups due today, top cases by priority; logging a contact reruns only this section"""
+    df = data.df
+    calendar = get_calendar(df, data.data_version, scope=data.agency)
+    positions = data.cached("workflow.case_positions", lambda: dict(zip(df["case_id"], range(len(df)))))
+    st.subheader("📅 Today's Follow-up Worklist")
+
+    agents = sorted(df["assigned_dca"].dropna().unique().tolist())
+    agent = st.selectbox("DCA Agent", agents, key="worklist_agent")
+    worklist = calendar.worklist(agent)
+    if not worklist:
+        st.info(f"No follow-ups due today for {agent}")
+    else:
+        cases = df.iloc[[positions[case_id] for case_id, _ in worklist]]
+        st.dataframe(cases[["case_id", "customer_name", "invoice_amount", "priority_score",
+                            "last_dca_update_days", "ai_next_action"]],
+                     use_container_width=True, hide_index=True)
+
+        contact_case = st.selectbox("Case contacted", [case_id for case_id, _ in worklist], key="worklist_case")
+        expected_version = seen_case_version(df, contact_case)
+        if st.button("📞 Log Contact", use_container_width=True):
+            case = df.iloc[positions[contact_case]]
+            ticket = submit_case_update(
+                contact_case,
+                expected_version=expected_version,
+                audit_event=audit_entry(contact_case, "DCA Contact Logged", st.session_state.user_role),
+                **contact_fields(case)
+            )
+            # Re-file the case only once the contact is written (a version conflict leaves it where it is)
+            followup_days = case["optimal_followup_days"]
+            ticket.add_done_callback(
+                lambda done: done.error is None and calendar.record_contact(done.case_id, followup_days))
+            track_writes(ticket)
+            st.success(f"✅ Contact logged for {contact_case}; next follow-up in {int(case['optimal_followup_days'])} days")
+
+    with st.expander("Upcoming follow-ups (14 days)"):
+        st.dataframe(calendar.calendar(agent), use_container_width=True, hide_index=True)
+
+
+def render(data):
+    df = data.df
+    if check_access(["FedEx Admin", "DCA Agent"]):
+        st.title("📋 Case Workflow & SLA Management")
+    
+    st.markdown("### Case Status Transitions")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Search Case")
+        case_search = st.text_input("Enter Case ID")
+        
+        if case_search and case_search in df["case_id"].values:
+            case = df[df["case_id"] == case_search].iloc[0]
+            expected_version = seen_case_version(df, case_search)
+            
+            st.markdown("#### Current Case Details")
+            detail_cols = st.columns(2)
+            with detail_cols[0]:
+                st.write(f"**Customer:** {case['customer_name']}")
+                st.write(f"**Amount:** {format_currency(case['invoice_amount'])}")
+                st.write(f"**Status:** {case['status']}")
+            with detail_cols[1]:
+                st.write(f"**Ageing:** {case['ageing_days']} days")
+                st.write(f"**Assigned DCA:** {case['assigned_dca']}")
+                st.write(f"**SLA Status:** {case['sla_status']}")
+            
+            st.divider()
+            
+            st.markdown("#### Update Case Status")
+            new_status = st.selectbox("New Status", ["ACTIVE", "PENDING_REVIEW", "ESCALATED", "CLOSED"])
+            update_notes = st.text_area("Update Notes")
+            
+            if st.button("Update Status", use_container_width=True):
+                track_writes(submit_case_update(
+                    case_search,
+                    expected_version=expected_version,
+                    audit_event=audit_entry(case_search, f"Status Updated to {new_status}", st.session_state.user_role, update_notes),
+                    status=new_status
+                ))
+                st.success(f"✅ Case {case_search} updated to {new_status}")
+        elif case_search:
+            st.warning("Case not found")
+    
+    with col2:
+        st.subheader("SLA Dashboard")
+        sla_summary = pd.DataFrame({
+            "Status": df["sla_status"].value_counts().index,
+            "Count": df["sla_status"].value_counts().values,
+            "At Risk %": [f"{(df['sla_status'].value_counts()[s]/len(df)*100):.1f}%" for s in df["sla_status"].value_counts().index]
+        })
+        st.dataframe(sla_summary, use_container_width=True, hide_index=True)
+
+    st.divider()
+    _followup_worklist(data)